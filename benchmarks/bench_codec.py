@@ -0,0 +1,88 @@
+"""
+Microbenchmark: libs.common.codec against the PIL-based helpers in libs.common.utils.
+
+Run from the project root:
+    python -m benchmarks.bench_codec --width 4032 --height 3024 --repeat 20
+"""
+import argparse
+import base64
+import io
+import time
+from typing import Callable, List
+import cv2
+import numpy as np
+from PIL import Image
+from libs.common.codec import decode_base64_bgr, decode_pil
+from libs.common.utils import base64_to_image, base64_to_numpy, resize_image_if_needed
+
+
+def make_jpeg(width: int, height: int, quality: int = 90) -> bytes:
+    """Synthetic photo-like JPEG (smooth gradients plus noise)."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 127 // (width + height)], axis=-1)
+    noise = rng.integers(0, 32, size=(height, width, 3))
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def bench(name: str, fn: Callable[[], object], repeat: int) -> None:
+    fn()  # warm up
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{name:<48} median {timings[len(timings) // 2]:8.2f} ms   min {timings[0]:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--max-width", type=int, default=1920)
+    parser.add_argument("--max-height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    data = make_jpeg(args.width, args.height)
+    image_base64 = base64.b64encode(data).decode("utf-8")
+    bounds = (args.max_width, args.max_height)
+    print(f"{args.width}x{args.height} JPEG ({len(data) / 1024:.0f} KB), target {bounds[0]}x{bounds[1]}\n")
+
+    print("Full-resolution BGR decode")
+    bench(
+        "utils.base64_to_numpy + contiguous copy",
+        lambda: np.ascontiguousarray(base64_to_numpy(image_base64)),
+        args.repeat,
+    )
+    bench("codec.decode_base64_bgr", lambda: decode_base64_bgr(image_base64), args.repeat)
+
+    print("\nDecode and downscale to target")
+    bench(
+        "utils: PIL decode + LANCZOS resize + to BGR",
+        lambda: np.ascontiguousarray(
+            np.array(resize_image_if_needed(base64_to_image(image_base64).convert("RGB"), *bounds))[:, :, ::-1]
+        ),
+        args.repeat,
+    )
+    bench(
+        "codec.decode_base64_bgr (IMREAD_REDUCED + AREA)",
+        lambda: decode_base64_bgr(image_base64, *bounds),
+        args.repeat,
+    )
+    bench(
+        "utils: PIL decode + LANCZOS resize (RGB PIL)",
+        lambda: resize_image_if_needed(base64_to_image(image_base64).convert("RGB"), *bounds),
+        args.repeat,
+    )
+    bench("codec.decode_pil (draft + BOX)", lambda: decode_pil(data, *bounds), args.repeat)
+
+    print(f"\nOpenCV {cv2.__version__}, Pillow {Image.__version__}")
+
+
+if __name__ == "__main__":
+    main()
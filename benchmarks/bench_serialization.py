@@ -0,0 +1,122 @@
+"""
+Microbenchmark: per-hop cost of internal payloads, validated JSON vs. the fast path.
+
+Each hop is measured as encode on the sender plus decode and model creation on the
+receiver, for the image processing -> main orchestrator response and the
+main orchestrator -> LLM inferencer request.
+
+Run from the project root:
+    python -m benchmarks.bench_serialization --faces 3 --repeat 2000
+"""
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+from libs.common import serialization
+from libs.common.schemas import AggregatedImageFeatures, RoastRequest
+from libs.common.serialization import (
+    JSON_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPE,
+    construct,
+    decode,
+    encode,
+)
+
+
+def make_features(faces: int) -> Dict[str, Any]:
+    """Features shaped like a real image processing response."""
+    return {
+        "face_analysis": {
+            "face_count": faces,
+            "faces": [
+                {
+                    "bbox": [120.5 + i, 80.25, 310.0, 355.75],
+                    "confidence": 0.97,
+                    "landmarks": [[200.1 + j, 180.2 + j] for j in range(5)],
+                }
+                for i in range(faces)
+            ],
+            "gender": "male",
+            "gender_confidence": 0.91,
+            "race": "asian",
+            "race_confidence": 0.84,
+            "emotion": "happy",
+            "emotion_confidence": 0.88,
+            "attractiveness_score": 7.2,
+            "facial_structure_score": 7.5,
+        },
+        "vlm_scene_analysis": "A cluttered desk with two monitors and a cold coffee. " * 40,
+        "processing_time_ms": 2345.6,
+    }
+
+
+def bench(name: str, fn: Callable[[], object], repeat: int) -> float:
+    fn()  # warm up
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print(f"  {name:<44} median {median:9.1f} us")
+    return median
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    data = make_features(args.faces)
+    features = AggregatedImageFeatures.model_validate(data)
+
+    # Hop 1: image processing orchestrator -> main orchestrator (features response)
+    def baseline_features_hop() -> AggregatedImageFeatures:
+        body = json.dumps(AggregatedImageFeatures(**data).model_dump()).encode("utf-8")
+        return AggregatedImageFeatures(**json.loads(body))
+
+    def fast_features_hop(content_type: str) -> Callable[[], AggregatedImageFeatures]:
+        return lambda: construct(AggregatedImageFeatures, decode(encode(data, content_type), content_type))
+
+    # Hop 2: main orchestrator -> LLM inferencer (roast request)
+    def baseline_roast_hop() -> RoastRequest:
+        request = RoastRequest(features=features, roast_level="medium")
+        body = json.dumps(request.model_dump(mode="json")).encode("utf-8")
+        return RoastRequest(**json.loads(body))
+
+    def fast_roast_hop(content_type: str) -> Callable[[], RoastRequest]:
+        def run() -> RoastRequest:
+            payload = {
+                "features": features.model_dump(mode="json", exclude_none=True),
+                "roast_level": "medium",
+            }
+            return construct(RoastRequest, decode(encode(payload, content_type), content_type))
+        return run
+
+    content_types = [JSON_CONTENT_TYPE]
+    if serialization.msgpack_available():
+        content_types.append(MSGPACK_CONTENT_TYPE)
+
+    encoder = "orjson" if serialization.orjson is not None else "stdlib json"
+    print(f"JSON encoder: {encoder}; msgpack: {'yes' if serialization.msgpack_available() else 'not installed'}\n")
+
+    for title, baseline, fast in [
+        ("Features response (image processing -> main)", baseline_features_hop, fast_features_hop),
+        ("Roast request (main -> LLM inferencer)", baseline_roast_hop, fast_roast_hop),
+    ]:
+        print(title)
+        reference = bench("validated json (current)", baseline, args.repeat)
+        for content_type in content_types:
+            median = bench(f"construct + {content_type}", fast(content_type), args.repeat)
+            print(f"  {'':<44} {reference / median:9.1f}x faster")
+        print()
+
+    print(f"JSON payload size: {len(encode(data, JSON_CONTENT_TYPE))} bytes")
+    if serialization.msgpack_available():
+        print(f"msgpack payload size: {len(encode(data, MSGPACK_CONTENT_TYPE))} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: round trip of image-sized payloads over loopback TCP vs. a Unix domain socket.
+
+Starts an echo-size endpoint under uvicorn in two child processes (127.0.0.1 and a
+.sock file) and POSTs payloads to it through libs.common.http.client_session, as
+the orchestrators do. Results depend heavily on the host: measure on the target
+node before switching a deployment to sockets.
+
+Run from the project root:
+    python -m benchmarks.bench_transport --sizes 100000 1000000 4000000 --repeat 200
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+from typing import List
+import uvicorn
+from fastapi import FastAPI, Request
+from libs.common.http import client_session, request_url
+
+
+app = FastAPI()
+
+
+@app.post("/echo-size")
+async def echo_size(request: Request) -> dict:
+    return {"size": len(await request.body())}
+
+
+def serve(bind: dict) -> None:
+    uvicorn.run(app, log_level="warning", **bind)
+
+
+def start_server(connect: tuple, **bind) -> multiprocessing.Process:
+    """Run uvicorn in a child process and wait until it accepts connections."""
+    process = multiprocessing.Process(target=serve, args=(bind,), daemon=True)
+    process.start()
+    family = socket.AF_UNIX if isinstance(connect, str) else socket.AF_INET
+    while True:
+        with socket.socket(family) as sock:
+            if sock.connect_ex(connect) == 0:
+                return process
+        time.sleep(0.05)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench(url: str, payload: bytes, repeat: int) -> float:
+    """Median round trip in milliseconds over one keep-alive session."""
+    timings: List[float] = []
+    async with client_session(url) as session:
+        for index in range(repeat + 5):
+            start = time.perf_counter()
+            async with session.post(request_url(url), data=payload) as response:
+                await response.read()
+            if index >= 5:  # warm up
+                timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+async def run(sizes: List[int], repeat: int, tcp_url: str, unix_url: str) -> None:
+    print(f"{'payload':>12} {'tcp ms':>10} {'unix ms':>10} {'speedup':>9}")
+    for size in sizes:
+        payload = os.urandom(size)
+        tcp = await bench(tcp_url, payload, repeat)
+        uds = await bench(unix_url, payload, repeat)
+        print(f"{size:>12} {tcp:>10.3f} {uds:>10.3f} {tcp / uds:>8.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 4_000_000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    port = free_port()
+    socket_path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    servers = [
+        start_server(("127.0.0.1", port), host="127.0.0.1", port=port),
+        start_server(socket_path, uds=socket_path),
+    ]
+    try:
+        asyncio.run(run(
+            args.sizes,
+            args.repeat,
+            tcp_url=f"http://127.0.0.1:{port}/echo-size",
+            unix_url=f"unix://{socket_path}/echo-size",
+        ))
+    finally:
+        for server in servers:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import axios from 'axios'
+
+export const API_BASE_URL = 'http://localhost:8000'
+
+// Used when the capabilities endpoint is unreachable (matches the server defaults)
+const DEFAULT_CAPABILITIES = {
+  max_width: 1920,
+  max_height: 1080,
+  max_upload_bytes: 10 * 1024 * 1024,
+  passthrough_max_bytes: 2 * 1024 * 1024,
+  preferred_format: 'image/jpeg',
+  jpeg_quality: 0.85,
+}
+
+let capabilitiesPromise = null
+
+// Fetched once per page load; uploads should never fail because of it
+export const getCapabilities = () => {
+  if (!capabilitiesPromise) {
+    capabilitiesPromise = axios
+      .get(`${API_BASE_URL}/api/v1/capabilities`, { timeout: 3000 })
+      .then((response) => ({ ...DEFAULT_CAPABILITIES, ...response.data }))
+      .catch((error) => {
+        console.warn('Could not load upload capabilities, using defaults:', error)
+        return DEFAULT_CAPABILITIES
+      })
+  }
+  return capabilitiesPromise
+}
@@ -1,13 +1,32 @@
-import { useState, useRef } from 'react'
+import { useState, useRef, useEffect } from 'react'
 import axios from 'axios'
+import { API_BASE_URL, getCapabilities } from '../api/capabilities'
+import { prepareImageForUpload } from '../utils/resizeImage'
 import './ImageUpload.css'
 
+// Only what RoastDisplay renders; per-face boxes and landmarks are never requested
+const RESPONSE_FIELDS = [
+  'request_id',
+  'roast',
+  'total_processing_time_ms',
+  'features.face_analysis.face_count',
+  'features.face_analysis.gender',
+  'features.face_analysis.emotion',
+  'features.face_analysis.attractiveness_score',
+  'features.vlm_scene_analysis',
+].join(',')
+
 const ImageUpload = ({ onRoastReceived, onLoading, onError }) => {
   const [selectedImage, setSelectedImage] = useState(null)
   const [previewUrl, setPreviewUrl] = useState(null)
   const [roastLevel, setRoastLevel] = useState('medium')
   const fileInputRef = useRef(null)
 
+  // Warm the capabilities cache so submitting does not wait on it
+  useEffect(() => {
+    getCapabilities()
+  }, [])
+
   const handleImageSelect = (e) => {
     const file = e.target.files[0]
     if (file) {
@@ -33,12 +52,17 @@ const ImageUpload = ({ onRoastReceived, onLoading, onError }) => {
 
     onLoading(true)
 
-    const formData = new FormData()
-    formData.append('image', selectedImage)
-    formData.append('roast_level', roastLevel)
-
     try {
-      const response = await axios.post('http://localhost:8000/api/v1/analyze', formData, {
+      // Shrink to the server's working size before uploading
+      const capabilities = await getCapabilities()
+      const upload = await prepareImageForUpload(selectedImage, capabilities)
+
+      const formData = new FormData()
+      formData.append('image', upload)
+      formData.append('roast_level', roastLevel)
+
+      const response = await axios.post(`${API_BASE_URL}/api/v1/analyze`, formData, {
+        params: { fields: RESPONSE_FIELDS },
         headers: {
           'Content-Type': 'multipart/form-data',
         },
@@ -0,0 +1,95 @@
+// Largest size within maxWidth x maxHeight that keeps the aspect ratio (never upscales)
+export const fitSize = (width, height, maxWidth, maxHeight) => {
+  if (width <= maxWidth && height <= maxHeight) {
+    return { width, height }
+  }
+  const scale = Math.min(maxWidth / width, maxHeight / height)
+  return {
+    width: Math.max(1, Math.floor(width * scale)),
+    height: Math.max(1, Math.floor(height * scale)),
+  }
+}
+
+// Decode (applying EXIF orientation), draw at the target size and re-encode
+export const resizeBitmapSource = async (file, { maxWidth, maxHeight, type, quality }) => {
+  const bitmap = await createImageBitmap(file, { imageOrientation: 'from-image' })
+  const { width, height } = fitSize(bitmap.width, bitmap.height, maxWidth, maxHeight)
+
+  const canvas = typeof OffscreenCanvas !== 'undefined'
+    ? new OffscreenCanvas(width, height)
+    : Object.assign(document.createElement('canvas'), { width, height })
+  const ctx = canvas.getContext('2d')
+  ctx.imageSmoothingQuality = 'high'
+  ctx.drawImage(bitmap, 0, 0, width, height)
+  bitmap.close()
+
+  if (canvas.convertToBlob) {
+    return canvas.convertToBlob({ type, quality })
+  }
+  return new Promise((resolve, reject) => {
+    canvas.toBlob(
+      (blob) => (blob ? resolve(blob) : reject(new Error('Canvas encoding failed'))),
+      type,
+      quality
+    )
+  })
+}
+
+const runInWorker = (file, options) => new Promise((resolve, reject) => {
+  const worker = new Worker(new URL('../workers/resizeWorker.js', import.meta.url), { type: 'module' })
+  worker.onmessage = ({ data }) => {
+    worker.terminate()
+    data.error ? reject(new Error(data.error)) : resolve(data.blob)
+  }
+  worker.onerror = (event) => {
+    worker.terminate()
+    reject(new Error(event.message || 'Resize worker failed'))
+  }
+  worker.postMessage({ file, options })
+})
+
+/**
+ * Downscale and re-encode an image to the server's advertised limits before upload.
+ *
+ * Files that are already small JPEGs are returned unchanged. Resizing runs in an
+ * OffscreenCanvas worker when available, otherwise on a canvas in the page. Any
+ * failure falls back to uploading the original file.
+ */
+export const prepareImageForUpload = async (file, capabilities) => {
+  const options = {
+    maxWidth: capabilities.max_width,
+    maxHeight: capabilities.max_height,
+    type: capabilities.preferred_format,
+    quality: capabilities.jpeg_quality,
+  }
+
+  if (typeof createImageBitmap === 'undefined') {
+    return file
+  }
+
+  try {
+    // Small JPEGs are only decoded to check whether they already fit
+    if (file.type === options.type && file.size <= capabilities.passthrough_max_bytes) {
+      const probe = await createImageBitmap(file)
+      const fits = probe.width <= options.maxWidth && probe.height <= options.maxHeight
+      probe.close()
+      if (fits) {
+        return file
+      }
+    }
+
+    const blob = typeof OffscreenCanvas !== 'undefined' && typeof Worker !== 'undefined'
+      ? await runInWorker(file, options)
+      : await resizeBitmapSource(file, options)
+
+    // Keep the original if re-encoding did not make it smaller (e.g. a tiny PNG)
+    if (blob.size >= file.size && file.size <= capabilities.passthrough_max_bytes) {
+      return file
+    }
+    const name = file.name.replace(/\.[^.]+$/, '') + '.jpg'
+    return new File([blob], name, { type: options.type })
+  } catch (error) {
+    console.warn('Client-side resize failed, uploading original:', error)
+    return file
+  }
+}
@@ -0,0 +1,11 @@
+import { resizeBitmapSource } from '../utils/resizeImage'
+
+// Keeps decoding and re-encoding large photos off the main thread
+self.onmessage = async ({ data }) => {
+  try {
+    const blob = await resizeBitmapSource(data.file, data.options)
+    self.postMessage({ blob })
+  } catch (error) {
+    self.postMessage({ error: error.message })
+  }
+}
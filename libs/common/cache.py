@@ -0,0 +1,523 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Async key-value cache of byte values shared by all cache tiers."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a value, optionally expiring after ttl seconds."""
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent; returns True if it was stored."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key if present."""
+
+    @abstractmethod
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        """Remove a key only if it holds value; returns True if it was removed."""
+
+    async def close(self) -> None:
+        """Release resources held by the backend (none by default)."""
+        return
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache of byte values bounded by total size, with per-entry TTL."""
+
+    def __init__(self, max_bytes: int, default_ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.current_bytes = 0
+
+        # key -> (expires_at or None, value)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and time.time() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries to stay under max_bytes."""
+        if len(value) > self.max_bytes:
+            return
+
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, value)
+            self.current_bytes += len(value)
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent or expired."""
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            self._remove(key)
+
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        """Remove a key only if it holds value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != value:
+                return False
+            self._remove(key)
+            return True
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= len(entry[1])
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache tier backed by SQLite so entries survive restarts.
+
+    Total stored bytes are bounded; the least recently accessed rows are dropped first.
+    """
+
+    def __init__(self, path: str, max_bytes: int, default_ttl: Optional[float] = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._conn.commit()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value or None if missing or expired."""
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a value and trim the table back under max_bytes."""
+        if len(value) > self.max_bytes:
+            return
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent or expired."""
+        return await asyncio.to_thread(self._add, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        await asyncio.to_thread(self._execute, "DELETE FROM cache WHERE key = ?", (key,))
+
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        """Remove a key only if it holds value."""
+        removed = await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM cache WHERE key = ? AND value = ?",
+            (key, sqlite3.Binary(value)),
+        )
+        return removed == 1
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and now >= expires_at:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return bytes(value)
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        now = time.time()
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = now + ttl if ttl is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), len(value), expires_at, now),
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total > self.max_bytes:
+                # Walk rows from least recently accessed until enough bytes are freed
+                excess = total - self.max_bytes
+                stale = []
+                for row_key, size in self._conn.execute(
+                    "SELECT key, size FROM cache ORDER BY accessed_at ASC"
+                ):
+                    if excess <= 0:
+                        break
+                    stale.append((row_key,))
+                    excess -= size
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", stale)
+            self._conn.commit()
+
+    def _add(self, key: str, value: bytes, ttl: Optional[float]) -> bool:
+        now = time.time()
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = now + ttl if ttl is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                (key, now),
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), len(value), expires_at, now),
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.rowcount
+
+
+class RedisClient:
+    """Pooled connections to a Redis-protocol (RESP2) server over asyncio streams."""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        pool_size: int = 8,
+        timeout: float = 2.0
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+
+        self._pool: "asyncio.LifoQueue[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]" = (
+            asyncio.LifoQueue()
+        )
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        while not self._pool.empty():
+            _, writer = self._pool.get_nowait()
+            writer.close()
+
+    async def _command(self, *args: bytes, block: float = 0.0) -> Any:
+        """Run one command; block is added to the timeout for blocking commands."""
+        async with self._slots:
+            reader, writer = await self._acquire()
+            try:
+                reply = await asyncio.wait_for(
+                    self._roundtrip(reader, writer, args), self.timeout + block
+                )
+            except BaseException:
+                # The stream may hold a partial reply; never reuse it
+                writer.close()
+                raise
+            self._pool.put_nowait((reader, writer))
+            return reply
+
+    async def _acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        while not self._pool.empty():
+            reader, writer = self._pool.get_nowait()
+            if not writer.is_closing():
+                return reader, writer
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            if self.password:
+                await asyncio.wait_for(
+                    self._roundtrip(reader, writer, (b"AUTH", self.password.encode("utf-8"))),
+                    self.timeout
+                )
+            if self.db:
+                await asyncio.wait_for(
+                    self._roundtrip(reader, writer, (b"SELECT", str(self.db).encode("ascii"))),
+                    self.timeout
+                )
+        except BaseException:
+            # Not yet in the pool, so nothing else would close it
+            writer.close()
+            raise
+        return reader, writer
+
+    async def _roundtrip(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        args: Tuple[bytes, ...]
+    ) -> Any:
+        writer.write(encode_resp_command(*args))
+        await writer.drain()
+        return await read_resp_reply(reader)
+
+
+# Compare-and-delete in one step, so a value can only be removed by whoever wrote it
+DELETE_IF_SCRIPT = (
+    b"if redis.call('GET', KEYS[1]) == ARGV[1] then "
+    b"return redis.call('DEL', KEYS[1]) else return 0 end"
+)
+
+
+class RedisCache(RedisClient, CacheBackend):
+    """
+    Networked cache tier speaking the Redis protocol (RESP2) over asyncio streams.
+
+    Only GET, SET (with PX/NX), DEL and one EVAL script (compare-and-delete) are
+    used, so any Redis-compatible server with Lua scripting works.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        default_ttl: Optional[float] = None,
+        key_prefix: str = "judgy:",
+        pool_size: int = 8,
+        timeout: float = 2.0
+    ):
+        super().__init__(host, port, db, password, pool_size, timeout)
+        self.default_ttl = default_ttl
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value or None if missing or expired."""
+        return await self._command(b"GET", self._key(key))
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a value with an optional TTL."""
+        await self._command(b"SET", self._key(key), value, *self._expiry_args(ttl))
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent (SET NX)."""
+        reply = await self._command(
+            b"SET", self._key(key), value, *self._expiry_args(ttl), b"NX"
+        )
+        return reply == b"OK"
+
+    async def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        await self._command(b"DEL", self._key(key))
+
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        """Remove a key only if it holds value (atomic, via a Lua script)."""
+        reply = await self._command(b"EVAL", DELETE_IF_SCRIPT, b"1", self._key(key), value)
+        return reply == 1
+
+    def _key(self, key: str) -> bytes:
+        return f"{self.key_prefix}{key}".encode("utf-8")
+
+    def _expiry_args(self, ttl: Optional[float]) -> List[bytes]:
+        ttl = ttl if ttl is not None else self.default_ttl
+        if ttl is None:
+            return []
+        return [b"PX", str(max(int(ttl * 1000), 1)).encode("ascii")]
+
+
+def encode_resp_command(*args: bytes) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_resp_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP reply; error replies are raised as RuntimeError."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by cache server")
+
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b"+":
+        return body
+    if prefix == b"-":
+        raise RuntimeError(f"Cache server error: {body.decode('utf-8', 'replace')}")
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await read_resp_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Malformed reply from cache server: {line!r}")
+
+
+class TieredCache(CacheBackend):
+    """
+    Memory tier in front of a slower (disk or shared) tier.
+
+    Hits in the slower tier are promoted into memory; add() is decided by the slower
+    tier so it acts as a lock across every process sharing that tier. Tiers nest:
+    ``TieredCache(memory, TieredCache(sqlite, shared))`` keeps a local disk tier
+    under memory and over the shared one.
+    """
+
+    def __init__(self, memory: CacheBackend, disk: Optional[CacheBackend] = None):
+        self.memory = memory
+        self.disk = disk
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Look up the memory tier first, then the disk tier (errors there count as misses)."""
+        value = await self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+
+        try:
+            value = await self.disk.get(key)
+        except (sqlite3.Error, OSError, RuntimeError, asyncio.TimeoutError) as e:
+            # A failing slower tier degrades to a miss
+            logger.error(f"Cache read failed for {key}: {e}")
+            return None
+        if value is not None:
+            await self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Write through to every tier."""
+        await self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                await self.disk.set(key, value, ttl)
+            except (sqlite3.Error, OSError, RuntimeError, asyncio.TimeoutError) as e:
+                logger.error(f"Cache write failed for {key}: {e}")
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store a value only if absent, deferring to the slower tier when present."""
+        if self.disk is None:
+            return await self.memory.add(key, value, ttl)
+        return await self.disk.add(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        """Remove a key from every tier."""
+        await self.memory.delete(key)
+        if self.disk is not None:
+            await self.disk.delete(key)
+
+    async def delete_if(self, key: str, value: bytes) -> bool:
+        """Remove a key only if it holds value, deciding in the slower tier when present."""
+        removed = await self.memory.delete_if(key, value)
+        if self.disk is None:
+            return removed
+        return await self.disk.delete_if(key, value)
+
+    async def close(self) -> None:
+        """Close every tier."""
+        await self.memory.close()
+        if self.disk is not None:
+            await self.disk.close()
+
+
+def create_cache_backend(
+    url: str,
+    max_bytes: int = 64 * 1024 * 1024,
+    default_ttl: Optional[float] = None
+) -> CacheBackend:
+    """
+    Build a cache backend from a URL.
+
+    Supported forms: ``memory://``, ``sqlite:///path/to/file.sqlite3`` and
+    ``redis://[:password@]host[:port][/db]``.
+
+    Args:
+        url: Backend URL
+        max_bytes: Size bound for the memory and SQLite backends
+        default_ttl: TTL applied when a write does not specify one
+
+    Returns:
+        Cache backend instance
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryCache(max_bytes=max_bytes, default_ttl=default_ttl)
+    if parsed.scheme == "sqlite":
+        return SQLiteCache(path=unquote(parsed.path), max_bytes=max_bytes, default_ttl=default_ttl)
+    if parsed.scheme == "redis":
+        db = parsed.path.lstrip("/")
+        return RedisCache(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            default_ttl=default_ttl
+        )
+    raise ValueError(f"Unsupported cache backend URL: {url}")
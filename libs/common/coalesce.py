@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+from libs.common.cache import CacheBackend
+from libs.common.deadline import DeadlineExceededError, current_deadline
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Collapses concurrent calls sharing a key into one execution within a process.
+
+    The shared computation runs in its own task under the deadline of the caller
+    that started it, so the caller can be cancelled without failing the others.
+    A caller with a later deadline (or none) whose shared run hit that earlier
+    deadline starts the work again under its own. The computation is cancelled
+    once every caller has gone.
+    """
+
+    def __init__(self) -> None:
+        # key -> (task, deadline it runs under)
+        self._inflight: Dict[str, Tuple["asyncio.Task[T]", Optional[float]]] = {}
+        self._waiters: Dict[str, int] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a computation for key is currently running."""
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn once per key; concurrent callers with the same key share its outcome.
+
+        Args:
+            key: Deduplication key
+            fn: Coroutine factory producing the result
+
+        Returns:
+            Result of the (possibly shared) call
+        """
+        deadline = current_deadline()
+        while True:
+            entry = self._inflight.get(key)
+            if entry is None:
+                task = asyncio.create_task(fn())
+                entry = self._inflight[key] = (task, deadline)
+                task.add_done_callback(lambda done: self._forget(key, done))
+            task, task_deadline = entry
+
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            try:
+                # Shield so a cancelled caller does not cancel the shared computation
+                return await asyncio.shield(task)
+            except DeadlineExceededError:
+                if task_deadline is None or (deadline is not None and deadline <= task_deadline):
+                    raise
+                # Only the starting caller's deadline passed; run again under ours
+            finally:
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    del self._waiters[key]
+                    if not task.done():
+                        # Nobody is waiting for the result any more
+                        task.cancel()
+
+    def _forget(self, key: str, task: "asyncio.Task[T]") -> None:
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when nobody else was waiting
+            task.exception()
+
+
+class CoalescingCache:
+    """
+    Read-through cache where concurrent misses for a key are computed once.
+
+    Within a process, callers are deduplicated with SingleFlight. Across processes
+    sharing the backend, a short-lived lock key (set with add) elects one computing
+    node while the others poll for its result. Backend errors fail open: the value
+    is computed locally rather than failing the request.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        lock_ttl: float = 30.0,
+        poll_interval: float = 0.05
+    ):
+        self.backend = backend
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._flight: SingleFlight[Optional[bytes]] = SingleFlight()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[bytes]]],
+        ttl: Optional[float] = None
+    ) -> Optional[bytes]:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Coroutine factory; returning None means "do not cache"
+            ttl: TTL for the stored value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = await self._safe_get(key)
+        if value is not None:
+            return value
+        return await self._flight.do(key, lambda: self._compute_once(key, compute, ttl))
+
+    async def _compute_once(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[bytes]]],
+        ttl: Optional[float]
+    ) -> Optional[bytes]:
+        lock_key = f"lock:{key}"
+        # Identifies this holder, so an expired lock taken over by another node is not released
+        token = uuid.uuid4().hex.encode("ascii")
+        give_up_at = time.monotonic() + self.lock_ttl
+
+        while True:
+            if await self._safe_add(lock_key, token):
+                try:
+                    # Another node may have finished between our miss and the lock
+                    value = await self._safe_get(key)
+                    if value is None:
+                        value = await compute()
+                        if value is not None:
+                            await self._safe_set(key, value, ttl)
+                    return value
+                finally:
+                    await self._safe_release(lock_key, token)
+
+            value = await self._safe_get(key)
+            if value is not None:
+                return value
+            if time.monotonic() >= give_up_at:
+                logger.warning(f"Lock holder for {key} did not finish, computing locally")
+                return await compute()
+            await asyncio.sleep(self.poll_interval)
+
+    async def _safe_get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Cache get failed for {key}: {e}")
+            return None
+
+    async def _safe_set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        try:
+            await self.backend.set(key, value, ttl)
+        except Exception as e:
+            logger.error(f"Cache set failed for {key}: {e}")
+
+    async def _safe_add(self, lock_key: str, token: bytes) -> bool:
+        try:
+            return await self.backend.add(lock_key, token, ttl=self.lock_ttl)
+        except Exception as e:
+            # Without a working lock, behave as the only node
+            logger.error(f"Cache lock failed for {lock_key}: {e}")
+            return True
+
+    async def _safe_release(self, lock_key: str, token: bytes) -> None:
+        try:
+            await self.backend.delete_if(lock_key, token)
+        except Exception as e:
+            logger.error(f"Cache unlock failed for {lock_key}: {e}")
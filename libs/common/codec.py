@@ -0,0 +1,226 @@
+import base64
+import io
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+from PIL import Image
+from libs.common.image_probe import probe_image_header
+
+
+# Pixels are used as stored, matching the previous PIL-based decoding (EXIF
+# orientation is not applied)
+_DECODE_FLAGS = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+
+# libjpeg can scale by 1/2, 1/4 and 1/8 while decoding (IDCT scaling)
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8 | cv2.IMREAD_IGNORE_ORIENTATION),
+    (4, cv2.IMREAD_REDUCED_COLOR_4 | cv2.IMREAD_IGNORE_ORIENTATION),
+    (2, cv2.IMREAD_REDUCED_COLOR_2 | cv2.IMREAD_IGNORE_ORIENTATION),
+)
+
+
+class ImageCodecError(ValueError):
+    """Raised when image data cannot be decoded or encoded."""
+
+
+def fit_size(width: int, height: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    """
+    Largest size within max_width x max_height that keeps the aspect ratio.
+
+    Images already within the bounds keep their size (never upscaled).
+
+    Args:
+        width: Source width
+        height: Source height
+        max_width: Maximum width
+        max_height: Maximum height
+
+    Returns:
+        Tuple of (width, height)
+    """
+    if width <= max_width and height <= max_height:
+        return width, height
+    scale = min(max_width / width, max_height / height)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def jpeg_reduction_factor(
+    width: int,
+    height: int,
+    max_width: int,
+    max_height: int
+) -> int:
+    """
+    Largest DCT scale denominator that keeps the decode at least as large as the target.
+
+    Args:
+        width: Full-resolution width
+        height: Full-resolution height
+        max_width: Target maximum width
+        max_height: Target maximum height
+
+    Returns:
+        1, 2, 4 or 8
+    """
+    target_width, target_height = fit_size(width, height, max_width, max_height)
+    for factor, _ in _REDUCED_FLAGS:
+        if width // factor >= target_width and height // factor >= target_height:
+            return factor
+    return 1
+
+
+def resize_to_fit(image: np.ndarray, max_width: int, max_height: int) -> np.ndarray:
+    """
+    Downscale a BGR array to fit within the bounds using area interpolation.
+
+    Args:
+        image: BGR numpy array
+        max_width: Maximum width
+        max_height: Maximum height
+
+    Returns:
+        Resized array, or the input if it already fits
+    """
+    height, width = image.shape[:2]
+    new_width, new_height = fit_size(width, height, max_width, max_height)
+    if (new_width, new_height) == (width, height):
+        return image
+    return cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
+
+def decode_bgr(
+    data: bytes,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None
+) -> np.ndarray:
+    """
+    Decode image bytes into a contiguous BGR array, optionally bounded in size.
+
+    JPEGs are decoded directly at a reduced scale when the target allows it, so
+    the full-resolution frame is never materialized. Any remaining downscale uses
+    area interpolation.
+
+    Args:
+        data: Encoded image (JPEG, PNG, WEBP)
+        max_width: Maximum output width (None = no limit)
+        max_height: Maximum output height (None = no limit)
+
+    Returns:
+        C-contiguous uint8 array of shape (height, width, 3) in BGR order
+
+    Raises:
+        ImageCodecError: If the bytes are not a decodable image
+    """
+    factor = 1
+    bounded = max_width is not None or max_height is not None
+    if bounded:
+        max_width = max_width or np.iinfo(np.int32).max
+        max_height = max_height or np.iinfo(np.int32).max
+        header = probe_image_header(data)
+        if header is not None and header.format == "JPEG":
+            factor = jpeg_reduction_factor(header.width, header.height, max_width, max_height)
+
+    image = decode_bgr_reduced(data, factor)
+    if bounded:
+        image = resize_to_fit(image, max_width, max_height)
+    return image
+
+
+def decode_bgr_reduced(data: bytes, factor: int) -> np.ndarray:
+    """
+    Decode a JPEG at 1/factor of its resolution using libjpeg DCT scaling.
+
+    Args:
+        data: Encoded image; other formats are fully decoded, then scaled by OpenCV
+        factor: 1, 2, 4 or 8
+
+    Returns:
+        C-contiguous uint8 BGR array
+
+    Raises:
+        ImageCodecError: If the bytes are not a decodable image
+    """
+    flags = dict(_REDUCED_FLAGS).get(factor, _DECODE_FLAGS)
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+    if image is None:
+        raise ImageCodecError("Could not decode image data")
+    return image
+
+
+def decode_base64_bgr(
+    image_base64: str,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None
+) -> np.ndarray:
+    """
+    Decode a base64 image into a contiguous BGR array (see decode_bgr).
+
+    Args:
+        image_base64: Base64 encoded image
+        max_width: Maximum output width (None = no limit)
+        max_height: Maximum output height (None = no limit)
+
+    Returns:
+        C-contiguous uint8 BGR array
+    """
+    return decode_bgr(base64.b64decode(image_base64), max_width, max_height)
+
+
+def fit_pil_image(image: Image.Image, max_width: int, max_height: int) -> Image.Image:
+    """
+    Load an opened PIL image as RGB, bounded to max_width x max_height.
+
+    For JPEGs, draft mode makes libjpeg decode at the smallest DCT scale that is
+    still at least the target size; the rest is box-filtered (area average) down.
+
+    Args:
+        image: PIL image returned by Image.open (pixels not yet loaded)
+        max_width: Maximum output width
+        max_height: Maximum output height
+
+    Returns:
+        RGB PIL Image
+    """
+    target = fit_size(image.width, image.height, max_width, max_height)
+    if image.format == "JPEG" and target != image.size:
+        image.draft("RGB", target)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if image.size != target:
+        image = image.resize(target, Image.Resampling.BOX)
+    return image
+
+
+def decode_pil(data: bytes, max_width: int, max_height: int) -> Image.Image:
+    """
+    Decode image bytes into an RGB PIL image that fits within the bounds.
+
+    Args:
+        data: Encoded image (JPEG, PNG, WEBP)
+        max_width: Maximum output width
+        max_height: Maximum output height
+
+    Returns:
+        RGB PIL Image
+    """
+    return fit_pil_image(Image.open(io.BytesIO(data)), max_width, max_height)
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 90) -> bytes:
+    """
+    Encode a BGR array as JPEG.
+
+    Args:
+        image: BGR numpy array
+        quality: JPEG quality (0-100)
+
+    Returns:
+        JPEG bytes
+
+    Raises:
+        ImageCodecError: If encoding fails
+    """
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ImageCodecError("Could not encode image as JPEG")
+    return buffer.tobytes()
@@ -1,3 +1,4 @@
+from pathlib import Path
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
@@ -21,6 +22,20 @@ class ServiceConfig(BaseSettings):
     port: int = 8000
     reload: bool = False
     workers: int = 1
+    # Unix domain socket to bind instead of host:port (single-node deployments);
+    # clients then use "unix://<path>" service URLs
+    uds: Optional[str] = None
+    
+    # "services" (one process per service, HTTP between them) or "monolith"
+    # (services.monolith runs every service in one process with direct calls)
+    deployment_mode: str = "services"
+    
+    # How the image processing orchestrator reaches the analyzers: "push" (HTTP
+    # requests) or "queue" (analyzers pull jobs from work_queue_url, one of
+    # memory://, sqlite:///path or redis://host:port/db)
+    dispatch_mode: str = "push"
+    work_queue_url: str = "memory://"
+    work_queue_concurrency: int = 1  # jobs an analyzer worker runs at once
     
     # Logging
     log_level: str = "INFO"
@@ -35,6 +50,36 @@ class ServiceConfig(BaseSettings):
     # Model Settings
     model_cache_dir: str = "./model_cache"
     device: str = "cpu"  # cpu, cuda, mps (for Apple Silicon)
+    
+    # Service state (e.g. the disk result cache); relative data file paths resolve here
+    data_dir: str = "./data"
+    
+    # Service-to-service payloads: msgpack when installed (else orjson/JSON), and
+    # models built without validation; set internal_validation to validate every hop
+    internal_msgpack: bool = True
+    internal_validation: bool = False
+    # Face geometry travels between services as a packed float32 array
+    internal_packed_geometry: bool = True
+    
+    # Shared cache tier across replicas, e.g. "redis://cache:6379/0" (None = per-process only)
+    shared_cache_url: Optional[str] = None
+    shared_cache_lock_ttl_seconds: float = 60.0
+    
+    # Orchestrators probe their downstream services in the background and serve
+    # /health from the last results
+    health_poll_interval_seconds: float = 5.0
+    health_probe_timeout_seconds: float = 2.0
+    
+    # Inference services answer health, readiness and metrics on control_port from
+    # a separate thread (0 = off); readiness fails once readiness_max_in_flight
+    # requests are in inference
+    control_port: int = 0
+    readiness_max_in_flight: int = 4
+    
+    def data_path(self, path: str) -> Path:
+        """Resolve a data file path against data_dir unless it is absolute."""
+        resolved = Path(path).expanduser()
+        return resolved if resolved.is_absolute() else Path(self.data_dir) / resolved
 
 
 class MainOrchestratorConfig(ServiceConfig):
@@ -46,13 +91,86 @@ class MainOrchestratorConfig(ServiceConfig):
     # Service URLs
     image_processing_orchestrator_url: str = "http://localhost:8001"
     llm_inferencer_url: str = "http://localhost:8007"
+    # Health probes go to the LLM inferencer's control port (its CONTROL_PORT; 0 =
+    # probe the service URL), which answers while inference keeps it busy;
+    # llm_inferencer_health_url overrides the probe base URL
+    llm_inferencer_control_port: int = 9007
+    llm_inferencer_health_url: Optional[str] = None
     
     # Storage
     upload_dir: str = "./uploads"
     temp_dir: str = "./temp"
     
-    # Rate Limiting
+    # Rate Limiting (per client: remote address; 0 = off)
     rate_limit_per_minute: int = 10
+    rate_limit_burst: int = 5  # requests a client may make back to back
+    # Addresses of reverse proxies allowed to name the client in X-Client-Id; the
+    # header is ignored from anyone else
+    trusted_proxies: list[str] = []
+
+    # Admission control: pipeline runs in flight and waiting; requests that cannot
+    # finish within request_timeout (batch: admission_batch_deadline_seconds) get 503
+    admission_max_in_flight: int = 8
+    admission_max_queue: int = 64
+    admission_batch_deadline_seconds: float = 300.0
+    admission_initial_service_time_seconds: float = 5.0
+
+    # Perceptual-hash cache for near-duplicate uploads
+    phash_cache_enabled: bool = True
+    phash_cache_max_entries: int = 1024
+    phash_cache_max_distance: int = 4  # bits out of 64
+    phash_cache_ttl_seconds: int = 3600
+    phash_cache_reuse_roast: bool = False
+
+    # Upload ingestion limits (checked from the header before decoding)
+    upload_chunk_size: int = 64 * 1024
+    max_image_dimension: int = 12000  # pixels per side
+    max_image_pixels: int = 50_000_000
+
+    # Images sent downstream are at most this size; compliant RGB JPEGs up to
+    # passthrough_max_bytes are forwarded without being re-encoded
+    downstream_max_width: int = 1920
+    downstream_max_height: int = 1080
+    passthrough_max_bytes: int = 2 * 1024 * 1024
+    # JPEG quality suggested to clients that resize before uploading (0-1)
+    client_jpeg_quality: float = 0.85
+
+    # Upload decoding/resizing/re-encoding pool (keeps CPU work off the event loop)
+    preprocess_workers: Optional[int] = None  # None = one per CPU core
+    preprocess_max_queue: int = 64
+    preprocess_use_processes: bool = False
+
+    # Idempotency-Key replay window for /api/v1/analyze
+    idempotency_ttl_seconds: int = 24 * 3600
+    idempotency_max_bytes: int = 32 * 1024 * 1024  # 32MB (in-memory store only)
+
+    # Asynchronous jobs (/api/v1/jobs): pipelines run in the background, results
+    # are kept for polling and optionally POSTed to a callback URL
+    jobs_max_concurrent: int = 4
+    jobs_max_entries: int = 1000
+    jobs_ttl_seconds: int = 3600
+    jobs_callback_timeout_seconds: float = 10.0
+    jobs_callback_retries: int = 3
+
+    # Hosts job callbacks and batch manifest downloads may reach (empty = any host;
+    # ".example.com" also matches subdomains). URLs resolving to private, loopback
+    # or link-local addresses are refused unless outbound_allow_private_networks is set
+    outbound_allowed_hosts: list[str] = []
+    outbound_allow_private_networks: bool = False
+
+    # Batch analysis (/api/v1/analyze/batch)
+    batch_max_items: int = 100
+    batch_max_request_bytes: int = 100 * 1024 * 1024  # whole multipart body, 100MB
+    batch_max_concurrent: int = 4  # pipelines (and manifest downloads) in flight per batch
+    batch_download_timeout_seconds: float = 30.0
+
+    # Video / burst roasts (/api/v1/analyze/burst): frames are sampled, near-duplicates
+    # dropped, and a few sharp keyframes tiled into one image for the pipeline
+    max_video_bytes: int = 50 * 1024 * 1024  # 50MB
+    burst_max_images: int = 20
+    burst_max_sampled_frames: int = 32
+    burst_duplicate_max_distance: int = 6  # dHash bits out of 64
+    burst_keyframes: int = 4
 
 
 class ImageProcessingOrchestratorConfig(ServiceConfig):
@@ -64,6 +182,13 @@ class ImageProcessingOrchestratorConfig(ServiceConfig):
     # Service URLs
     face_analysis_url: str = "http://localhost:8002"
     vlm_scene_analysis_url: str = "http://localhost:8008"
+    # Health probes go to the analyzers' control ports (their CONTROL_PORT; 0 =
+    # probe the service URL), which answer while inference keeps them busy; the
+    # *_health_url settings override the probe base URLs
+    face_analysis_control_port: int = 9002
+    vlm_scene_analysis_control_port: int = 9008
+    face_analysis_health_url: Optional[str] = None
+    vlm_scene_analysis_health_url: Optional[str] = None
 
     # Deprecated service URLs (will be removed after VLM integration)
     body_analysis_url: str = "http://localhost:8003"
@@ -75,12 +200,28 @@ class ImageProcessingOrchestratorConfig(ServiceConfig):
     max_concurrent_requests: int = 5
     service_timeout: int = 30
 
+    # Analyzer result cache (keyed by image content hash + analyzer name and version)
+    result_cache_enabled: bool = True
+    result_cache_ttl_seconds: int = 24 * 3600
+    result_cache_memory_max_bytes: int = 64 * 1024 * 1024  # 64MB
+    # Local disk tier under data_dir; with shared_cache_url set it sits between
+    # memory and the shared tier (None = skip it)
+    result_cache_disk_path: Optional[str] = "analyzer_results.sqlite3"
+    result_cache_disk_max_bytes: int = 512 * 1024 * 1024  # 512MB
+    cache_face_analysis: bool = True
+    cache_vlm_scene_analysis: bool = True
+
+    # Bump an analyzer's version when its model or prompt changes to invalidate cached results
+    face_analysis_version: str = "1"
+    vlm_scene_analysis_version: str = "1"
+
 
 class FaceAnalysisConfig(ServiceConfig):
     """Configuration for Face Analysis service."""
     
     service_name: str = "face-analysis"
     port: int = 8002
+    control_port: int = 9002
     
     # Model paths
     yunet_model_path: Optional[str] = None
@@ -89,6 +230,15 @@ class FaceAnalysisConfig(ServiceConfig):
     hsemotion_model_path: Optional[str] = None
     attractiveness_model_path: Optional[str] = None
 
+    # First-pass face detection on a small preview of large JPEGs (the EXIF
+    # thumbnail or a DCT-reduced decode); only the face region is then decoded
+    # at the resolution the attribute models need
+    face_detection_fast_path: bool = False
+    face_detection_preview_size: int = 640  # max preview side for reduced decodes
+    face_detection_use_exif_thumbnail: bool = True
+    face_detection_min_thumbnail_size: int = 160  # min thumbnail side to trust
+    face_crop_min_size: int = 224  # min face side (pixels) kept for attribute models
+
 
 class BodyAnalysisConfig(ServiceConfig):
     """Configuration for Body Analysis service."""
@@ -139,6 +289,8 @@ class LLMInferencerConfig(ServiceConfig):
     
     service_name: str = "llm-inferencer"
     port: int = 8007
+    control_port: int = 9007
+    readiness_max_in_flight: int = 2  # generations run one at a time
     
     # Model settings
     model_name: str = "mlx-community/Llama-3.2-3B-Instruct-4bit"
@@ -154,3 +306,14 @@ class LLMInferencerConfig(ServiceConfig):
         "Use the provided image features to craft personalized roasts."
     )
 
+
+
+class MonolithConfig(ServiceConfig):
+    """Configuration for the single-process deployment (services.monolith)."""
+    
+    service_name: str = "judgy-buddy-monolith"
+    port: int = 8000
+    deployment_mode: str = "monolith"
+    
+    # Internal service routers are mounted under this prefix for debugging
+    internal_routes_prefix: str = "/internal"
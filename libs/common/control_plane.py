@@ -0,0 +1,147 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from libs.common.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoadTracker:
+    """Counts requests inside inference handlers (running or waiting their turn)."""
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: In-flight requests at which the service reports itself not ready
+        """
+        self.capacity = capacity
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def saturated(self) -> bool:
+        return self._in_flight >= self.capacity
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count the block as one in-flight request."""
+        with self._lock:
+            self._in_flight += 1
+            metrics.set_gauge("inference_in_flight", self._in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                metrics.set_gauge("inference_in_flight", self._in_flight)
+
+
+class ControlPlaneServer:
+    """
+    Serves health, readiness and metrics from a dedicated thread.
+
+    Inference shares the event loop with the service API, so a long generation
+    or a blocking model call delays /health on the main port and orchestrators
+    mark a busy service as down. This listener is a stdlib HTTP server on its
+    own port and thread that only reads in-memory state, so it answers while
+    the event loop is busy.
+
+    - GET /health: liveness; 200 while the process is up
+    - GET /ready: 200 when the models are loaded and the service is below
+      capacity, otherwise 503 with the reason
+    - GET /metrics: counters and gauges
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        service_name: str,
+        service_version: str,
+        models_loaded: Callable[[], bool],
+        load: LoadTracker
+    ):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            service_name: Reported in health responses
+            service_version: Reported in health responses
+            models_loaded: Returns whether the service's models are loaded
+            load: In-flight inference requests of the service
+        """
+        self.host = host
+        self.port = port
+        self.service_name = service_name
+        self.service_version = service_version
+        self.models_loaded = models_loaded
+        self.load = load
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Bind the port and serve in a daemon thread."""
+        routes = {"/health": self.health, "/ready": self.ready, "/metrics": self.metrics}
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler(routes))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=f"{self.service_name}-control-plane", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Control plane (health, readiness, metrics) listening on {self.host}:{self.port}")
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def health(self) -> Tuple[int, Dict[str, Any]]:
+        models_loaded = self.models_loaded()
+        return 200, {
+            "status": "healthy" if models_loaded else "degraded",
+            "service": self.service_name,
+            "version": self.service_version,
+            "models_loaded": models_loaded,
+        }
+
+    def ready(self) -> Tuple[int, Dict[str, Any]]:
+        body = {"ready": True, "in_flight": self.load.in_flight, "capacity": self.load.capacity}
+        if not self.models_loaded():
+            body.update(ready=False, reason="models not loaded")
+        elif self.load.saturated:
+            body.update(ready=False, reason="at capacity")
+        return (200 if body["ready"] else 503), body
+
+    def metrics(self) -> Tuple[int, Dict[str, Any]]:
+        return 200, metrics.snapshot()
+
+
+def _handler(routes: Dict[str, Callable[[], Tuple[int, Dict[str, Any]]]]) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            route = routes.get(self.path.split("?", 1)[0])
+            status, body = route() if route else (404, {"detail": "Not Found"})
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Probes arrive every few seconds; keep them out of the service log
+            logger.debug(format % args)
+
+    return Handler
@@ -0,0 +1,231 @@
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import time
+from contextlib import contextmanager, suppress
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+from libs.common.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Absolute deadline of the user request a call belongs to (Unix time, seconds).
+# Absolute rather than remaining time so queueing between hops is counted;
+# assumes the services' clocks are kept in sync (NTP).
+DEADLINE_HEADER = "X-Request-Deadline"
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceededError(Exception):
+    """Raised when the request's deadline passes before or during the work."""
+
+
+def parse_deadline(value: Optional[str]) -> Optional[float]:
+    """Deadline from a header value (None if missing or malformed)."""
+    if not value:
+        return None
+    try:
+        deadline = float(value)
+    except ValueError:
+        return None
+    return deadline if math.isfinite(deadline) else None
+
+
+def current_deadline() -> Optional[float]:
+    """Deadline of the request being handled (None if it has none)."""
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline (None if there is no deadline)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.time()
+
+
+def deadline_headers() -> Dict[str, str]:
+    """Headers carrying the current deadline to a downstream service."""
+    deadline = _deadline.get()
+    return {} if deadline is None else {DEADLINE_HEADER: f"{deadline:.3f}"}
+
+
+def check_deadline(work: str) -> None:
+    """
+    Refuse to start work once the deadline has passed.
+
+    Args:
+        work: Description of the work, for the error message
+
+    Raises:
+        DeadlineExceededError: If the current deadline has passed
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        metrics.increment("deadline_exceeded")
+        raise DeadlineExceededError(f"Request deadline passed before {work}")
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Run the block under deadline, or under the enclosing deadline if that is earlier."""
+    outer = _deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def until_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Await the result, cancelling the work when the current deadline passes.
+
+    Raises:
+        DeadlineExceededError: If the deadline passes first
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(left, 0.0))
+    except asyncio.TimeoutError:
+        metrics.increment("deadline_exceeded")
+        raise DeadlineExceededError("Request deadline passed")
+
+
+class _DisconnectWatch:
+    """
+    Passes request messages to the app and notices when the client goes away.
+
+    Once the body has been read, a watcher task waits for http.disconnect on
+    the app's behalf; later receive() calls by the app wait for that instead of
+    racing the watcher for messages.
+    """
+
+    def __init__(self, receive: Callable[[], Awaitable[Dict[str, Any]]]):
+        self._receive = receive
+        self.disconnected = asyncio.Event()
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def receive(self) -> Dict[str, Any]:
+        if self._watcher is not None:
+            await self.disconnected.wait()
+            return {"type": "http.disconnect"}
+        message = await self._receive()
+        if message["type"] == "http.disconnect":
+            self.disconnected.set()
+        elif not message.get("more_body", False):
+            self._watcher = asyncio.create_task(self._watch())
+        return message
+
+    async def _watch(self) -> None:
+        while (await self._receive())["type"] != "http.disconnect":
+            pass
+        self.disconnected.set()
+
+    def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware enforcing the request deadline of every HTTP request.
+
+    The deadline comes from the X-Request-Deadline header, or is set
+    default_timeout seconds after arrival at the front door. A request that
+    arrives after its deadline gets 504 without running. A handler still running
+    when the deadline passes or the client disconnects is cancelled, which
+    cancels the downstream calls and queued work it is waiting on.
+    """
+
+    def __init__(self, app: Callable, default_timeout: Optional[float] = None):
+        """
+        Args:
+            app: ASGI application
+            default_timeout: Seconds a request without a deadline header may take
+                (None = no deadline)
+        """
+        self.app = app
+        self.default_timeout = default_timeout
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = DEADLINE_HEADER.lower().encode("latin-1")
+        deadline = parse_deadline(next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name.lower() == header),
+            None
+        ))
+        if self.default_timeout is not None:
+            default = time.time() + self.default_timeout
+            deadline = default if deadline is None else min(deadline, default)
+
+        if deadline is not None and deadline <= time.time():
+            metrics.increment("deadline_exceeded_on_arrival")
+            await _send_timeout(send)
+            return
+
+        started = False
+
+        async def tracked_send(message: Dict[str, Any]) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        watch = _DisconnectWatch(receive)
+        with deadline_scope(deadline):
+            handler = asyncio.create_task(self.app(scope, watch.receive, tracked_send))
+        disconnected = asyncio.create_task(watch.disconnected.wait())
+        try:
+            timeout = None if deadline is None else deadline - time.time()
+            await asyncio.wait(
+                {handler, disconnected}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if handler.done():
+                handler.result()
+                return
+
+            handler.cancel()
+            with suppress(asyncio.CancelledError):
+                await handler
+            if watch.disconnected.is_set():
+                metrics.increment("requests_cancelled_on_disconnect")
+                logger.info(f"Client disconnected; cancelled {scope.get('path')}")
+            else:
+                metrics.increment("requests_cancelled_on_deadline")
+                logger.warning(f"Deadline passed; cancelled {scope.get('path')}")
+                if not started:
+                    await _send_timeout(send)
+        finally:
+            handler.cancel()
+            disconnected.cancel()
+            watch.close()
+
+
+async def _send_timeout(send: Callable) -> None:
+    body = json.dumps({
+        "detail": "Request deadline exceeded",
+        "status": "error",
+        "error_code": "DEADLINE_EXCEEDED"
+    }).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 504,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,75 @@
+import base64
+from typing import List, Tuple
+import numpy as np
+from libs.common.schemas import FaceDetection, PackedArray
+
+
+# YuNet output row: x, y, w, h, five (x, y) landmarks
+# (right eye, left eye, nose, right and left mouth corner), score
+YUNET_COLUMNS = 15
+
+
+def pack_array(array: np.ndarray) -> PackedArray:
+    """
+    Pack a numeric array as base64 little-endian float32 with its shape.
+
+    Args:
+        array: Array of any shape
+
+    Returns:
+        PackedArray
+    """
+    data = np.ascontiguousarray(array, dtype="<f4")
+    return PackedArray(
+        dtype="float32",
+        shape=list(data.shape),
+        data=base64.b64encode(data.tobytes()).decode("ascii")
+    )
+
+
+def unpack_array(packed: PackedArray) -> np.ndarray:
+    """
+    Decode a PackedArray into a (read-only) float32 numpy array.
+
+    Raises:
+        ValueError: If the dtype is unsupported or the data does not match the shape
+    """
+    if packed.dtype != "float32":
+        raise ValueError(f"Unsupported packed dtype: {packed.dtype}")
+    array = np.frombuffer(base64.b64decode(packed.data), dtype="<f4")
+    return array.reshape(packed.shape)
+
+
+def pack_detections(detections: np.ndarray) -> PackedArray:
+    """Pack an (N, 15) YuNet detection array."""
+    return pack_array(np.asarray(detections).reshape(-1, YUNET_COLUMNS))
+
+
+def unpack_detections(packed: PackedArray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split packed YuNet detections into their components.
+
+    Args:
+        packed: (N, 15) detections
+
+    Returns:
+        Tuple of boxes (N, 4) as [x, y, w, h], landmarks (N, 5, 2) and scores (N,)
+    """
+    detections = unpack_array(packed).reshape(-1, YUNET_COLUMNS)
+    return (
+        detections[:, :4],
+        detections[:, 4:14].reshape(-1, 5, 2),
+        detections[:, 14],
+    )
+
+
+def detections_to_faces(detections: np.ndarray) -> List[FaceDetection]:
+    """Expand an (N, 15) detection array into FaceDetection models."""
+    faces = []
+    for row in np.asarray(detections, dtype=np.float64).reshape(-1, YUNET_COLUMNS).tolist():
+        faces.append(FaceDetection(
+            bbox=row[:4],
+            confidence=min(max(row[14], 0.0), 1.0),
+            landmarks=[row[i:i + 2] for i in range(4, 14, 2)]
+        ))
+    return faces
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from libs.common.metrics import metrics
+from libs.common.schemas import DownstreamStatus
+
+
+logger = logging.getLogger(__name__)
+
+# Returns whether one downstream service is healthy
+Probe = Callable[[], Awaitable[bool]]
+
+
+class HealthPoller:
+    """
+    Probes downstream services in the background and caches their status.
+
+    Every interval, all probes run concurrently. /health answers from the last
+    snapshot, so load balancer polls cause no downstream calls and a hanging
+    dependency costs at most one probe timeout per round. Probes go through the
+    caller's transport, which keeps its pooled connections warm between requests.
+    """
+
+    def __init__(self, probes: Dict[str, Probe], interval: float, timeout: float):
+        """
+        Args:
+            probes: Probe per downstream service name
+            interval: Seconds between probe rounds
+            timeout: Seconds after which a probe counts as failed
+        """
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self._status: Dict[str, DownstreamStatus] = {name: DownstreamStatus() for name in probes}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start polling in the running event loop."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def current(self) -> Dict[str, DownstreamStatus]:
+        """Last snapshot; probes now if the poller is not running or has not completed a round."""
+        if not self.running or any(status.checked_at is None for status in self._status.values()):
+            await self.poll_once()
+        return dict(self._status)
+
+    async def poll_once(self) -> Dict[str, DownstreamStatus]:
+        """Probe every downstream service concurrently and update the snapshot."""
+        await asyncio.gather(*(self._probe(name, probe) for name, probe in self.probes.items()))
+        return dict(self._status)
+
+    async def _run(self) -> None:
+        while True:
+            await self.poll_once()
+            await asyncio.sleep(self.interval)
+
+    async def _probe(self, name: str, probe: Probe) -> None:
+        start = time.monotonic()
+        error = None
+        try:
+            healthy = bool(await asyncio.wait_for(probe(), self.timeout))
+        except asyncio.TimeoutError:
+            healthy, error = False, f"No answer within {self.timeout}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+        latency_ms = (time.monotonic() - start) * 1000
+
+        now = time.time()
+        previous = self._status[name]
+        changed = previous.healthy != healthy
+        if changed and previous.healthy is not None:
+            logger.warning(f"{name} is now {'healthy' if healthy else 'unhealthy'}")
+        self._status[name] = DownstreamStatus(
+            healthy=healthy,
+            latency_ms=latency_ms,
+            checked_at=now,
+            changed_at=now if changed else previous.changed_at,
+            error=error
+        )
+        metrics.set_gauge(f"health_{name}_up", int(healthy))
+        metrics.set_gauge(f"health_{name}_latency_ms", latency_ms)
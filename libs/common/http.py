@@ -0,0 +1,87 @@
+import re
+from typing import Any, Optional, Tuple
+from urllib.parse import urlsplit
+import aiohttp
+
+
+# Co-located services can be reached over a Unix domain socket instead of loopback
+# TCP, e.g. "unix:///run/judgy/face.sock". The socket path must end in ".sock";
+# anything after it is the request path.
+UNIX_SCHEME = "unix://"
+
+_UNIX_URL = re.compile(r"^unix://(?P<socket>.+?\.sock)(?P<path>/.*)?$")
+
+# Host sent in requests over a Unix socket (the connector ignores it)
+_UNIX_HOST_URL = "http://localhost"
+
+
+def split_unix_url(url: str) -> Tuple[Optional[str], str]:
+    """
+    Split a service URL into a Unix socket path and the HTTP URL to request.
+
+    Args:
+        url: http(s):// URL, or unix://<socket>.sock[/path]
+
+    Returns:
+        Tuple of (socket path or None, HTTP URL)
+
+    Raises:
+        ValueError: If a unix:// URL does not name a .sock file
+    """
+    if not url.startswith(UNIX_SCHEME):
+        return None, url
+    match = _UNIX_URL.match(url)
+    if match is None:
+        raise ValueError(f"Unix socket URLs must name a .sock file: {url}")
+    return match.group("socket"), _UNIX_HOST_URL + (match.group("path") or "/")
+
+
+def request_url(url: str) -> str:
+    """HTTP URL to pass to a session created by client_session() for this URL."""
+    return split_unix_url(url)[1]
+
+
+def control_plane_url(service_url: str, control_port: int) -> str:
+    """
+    Base URL of a service's control plane (health, readiness, metrics).
+
+    The control plane listens on control_port of the service's host over plain
+    HTTP. Unix socket URLs, and a control_port of 0 (control plane off), give
+    the service URL itself.
+
+    Args:
+        service_url: Service base URL
+        control_port: The service's CONTROL_PORT
+
+    Returns:
+        URL to probe for health
+    """
+    if not control_port or service_url.startswith(UNIX_SCHEME):
+        return service_url
+    host = urlsplit(service_url).hostname
+    if host is None:
+        return service_url
+    if ":" in host:
+        host = f"[{host}]"
+    return f"http://{host}:{control_port}"
+
+
+def client_session(url: str, **kwargs: Any) -> aiohttp.ClientSession:
+    """
+    Create a ClientSession able to reach the given service URL.
+
+    For unix:// URLs the session connects through an aiohttp UnixConnector, which
+    is bound to that one socket, so keep one session per socket path; requests
+    must then use request_url(url).
+
+    Args:
+        url: Service base or endpoint URL
+        **kwargs: Passed to aiohttp.ClientSession (e.g. timeout)
+
+    Returns:
+        aiohttp.ClientSession
+    """
+    socket_path, _ = split_unix_url(url)
+    if socket_path is not None:
+        kwargs["connector"] = aiohttp.UnixConnector(path=socket_path)
+    return aiohttp.ClientSession(**kwargs)
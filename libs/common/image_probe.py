@@ -0,0 +1,230 @@
+import struct
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """Format and dimensions read from an image header without decoding pixels."""
+
+    format: str
+    width: int
+    height: int
+
+
+# JPEG start-of-frame markers carrying the image dimensions (excludes DHT/JPG/DAC)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# IFD1 tags locating the embedded JPEG thumbnail (JPEGInterchangeFormat/Length)
+_EXIF_THUMBNAIL_OFFSET_TAG = 0x0201
+_EXIF_THUMBNAIL_LENGTH_TAG = 0x0202
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """
+    Identify a supported image format from its magic bytes.
+
+    Args:
+        data: Leading bytes of the file (at least 12 bytes)
+
+    Returns:
+        "JPEG", "PNG" or "WEBP", or None if unrecognized
+    """
+    if data[:3] == b"\xff\xd8\xff":
+        return "JPEG"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "PNG"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def probe_image_header(data: bytes) -> Optional[ImageHeader]:
+    """
+    Read format and dimensions from the leading bytes of an image.
+
+    Args:
+        data: Leading bytes of the file; may be a prefix of the full upload
+
+    Returns:
+        ImageHeader, or None if the format is unknown or more bytes are needed
+    """
+    image_format = sniff_format(data)
+    if image_format == "JPEG":
+        return _probe_jpeg(data)
+    if image_format == "PNG":
+        return _probe_png(data)
+    if image_format == "WEBP":
+        return _probe_webp(data)
+    return None
+
+
+def header_end(data: bytes) -> Optional[int]:
+    """
+    Number of leading bytes probe_image_header needs to read the dimensions.
+
+    Args:
+        data: Leading bytes of the file read so far
+
+    Returns:
+        Required length; while it exceeds len(data), more bytes are needed (for
+        JPEG the value grows as segments before the frame header arrive). None if
+        the format is unknown or the header is malformed
+    """
+    image_format = sniff_format(data)
+    if image_format == "JPEG":
+        return _scan_jpeg(data)
+    if image_format == "PNG":
+        return 24
+    if image_format == "WEBP":
+        return 30
+    return None
+
+
+def read_exif_thumbnail(data: bytes) -> Optional[bytes]:
+    """
+    Extract the JPEG thumbnail embedded in a JPEG's EXIF (APP1) segment.
+
+    Only the metadata segments are parsed; the main image is not decoded.
+
+    Args:
+        data: JPEG file contents
+
+    Returns:
+        Thumbnail JPEG bytes, or None if there is no embedded JPEG thumbnail
+    """
+    if sniff_format(data) != "JPEG":
+        return None
+    tiff = _find_exif_tiff(data)
+    if tiff is None or len(tiff) < 8:
+        return None
+
+    byte_order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if byte_order is None:
+        return None
+    try:
+        ifd0_offset = struct.unpack(byte_order + "I", tiff[4:8])[0]
+        ifd0_count = struct.unpack(byte_order + "H", tiff[ifd0_offset:ifd0_offset + 2])[0]
+        # The offset of IFD1 (thumbnail IFD) follows IFD0's 12-byte entries
+        next_offset = ifd0_offset + 2 + 12 * ifd0_count
+        ifd1_offset = struct.unpack(byte_order + "I", tiff[next_offset:next_offset + 4])[0]
+        if ifd1_offset == 0:
+            return None
+
+        entries = _read_ifd_longs(tiff, ifd1_offset, byte_order)
+    except struct.error:
+        return None
+
+    offset = entries.get(_EXIF_THUMBNAIL_OFFSET_TAG)
+    length = entries.get(_EXIF_THUMBNAIL_LENGTH_TAG)
+    if not offset or not length or offset + length > len(tiff):
+        return None
+    thumbnail = tiff[offset:offset + length]
+    return thumbnail if sniff_format(thumbnail) == "JPEG" else None
+
+
+def _find_exif_tiff(data: bytes) -> Optional[bytes]:
+    """Return the TIFF structure inside the APP1 Exif segment, if any."""
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in (0xD9, 0xDA) or marker in _JPEG_SOF_MARKERS:
+            # APP segments precede the frame header and scan data
+            return None
+        segment_length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+        segment = data[offset + 4:offset + 2 + segment_length]
+        if marker == 0xE1 and segment[:6] == b"Exif\x00\x00":
+            return segment[6:]
+        offset += 2 + segment_length
+    return None
+
+
+def _read_ifd_longs(tiff: bytes, ifd_offset: int, byte_order: str) -> Dict[int, int]:
+    """Read SHORT/LONG scalar values of an IFD, keyed by tag."""
+    count = struct.unpack(byte_order + "H", tiff[ifd_offset:ifd_offset + 2])[0]
+    values: Dict[int, int] = {}
+    for index in range(count):
+        entry = tiff[ifd_offset + 2 + 12 * index:ifd_offset + 14 + 12 * index]
+        tag, value_type = struct.unpack(byte_order + "HH", entry[:4])
+        if value_type == 3:
+            values[tag] = struct.unpack(byte_order + "H", entry[8:10])[0]
+        elif value_type == 4:
+            values[tag] = struct.unpack(byte_order + "I", entry[8:12])[0]
+    return values
+
+
+def _scan_jpeg(data: bytes) -> Optional[int]:
+    """
+    Walk JPEG segments up to the frame header.
+
+    Returns:
+        Offset just past the frame dimensions, or the length needed to read the
+        next segment header when data ends first (either may exceed len(data));
+        None if the stream is invalid or reaches the scan before any frame header
+    """
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            # Standalone markers without a length field
+            offset += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image / start of scan before any frame header
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            return offset + 9
+        offset += 2 + struct.unpack(">H", data[offset + 2:offset + 4])[0]
+    return offset + 4
+
+
+def _probe_jpeg(data: bytes) -> Optional[ImageHeader]:
+    end = _scan_jpeg(data)
+    if end is None or end > len(data):
+        return None
+    height, width = struct.unpack(">HH", data[end - 4:end])
+    return ImageHeader(format="JPEG", width=width, height=height)
+
+
+def _probe_png(data: bytes) -> Optional[ImageHeader]:
+    if len(data) < 24 or data[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", data[16:24])
+    return ImageHeader(format="PNG", width=width, height=height)
+
+
+def _probe_webp(data: bytes) -> Optional[ImageHeader]:
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        # Lossy: 3-byte frame tag, start code 9d 01 2a, then 14-bit dimensions
+        if data[23:26] != b"\x9d\x01\x2a":
+            return None
+        width, height = struct.unpack("<HH", data[26:30])
+        return ImageHeader(format="WEBP", width=width & 0x3FFF, height=height & 0x3FFF)
+    if chunk == b"VP8L":
+        # Lossless: signature byte, then 14-bit (width - 1) and (height - 1)
+        if data[20] != 0x2F:
+            return None
+        bits = int.from_bytes(data[21:25], "little")
+        return ImageHeader(
+            format="WEBP", width=(bits & 0x3FFF) + 1, height=((bits >> 14) & 0x3FFF) + 1
+        )
+    if chunk == b"VP8X":
+        # Extended: 24-bit (canvas width - 1) and (canvas height - 1)
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageHeader(format="WEBP", width=width, height=height)
+    return None
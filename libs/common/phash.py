@@ -0,0 +1,108 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Compute the difference hash (dHash) of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail and
+    each bit records whether a pixel is brighter than its right-hand neighbour.
+
+    Args:
+        image: PIL Image object
+        hash_size: Number of bits per row (the hash has hash_size ** 2 bits)
+
+    Returns:
+        Perceptual hash as an integer
+    """
+    thumbnail = image.convert("L").resize(
+        (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+    )
+    pixels = np.asarray(thumbnail, dtype=np.int16)
+    diff = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(diff).tobytes(), "big")
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two perceptual hashes."""
+    return (hash_a ^ hash_b).bit_count()
+
+
+class _BKNode:
+    """Single node of a BK-tree."""
+
+    __slots__ = ("hash_value", "value", "children")
+
+    def __init__(self, hash_value: int, value: Any) -> None:
+        self.hash_value = hash_value
+        self.value = value
+        self.children: Dict[int, "_BKNode"] = {}
+
+
+class BKTree:
+    """Burkhard-Keller tree for Hamming-distance lookups over perceptual hashes."""
+
+    def __init__(self) -> None:
+        self._root: Optional[_BKNode] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, hash_value: int, value: Any = None) -> None:
+        """
+        Insert a hash into the tree, replacing the value of an identical hash.
+
+        Args:
+            hash_value: Perceptual hash
+            value: Payload returned by search
+        """
+        if self._root is None:
+            self._root = _BKNode(hash_value, value)
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(hash_value, node.hash_value)
+            if distance == 0:
+                node.value = value
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(hash_value, value)
+                self._size += 1
+                return
+            node = child
+
+    def search(self, hash_value: int, max_distance: int) -> List[Tuple[int, int, Any]]:
+        """
+        Find all hashes within max_distance of hash_value.
+
+        Args:
+            hash_value: Perceptual hash to look up
+            max_distance: Maximum Hamming distance (inclusive)
+
+        Returns:
+            List of (distance, hash, value) tuples sorted by distance
+        """
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(hash_value, node.hash_value)
+            if distance <= max_distance:
+                matches.append((distance, node.hash_value, node.value))
+            # Triangle inequality: only children within [d - r, d + r] can match
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in node.children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+
+        matches.sort(key=lambda match: match[0])
+        return matches
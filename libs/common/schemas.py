@@ -3,6 +3,12 @@ from pydantic import BaseModel, Field, ConfigDict
 from enum import Enum
 
 
+# Internal request header selecting how analyzers return per-face boxes and landmarks:
+# "list" (FaceDetection models, the default), "packed" (packed_faces) or "omit"
+FACE_DETECTIONS_HEADER = "X-Face-Detections"
+FACE_DETECTIONS_MODES = ("list", "packed", "omit")
+
+
 class Gender(str, Enum):
     MALE = "male"
     FEMALE = "female"
@@ -49,11 +55,24 @@ class FaceDetection(BaseModel):
     landmarks: Optional[List[List[float]]] = Field(None, description="Facial landmarks coordinates")
 
 
+class PackedArray(BaseModel):
+    """Numeric array as base64 little-endian bytes (see libs.common.geometry)."""
+    model_config = ConfigDict(frozen=True)
+    
+    dtype: str = "float32"
+    shape: List[int]
+    data: str = Field(..., description="Base64 encoded array bytes")
+
+
 class FaceAnalysisResult(BaseModel):
     model_config = ConfigDict(frozen=True)
     
     face_count: int = Field(..., ge=0)
     faces: List[FaceDetection] = Field(default_factory=list)
+    packed_faces: Optional[PackedArray] = Field(
+        None,
+        description="Detections as an (N, 15) float32 array: bbox[4], landmarks[5x2], score"
+    )
     gender: Optional[Gender] = None
     gender_confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
     race: Optional[Race] = None
@@ -159,3 +178,35 @@ class AnalyzeImageResponse(BaseModel):
     total_processing_time_ms: float
     status: str = "success"
 
+
+class JobResponse(BaseModel):
+    """State of an asynchronous analysis submitted to /api/v1/jobs."""
+    job_id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    created_at: float
+    started_at: Optional[float] = None
+    completed_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = Field(None, description="AnalyzeImageResponse with the requested fields")
+    error: Optional[str] = None
+    error_code: Optional[int] = Field(None, description="HTTP status the synchronous endpoint would have returned")
+
+
+class DownstreamStatus(BaseModel):
+    """Last background health probe of a downstream service."""
+    healthy: Optional[bool] = Field(None, description="None until the first probe completes")
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    changed_at: Optional[float] = Field(None, description="When healthy last changed value")
+    error: Optional[str] = None
+
+
+class CapabilitiesResponse(BaseModel):
+    """Upload constraints advertised to clients so they can resize before uploading."""
+    max_width: int = Field(..., description="Images are downscaled to fit this width")
+    max_height: int = Field(..., description="Images are downscaled to fit this height")
+    max_upload_bytes: int = Field(..., description="Largest accepted upload")
+    passthrough_max_bytes: int = Field(..., description="JPEGs up to this size within the maximum dimensions are not re-encoded")
+    preferred_format: str = Field("image/jpeg", description="Upload format that avoids a server-side re-encode")
+    jpeg_quality: float = Field(..., gt=0.0, le=1.0, description="Suggested JPEG quality for client-side encoding")
+    supported_formats: List[str] = Field(default_factory=list)
+    roast_levels: List[str] = Field(default_factory=list)
@@ -0,0 +1,215 @@
+import enum
+import json
+import logging
+import typing
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel, ValidationError
+
+
+logger = logging.getLogger(__name__)
+
+# orjson and msgpack are optional; without them internal hops fall back to stdlib JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+M = TypeVar("M", bound=BaseModel)
+
+Converter = Callable[[Any], Any]
+
+
+class DecodeError(ValueError):
+    """Raised when a request or response body cannot be decoded."""
+
+
+def msgpack_available() -> bool:
+    """Whether msgpack can be used for internal hops."""
+    return msgpack is not None
+
+
+def dumps(data: Any) -> bytes:
+    """Encode data as JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body: bytes) -> Any:
+    """Decode JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def encode(data: Any, content_type: str) -> bytes:
+    """
+    Encode JSON-compatible data for the given content type.
+
+    Args:
+        data: Dicts, lists and scalars (e.g. the output of model_dump(mode="json"))
+        content_type: JSON_CONTENT_TYPE or MSGPACK_CONTENT_TYPE
+
+    Returns:
+        Encoded body
+    """
+    if content_type == MSGPACK_CONTENT_TYPE and msgpack is not None:
+        return msgpack.packb(data, use_bin_type=True)
+    return dumps(data)
+
+
+def decode(body: bytes, content_type: Optional[str]) -> Any:
+    """
+    Decode a body according to its Content-Type (JSON when absent).
+
+    Raises:
+        DecodeError: If the body is malformed or msgpack is not installed
+    """
+    media_type = (content_type or JSON_CONTENT_TYPE).split(";")[0].strip().lower()
+    try:
+        if media_type == MSGPACK_CONTENT_TYPE:
+            if msgpack is None:
+                raise DecodeError("msgpack body received but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False)
+        return loads(body)
+    except DecodeError:
+        raise
+    except Exception as e:
+        raise DecodeError(f"Malformed {media_type} body: {e}") from e
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Response content type for an Accept header: msgpack if offered and available."""
+    if accept and MSGPACK_CONTENT_TYPE in accept and msgpack is not None:
+        return MSGPACK_CONTENT_TYPE
+    return JSON_CONTENT_TYPE
+
+
+def request_content_type(prefer_msgpack: bool) -> str:
+    """Content type a client should use for internal request bodies."""
+    return MSGPACK_CONTENT_TYPE if prefer_msgpack and msgpack is not None else JSON_CONTENT_TYPE
+
+
+def accept_header(prefer_msgpack: bool) -> str:
+    """Accept header a client should send on internal hops."""
+    if prefer_msgpack and msgpack is not None:
+        return f"{MSGPACK_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.9"
+    return JSON_CONTENT_TYPE
+
+
+def encoded_response(data: Any, accept: Optional[str], status_code: int = 200) -> Response:
+    """Response encoded in the content type negotiated from the Accept header."""
+    content_type = negotiate(accept)
+    return Response(
+        content=encode(data, content_type), media_type=content_type, status_code=status_code
+    )
+
+
+def _converter(annotation: Any) -> Optional[Converter]:
+    """Build a function turning decoded data into the annotated type, if any is needed."""
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            model = annotation
+            return lambda value: construct(model, value) if isinstance(value, dict) else value
+        if issubclass(annotation, enum.Enum):
+            enum_type = annotation
+            return lambda value: value if isinstance(value, enum_type) else enum_type(value)
+        return None
+
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) in (list, typing.List):
+        item = _converter(args[0]) if args else None
+        if item is None:
+            return None
+        return lambda value: [item(v) for v in value] if isinstance(value, list) else value
+
+    # Optional[X] / Union[X, ...]: use the first member that needs converting
+    for arg in args:
+        if arg is type(None):
+            continue
+        converter = _converter(arg)
+        if converter is not None:
+            return converter
+    return None
+
+
+_CONVERTERS: Dict[Type[BaseModel], Dict[str, Converter]] = {}
+
+
+def _field_converters(model: Type[BaseModel]) -> Dict[str, Converter]:
+    converters = _CONVERTERS.get(model)
+    if converters is None:
+        converters = {}
+        for name, field in model.model_fields.items():
+            converter = _converter(field.annotation)
+            if converter is not None:
+                converters[name] = converter
+        _CONVERTERS[model] = converters
+    return converters
+
+
+def construct(model: Type[M], data: Dict[str, Any]) -> M:
+    """
+    Build a model (and nested models) from trusted data without validation.
+
+    Only for payloads produced by our own services; unknown keys are ignored and
+    values are not checked. Nested models and enums are still instantiated so the
+    result behaves like a validated model.
+
+    Args:
+        model: Pydantic model class
+        data: Decoded payload
+
+    Returns:
+        Model instance
+    """
+    converters = _field_converters(model)
+    values = {}
+    for name, value in data.items():
+        converter = converters.get(name)
+        values[name] = converter(value) if converter is not None and value is not None else value
+    return model.model_construct(**values)
+
+
+def load_model(model: Type[M], data: Dict[str, Any], validate: bool = False) -> M:
+    """Validate data into a model, or construct it without validation when trusted."""
+    if validate:
+        return model.model_validate(data)
+    return construct(model, data)
+
+
+def trusted_body(
+    model: Type[M],
+    validate: bool = False
+) -> Callable[[Request], Awaitable[M]]:
+    """
+    FastAPI dependency reading an internal request body (JSON or msgpack) into a model.
+
+    Args:
+        model: Pydantic model class of the body
+        validate: Fully validate instead of constructing without validation
+
+    Returns:
+        Dependency callable for use with Depends()
+    """
+    async def dependency(request: Request) -> M:
+        try:
+            data = decode(await request.body(), request.headers.get("content-type"))
+            return load_model(model, data, validate)
+        except (DecodeError, ValidationError, TypeError, AttributeError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid request body: {e}"
+            )
+
+    return dependency
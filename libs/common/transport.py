@@ -0,0 +1,221 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import aiohttp
+from libs.common.deadline import remaining
+from libs.common.http import client_session, request_url, split_unix_url
+from libs.common.serialization import accept_header, decode, encode, request_content_type
+
+
+# Deployment modes: separate services talking HTTP, or one process calling directly
+DEPLOYMENT_SERVICES = "services"
+DEPLOYMENT_MONOLITH = "monolith"
+
+# In-process endpoint: receives the request payload and headers, returns the response data
+Handler = Callable[[Dict[str, Any], Dict[str, str]], Awaitable[Any]]
+
+
+class TransportError(Exception):
+    """Raised when a downstream service call does not succeed."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class Transport(ABC):
+    """How a client reaches the endpoints of downstream services."""
+
+    @abstractmethod
+    async def post(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """
+        Send a request to a service endpoint.
+
+        Args:
+            url: Endpoint URL (configured service URL + path)
+            payload: JSON-compatible request data
+            headers: Extra request headers
+
+        Returns:
+            Decoded response data
+
+        Raises:
+            TransportError: If the service answers with an error or is unavailable
+        """
+
+    @abstractmethod
+    async def healthy(self, service_url: str) -> bool:
+        """Whether the service at the configured URL reports itself healthy."""
+
+    async def close(self) -> None:
+        """Release pooled connections (none by default)."""
+        return
+
+
+class HttpTransport(Transport):
+    """
+    Calls services over HTTP (or Unix domain sockets, see libs.common.http).
+
+    Requests made on behalf of a request with a deadline time out at that
+    deadline if it comes before the configured timeout. Connections are pooled
+    (one session per Unix socket, one for TCP) and reused across requests and
+    health checks.
+    """
+
+    def __init__(
+        self,
+        timeout: aiohttp.ClientTimeout,
+        prefer_msgpack: bool = False,
+        user_agent: Optional[str] = None
+    ):
+        self.timeout = timeout
+        self.prefer_msgpack = prefer_msgpack
+        self.user_agent = user_agent
+        self._sessions: Dict[Optional[str], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+
+    async def post(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        content_type = request_content_type(self.prefer_msgpack)
+        request_headers = {
+            "Content-Type": content_type,
+            "Accept": accept_header(self.prefer_msgpack),
+        }
+        if self.user_agent:
+            request_headers["User-Agent"] = self.user_agent
+        request_headers.update(headers or {})
+
+        timeout = self.timeout
+        left = remaining()
+        if left is not None:
+            if left <= 0:
+                raise TransportError(f"Request deadline passed before calling {url}", 504)
+            if timeout.total is None or left < timeout.total:
+                timeout = aiohttp.ClientTimeout(total=left)
+
+        async with self._session(url).post(
+            request_url(url),
+            data=encode(payload, content_type),
+            headers=request_headers,
+            timeout=timeout
+        ) as response:
+            if response.status != 200:
+                raise TransportError(f"{url} returned status {response.status}", response.status)
+            return decode(await response.read(), response.headers.get("Content-Type"))
+
+    async def healthy(self, service_url: str) -> bool:
+        url = f"{service_url}/health"
+        try:
+            async with self._session(url).get(
+                request_url(url), timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        for _, session in sessions.values():
+            await session.close()
+
+    def _session(self, url: str) -> aiohttp.ClientSession:
+        """Pooled session able to reach the URL, created in the running event loop."""
+        socket_path, _ = split_unix_url(url)
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(socket_path)
+        if entry is None or entry[0] is not loop or entry[1].closed:
+            entry = self._sessions[socket_path] = (loop, client_session(url, timeout=self.timeout))
+        return entry[1]
+
+
+class InProcessTransport(Transport):
+    """
+    Calls service handlers registered in the same process (monolith deployment).
+
+    Handlers are registered under the same URLs the HTTP clients are configured
+    with, so callers are unaware of the deployment mode. Payloads and responses
+    are passed by reference without being serialized.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {}
+        self._health: Dict[str, Callable[[], bool]] = {}
+
+    def register(
+        self,
+        service_url: str,
+        routes: Dict[str, Handler],
+        health: Callable[[], bool]
+    ) -> None:
+        """
+        Register the endpoints of one service.
+
+        Args:
+            service_url: URL the clients are configured with for this service
+            routes: Handlers keyed by path, e.g. {"/api/v1/analyze": handler}
+            health: Returns whether the service is ready
+        """
+        service_url = service_url.rstrip("/")
+        for path, handler in routes.items():
+            self._handlers[service_url + path] = handler
+        self._health[service_url] = health
+
+    def clear(self) -> None:
+        """Remove every registered service."""
+        self._handlers.clear()
+        self._health.clear()
+
+    async def post(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        handler = self._handlers.get(url)
+        if handler is None:
+            raise TransportError(f"No in-process handler registered for {url}", 404)
+        return await handler(payload, headers or {})
+
+    async def healthy(self, service_url: str) -> bool:
+        check = self._health.get(service_url.rstrip("/"))
+        return check is not None and check()
+
+
+# Registry filled by the monolith app; unused when services run separately
+in_process_transport = InProcessTransport()
+
+
+def create_transport(
+    deployment_mode: str,
+    timeout: aiohttp.ClientTimeout,
+    prefer_msgpack: bool = False,
+    user_agent: Optional[str] = None
+) -> Transport:
+    """
+    Transport for a deployment mode.
+
+    Args:
+        deployment_mode: DEPLOYMENT_SERVICES or DEPLOYMENT_MONOLITH
+        timeout: HTTP request timeout
+        prefer_msgpack: Use msgpack bodies over HTTP when available
+        user_agent: User-Agent header for HTTP requests
+
+    Returns:
+        The shared InProcessTransport in monolith mode, otherwise an HttpTransport
+
+    Raises:
+        ValueError: If the deployment mode is unknown
+    """
+    if deployment_mode == DEPLOYMENT_MONOLITH:
+        return in_process_transport
+    if deployment_mode != DEPLOYMENT_SERVICES:
+        raise ValueError(f"Unknown deployment mode: {deployment_mode}")
+    return HttpTransport(timeout, prefer_msgpack=prefer_msgpack, user_agent=user_agent)
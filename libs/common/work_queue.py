@@ -0,0 +1,462 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from libs.common.cache import RedisClient
+from libs.common.deadline import current_deadline, deadline_scope
+from libs.common.metrics import metrics
+from libs.common.serialization import dumps, loads
+from libs.common.transport import Handler, Transport, TransportError
+
+
+logger = logging.getLogger(__name__)
+
+# Queues analyzer workers pull from
+FACE_ANALYSIS_QUEUE = "face_analysis"
+VLM_SCENE_ANALYSIS_QUEUE = "vlm_scene_analysis"
+
+# Dispatch modes: HTTP fan-out from the orchestrator, or workers pulling from a queue
+DISPATCH_PUSH = "push"
+DISPATCH_QUEUE = "queue"
+
+
+class QueueBackend(ABC):
+    """FIFO queues of byte items shared by the orchestrator and analyzer workers."""
+
+    @abstractmethod
+    async def push(self, queue: str, item: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Append an item to a queue.
+
+        Args:
+            queue: Queue name
+            item: Encoded item
+            ttl: Seconds after which an unconsumed item may be dropped (used for
+                replies nobody is waiting for any more)
+        """
+
+    @abstractmethod
+    async def pop(self, queue: str, timeout: float) -> Optional[bytes]:
+        """Remove and return the oldest item, waiting up to timeout seconds (None if none)."""
+
+    @abstractmethod
+    async def length(self, queue: str) -> int:
+        """Number of items waiting in a queue."""
+
+    async def close(self) -> None:
+        """Release resources held by the backend (none by default)."""
+        return
+
+
+async def _poll(pop_nowait: Callable[[], Any], timeout: float, interval: float) -> Optional[bytes]:
+    """Call an (async) non-blocking pop until it returns an item or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while True:
+        item = await pop_nowait()
+        if item is not None:
+            return item
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(interval, remaining))
+
+
+class MemoryQueue(QueueBackend):
+    """In-process queues, for workers running in the same process (tests, monolith)."""
+
+    def __init__(self, poll_interval: float = 0.005):
+        self.poll_interval = poll_interval
+
+        # queue -> (expires_at or None, item)
+        self._queues: Dict[str, Deque[Tuple[Optional[float], bytes]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    async def push(self, queue: str, item: bytes, ttl: Optional[float] = None) -> None:
+        """Append an item to a queue."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._queues[queue].append((expires_at, item))
+
+    async def pop(self, queue: str, timeout: float) -> Optional[bytes]:
+        """Remove and return the oldest live item, polling until the timeout."""
+        return await _poll(lambda: self._pop_nowait(queue), timeout, self.poll_interval)
+
+    async def length(self, queue: str) -> int:
+        """Number of items waiting in a queue."""
+        with self._lock:
+            return len(self._queues.get(queue, ()))
+
+    async def _pop_nowait(self, queue: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            items = self._queues.get(queue)
+            while items:
+                expires_at, item = items.popleft()
+                if expires_at is None or expires_at > now:
+                    return item
+        return None
+
+
+class SQLiteQueue(QueueBackend):
+    """
+    Queues in a local SQLite file, shared by processes on one host.
+
+    Pops run in an immediate transaction, so each item goes to exactly one worker.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.05):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queue_items ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " queue TEXT NOT NULL,"
+            " item BLOB NOT NULL,"
+            " expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS queue_items_queue ON queue_items (queue, id)")
+
+    async def push(self, queue: str, item: bytes, ttl: Optional[float] = None) -> None:
+        """Append an item to a queue."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO queue_items (queue, item, expires_at) VALUES (?, ?, ?)",
+            (queue, sqlite3.Binary(item), expires_at),
+        )
+
+    async def pop(self, queue: str, timeout: float) -> Optional[bytes]:
+        """Remove and return the oldest live item, polling until the timeout."""
+        return await _poll(
+            lambda: asyncio.to_thread(self._pop_nowait, queue), timeout, self.poll_interval
+        )
+
+    async def length(self, queue: str) -> int:
+        """Number of items waiting in a queue."""
+        def count() -> int:
+            with self._lock:
+                return self._conn.execute(
+                    "SELECT COUNT(*) FROM queue_items WHERE queue = ?", (queue,)
+                ).fetchone()[0]
+        return await asyncio.to_thread(count)
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _pop_nowait(self, queue: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM queue_items WHERE queue = ? AND expires_at IS NOT NULL"
+                    " AND expires_at <= ?",
+                    (queue, now),
+                )
+                row = self._conn.execute(
+                    "SELECT id, item FROM queue_items WHERE queue = ? ORDER BY id LIMIT 1", (queue,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("DELETE FROM queue_items WHERE id = ?", (row[0],))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bytes(row[1]) if row is not None else None
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+
+class RedisQueue(RedisClient, QueueBackend):
+    """
+    Queues as Redis lists (RPUSH / BLPOP), for workers on other hosts.
+
+    Item TTLs expire the whole list, which suits per-request reply queues.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        key_prefix: str = "judgy:queue:",
+        pool_size: int = 16,
+        timeout: float = 2.0
+    ):
+        super().__init__(host, port, db, password, pool_size, timeout)
+        self.key_prefix = key_prefix
+
+    async def push(self, queue: str, item: bytes, ttl: Optional[float] = None) -> None:
+        """Append an item to a queue."""
+        key = self._key(queue)
+        await self._command(b"RPUSH", key, item)
+        if ttl is not None:
+            await self._command(b"PEXPIRE", key, str(max(int(ttl * 1000), 1)).encode("ascii"))
+
+    async def pop(self, queue: str, timeout: float) -> Optional[bytes]:
+        """Remove and return the oldest item, blocking server-side up to timeout."""
+        reply = await self._command(
+            b"BLPOP", self._key(queue), f"{max(timeout, 0.01):.3f}".encode("ascii"), block=timeout
+        )
+        return reply[1] if reply else None
+
+    async def length(self, queue: str) -> int:
+        """Number of items waiting in a queue."""
+        return await self._command(b"LLEN", self._key(queue))
+
+    def _key(self, queue: str) -> bytes:
+        return f"{self.key_prefix}{queue}".encode("utf-8")
+
+
+# Shared by every component of a process using "memory://"
+_memory_queue = MemoryQueue()
+
+
+def create_queue_backend(url: str) -> QueueBackend:
+    """
+    Build a queue backend from a URL.
+
+    Supported forms: ``memory://`` (one process), ``sqlite:///path/to/file.sqlite3``
+    (one host) and ``redis://[:password@]host[:port][/db]``.
+
+    Args:
+        url: Backend URL
+
+    Returns:
+        Queue backend instance
+
+    Raises:
+        ValueError: If the scheme is not supported
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return _memory_queue
+    if parsed.scheme == "sqlite":
+        return SQLiteQueue(path=unquote(parsed.path))
+    if parsed.scheme == "redis":
+        db = parsed.path.lstrip("/")
+        return RedisQueue(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+        )
+    raise ValueError(f"Unsupported queue backend URL: {url}")
+
+
+def _record_lag(queue: str, lag_seconds: float) -> None:
+    metrics.set_gauge(f"{queue}_queue_lag_ms", max(lag_seconds, 0.0) * 1000)
+
+
+class QueueTransport(Transport):
+    """
+    Sends requests as jobs on per-service queues and waits for the worker's reply.
+
+    Workers pull at their own pace, so a slow replica only takes the jobs it can
+    handle. Every job carries a deadline (deadline_seconds after enqueueing, or
+    the request's own deadline if earlier); the caller gives up at the deadline
+    and workers drop jobs that are already past it.
+    """
+
+    def __init__(
+        self,
+        backend: QueueBackend,
+        queues: Dict[str, str],
+        deadline_seconds: float
+    ):
+        """
+        Args:
+            backend: Queue backend shared with the workers
+            queues: Queue name keyed by configured service URL
+            deadline_seconds: Time a job may take from enqueue to reply
+        """
+        self.backend = backend
+        self.queues = {url.rstrip("/"): queue for url, queue in queues.items()}
+        self.deadline_seconds = deadline_seconds
+
+    async def post(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        queue, path = self._resolve(url)
+        now = time.time()
+        deadline = now + self.deadline_seconds
+        request_deadline = current_deadline()
+        if request_deadline is not None:
+            deadline = min(deadline, request_deadline)
+            if deadline <= now:
+                raise TransportError(f"Request deadline passed before queueing on {queue}", 504)
+        wait = deadline - now
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "path": path,
+            "payload": payload,
+            "headers": headers or {},
+            "reply_to": f"reply:{job_id}",
+            "enqueued_at": now,
+            "deadline": deadline,
+        }
+        await self.backend.push(queue, dumps(job), ttl=wait)
+
+        item = await self.backend.pop(job["reply_to"], wait)
+        if item is None:
+            metrics.increment(f"{queue}_queue_deadline_exceeded")
+            raise TransportError(f"No reply from {queue} within {wait:.1f}s", 504)
+
+        reply = loads(item)
+        _record_lag(queue, reply.get("queued_ms", 0) / 1000)
+        if reply["status"] != "ok":
+            raise TransportError(f"{queue} job failed: {reply.get('error')}", reply.get("code"))
+        return reply["data"]
+
+    async def healthy(self, service_url: str) -> bool:
+        """Whether the queue is reachable and jobs are picked up within the deadline."""
+        queue = self.queues.get(service_url.rstrip("/"))
+        if queue is None:
+            return False
+        try:
+            depth = await self.backend.length(queue)
+        except Exception:
+            return False
+        metrics.set_gauge(f"{queue}_queue_depth", depth)
+        return metrics.get(f"{queue}_queue_lag_ms") < self.deadline_seconds * 1000
+
+    def _resolve(self, url: str) -> Tuple[str, str]:
+        for service_url, queue in self.queues.items():
+            if url.startswith(service_url + "/"):
+                return queue, url[len(service_url):]
+        raise TransportError(f"No queue configured for {url}", 404)
+
+
+class QueueWorker:
+    """
+    Pulls jobs from one queue and replies on each job's reply queue.
+
+    Runs up to `concurrency` jobs at once and only takes a new job when a slot
+    is free, so each replica works at its own pace.
+    """
+
+    def __init__(
+        self,
+        backend: QueueBackend,
+        queue: str,
+        routes: Dict[str, Handler],
+        concurrency: int = 1,
+        poll_timeout: float = 1.0
+    ):
+        """
+        Args:
+            backend: Queue backend shared with the orchestrator
+            queue: Queue to pull from
+            routes: Handlers keyed by request path, as for InProcessTransport
+            concurrency: Jobs processed at once
+            poll_timeout: Seconds each pull waits before checking for shutdown
+        """
+        self.backend = backend
+        self.queue = queue
+        self.routes = routes
+        self.concurrency = concurrency
+        self.poll_timeout = poll_timeout
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start pulling jobs in the running event loop."""
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        logger.info(f"Pulling jobs from queue {self.queue} (concurrency {self.concurrency})")
+
+    async def stop(self) -> None:
+        """Stop pulling; jobs in progress are cancelled."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                item = await self.backend.pop(self.queue, self.poll_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error pulling from queue {self.queue}: {e}")
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            if item is None:
+                continue
+            try:
+                await self.handle(item)
+            except Exception as e:
+                # One bad job must not stop this worker slot
+                logger.error(f"Error handling job from queue {self.queue}: {e}")
+
+    async def handle(self, item: bytes) -> None:
+        """Run one encoded job and push its reply."""
+        try:
+            job = loads(item)
+            job_id, reply_to, deadline = job["id"], job["reply_to"], float(job["deadline"])
+        except Exception as e:
+            metrics.increment(f"{self.queue}_queue_jobs_malformed")
+            logger.error(f"Dropping malformed job on {self.queue}: {e}")
+            return
+
+        started = time.time()
+        lag = started - job.get("enqueued_at", started)
+        _record_lag(self.queue, lag)
+
+        remaining = deadline - started
+        if remaining <= 0:
+            # The caller has already given up
+            metrics.increment(f"{self.queue}_queue_jobs_expired")
+            return
+
+        reply: Dict[str, Any] = {"id": job_id, "queued_ms": lag * 1000}
+        try:
+            handler = self.routes.get(job.get("path"))
+            if handler is None:
+                raise TransportError(f"No handler for {job.get('path')}", 404)
+            # Handlers see the job's deadline as the request deadline
+            with deadline_scope(deadline):
+                task = asyncio.create_task(handler(job["payload"], job.get("headers") or {}))
+            try:
+                done, _ = await asyncio.wait({task}, timeout=remaining)
+            finally:
+                if not task.done():
+                    task.cancel()
+            if not done:
+                metrics.increment(f"{self.queue}_queue_jobs_expired")
+                return
+            reply.update(status="ok", data=task.result())
+        except TransportError as e:
+            reply.update(status="error", error=str(e), code=e.status)
+        except asyncio.TimeoutError:
+            # A downstream call of the handler timed out; the job itself has not expired
+            logger.error(f"Job {job_id} on {self.queue} timed out downstream")
+            reply.update(status="error", error="Downstream call timed out", code=504)
+        except Exception as e:
+            logger.error(f"Job {job_id} on {self.queue} failed: {e}")
+            reply.update(status="error", error=str(e), code=500)
+
+        try:
+            await self.backend.push(reply_to, dumps(reply), ttl=max(deadline - time.time(), 1.0))
+        except Exception as e:
+            logger.error(f"Could not reply to job {job_id} on {self.queue}: {e}")
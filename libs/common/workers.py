@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, TypeVar
+from libs.common.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerPoolFullError(Exception):
+    """Raised when a worker pool's queue is at capacity."""
+
+
+def _timed_call(fn: Callable[..., T], args: Tuple[Any, ...], submitted_at: float) -> Tuple[T, float]:
+    """Run fn in a worker and report how long it waited in the queue."""
+    queue_wait = time.monotonic() - submitted_at
+    return fn(*args), queue_wait
+
+
+class BoundedWorkerPool:
+    """
+    Thread or process pool for CPU-bound work with a bounded backlog.
+
+    Keeps decoding, resizing and re-encoding off the event loop. Submissions beyond
+    max_workers + max_queue are rejected instead of queueing without bound, and the
+    queue depth, in-flight count and queue wait are recorded as metrics.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue: int,
+        use_processes: bool = False
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._pending = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def pending(self) -> int:
+        """Tasks submitted and not yet finished (running + queued)."""
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        """Tasks waiting for a free worker."""
+        return max(0, self._pending - self.max_workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run fn(*args) in the pool and await its result.
+
+        Args:
+            fn: Picklable callable when the pool uses processes
+            *args: Positional arguments for fn
+
+        Returns:
+            Return value of fn
+
+        Raises:
+            WorkerPoolFullError: If the backlog is already at max_queue
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            metrics.increment(f"{self.name}_rejected")
+            raise WorkerPoolFullError(f"{self.name} worker pool is saturated")
+
+        self._pending += 1
+        self._record_depth()
+        try:
+            loop = asyncio.get_running_loop()
+            result, queue_wait = await loop.run_in_executor(
+                self._get_executor(),
+                functools.partial(_timed_call, fn, args, time.monotonic())
+            )
+            metrics.increment(f"{self.name}_completed")
+            metrics.increment(f"{self.name}_queue_wait_ms_total", queue_wait * 1000)
+            return result
+        finally:
+            self._pending -= 1
+            self._record_depth()
+
+    def shutdown(self) -> None:
+        """Stop the workers, waiting for running tasks to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            logger.info(
+                f"Started {self.name} pool with {self.max_workers} "
+                f"{'processes' if self.use_processes else 'threads'}"
+            )
+        return self._executor
+
+    def _record_depth(self) -> None:
+        metrics.set_gauge(f"{self.name}_queue_depth", self.queue_depth)
+        metrics.set_gauge(f"{self.name}_in_flight", min(self._pending, self.max_workers))
@@ -1,4 +1,10 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from libs.common.schemas import FACE_DETECTIONS_HEADER, FACE_DETECTIONS_MODES
+from libs.common.control_plane import LoadTracker
+from libs.common.deadline import DeadlineExceededError, check_deadline
+from libs.common.serialization import encoded_response
+from libs.common.transport import TransportError
 from services.face_analysis.app.models.schemas import (
     HealthResponse,
     ErrorResponse,
@@ -12,6 +18,9 @@ from services.face_analysis.app.config import config
 
 router = APIRouter()
 
+# Requests in inference (running or waiting); readiness fails at capacity
+inference_load = LoadTracker(config.readiness_max_in_flight)
+
 # Global instances (will be initialized in lifespan)
 model_manager: ModelManager = None
 face_analyzer: FaceAnalyzer = None
@@ -45,19 +54,35 @@ async def health_check() -> HealthResponse:
         500: {"model": ErrorResponse}
     }
 )
-async def analyze_face(request: FaceAnalysisRequest) -> FaceAnalysisResponse:
+async def analyze_face(
+    http_request: Request,
+    request: FaceAnalysisRequest,
+    face_detections: Optional[str] = Header(None, alias="X-Face-Detections")
+) -> Response:
     """
     Analyze faces in an image.
     
+    Internal endpoint: the results are returned as built, in the type negotiated
+    from the Accept header, so packed_faces reaches the orchestrators.
+    
     Args:
+        http_request: Incoming request (used for content negotiation)
         request: Face analysis request with base64 image and request ID
+        face_detections: "list" (default), "packed" for a float32 array in
+            packed_faces, or "omit" to leave out per-face boxes and landmarks
     
     Returns:
         FaceAnalysisResponse with detected faces and analysis results
     
     Raises:
-        HTTPException: If analysis fails
+        HTTPException: If X-Face-Detections is invalid or analysis fails
     """
+    if face_detections is not None and face_detections not in FACE_DETECTIONS_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{FACE_DETECTIONS_HEADER} must be one of {', '.join(FACE_DETECTIONS_MODES)}."
+        )
+    
     if not model_manager or not model_manager.models_loaded:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -65,13 +90,23 @@ async def analyze_face(request: FaceAnalysisRequest) -> FaceAnalysisResponse:
         )
     
     try:
-        # Analyze faces
-        results = await face_analyzer.analyze(
-            image_base64=request.image_base64,
-            request_id=request.request_id
+        check_deadline("face analysis")
+    except DeadlineExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
         )
+    
+    try:
+        # Analyze faces
+        with inference_load.track():
+            results = await face_analyzer.analyze(
+                image_base64=request.image_base64,
+                request_id=request.request_id,
+                detections=face_detections or "list"
+            )
         
-        return FaceAnalysisResponse(**results)
+        return encoded_response(results, http_request.headers.get("accept"))
     
     except Exception as e:
         raise HTTPException(
@@ -79,3 +114,37 @@ async def analyze_face(request: FaceAnalysisRequest) -> FaceAnalysisResponse:
             detail=f"Face analysis failed: {str(e)}"
         )
 
+
+async def analyze_job(payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    /api/v1/analyze for callers that skip HTTP (queue workers, monolith).
+
+    Args:
+        payload: Request data as sent to the HTTP endpoint
+        headers: Request headers (X-Face-Detections is honoured)
+
+    Returns:
+        Face analysis results
+
+    Raises:
+        TransportError: If X-Face-Detections is invalid, the models are not loaded
+            yet or the request deadline has passed
+    """
+    detections = headers.get(FACE_DETECTIONS_HEADER) or "list"
+    if detections not in FACE_DETECTIONS_MODES:
+        raise TransportError(
+            f"{FACE_DETECTIONS_HEADER} must be one of {', '.join(FACE_DETECTIONS_MODES)}", 400
+        )
+    if not model_manager or not model_manager.models_loaded:
+        raise TransportError("Face analysis models are not loaded", 503)
+    try:
+        check_deadline("face analysis")
+    except DeadlineExceededError as e:
+        raise TransportError(str(e), 504)
+
+    with inference_load.track():
+        return await face_analyzer.analyze(
+            image_base64=payload["image_base64"],
+            request_id=payload["request_id"],
+            detections=detections
+        )
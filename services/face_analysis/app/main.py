@@ -3,7 +3,10 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from services.face_analysis.app.api.routes import router, set_model_manager
+from libs.common.control_plane import ControlPlaneServer
+from libs.common.deadline import DeadlineMiddleware
+from libs.common.work_queue import DISPATCH_QUEUE, FACE_ANALYSIS_QUEUE, QueueWorker, create_queue_backend
+from services.face_analysis.app.api.routes import analyze_job, inference_load, router, set_model_manager
 from services.face_analysis.app.services.model_manager import ModelManager
 from services.face_analysis.app.config import config
 
@@ -27,6 +30,20 @@ async def lifespan(app: FastAPI):
     model_manager = ModelManager()
     set_model_manager(model_manager)
     
+    # Health, readiness and metrics on their own thread, answered even while
+    # inference (or model loading) keeps the event loop busy
+    control_plane = None
+    if config.control_port:
+        control_plane = ControlPlaneServer(
+            config.host,
+            config.control_port,
+            config.service_name,
+            config.service_version,
+            models_loaded=lambda: model_manager.models_loaded,
+            load=inference_load
+        )
+        control_plane.start()
+    
     try:
         await model_manager.load_models()
         logger.info("All models loaded successfully")
@@ -34,11 +51,26 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error loading models: {e}")
         logger.warning("Service starting with degraded status")
     
+    # Pull jobs from the work queue alongside serving HTTP
+    worker = None
+    if config.dispatch_mode == DISPATCH_QUEUE:
+        worker = QueueWorker(
+            create_queue_backend(config.work_queue_url),
+            FACE_ANALYSIS_QUEUE,
+            {"/api/v1/analyze": analyze_job},
+            concurrency=config.work_queue_concurrency
+        )
+        worker.start()
+    
     yield
     
     # Shutdown
     logger.info(f"Shutting down {config.service_name}")
+    if worker:
+        await worker.stop()
     await model_manager.unload_models()
+    if control_plane:
+        control_plane.stop()
 
 
 app = FastAPI(
@@ -48,6 +80,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rejects or cancels requests past the caller's X-Request-Deadline, and
+# requests whose caller disconnects
+app.add_middleware(DeadlineMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -81,6 +117,7 @@ if __name__ == "__main__":
         "services.face_analysis.app.main:app",
         host=config.host,
         port=config.port,
+        uds=config.uds,
         reload=config.reload,
         log_level=config.log_level.lower()
     )
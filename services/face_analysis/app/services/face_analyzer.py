@@ -1,14 +1,20 @@
+import base64
 import logging
 import time
-import cv2
 import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
-from libs.common.utils import base64_to_numpy
+from libs.common.codec import decode_bgr, decode_bgr_reduced
+from libs.common.geometry import YUNET_COLUMNS, pack_detections
+from libs.common.image_probe import ImageHeader, probe_image_header, read_exif_thumbnail
+from libs.common.metrics import metrics
+from services.face_analysis.app.config import config
 from services.face_analysis.app.services.model_manager import ModelManager
 
 
 logger = logging.getLogger(__name__)
 
+_NO_FACES = np.zeros((0, YUNET_COLUMNS), dtype=np.float32)
+
 
 class FaceAnalyzer:
     """Analyzes faces in images using multiple models."""
@@ -16,13 +22,17 @@ class FaceAnalyzer:
     def __init__(self, model_manager: ModelManager):
         self.model_manager = model_manager
     
-    async def analyze(self, image_base64: str, request_id: str) -> Dict[str, Any]:
+    async def analyze(
+        self, image_base64: str, request_id: str, detections: str = "list"
+    ) -> Dict[str, Any]:
         """
         Analyze faces in an image.
         
         Args:
             image_base64: Base64 encoded image
             request_id: Request ID for tracking
+            detections: How to return per-face boxes and landmarks: "list",
+                "packed" (float32 array in packed_faces) or "omit"
         
         Returns:
             Dictionary with face analysis results
@@ -30,22 +40,23 @@ class FaceAnalyzer:
         start_time = time.time()
         
         try:
-            # Convert base64 to numpy array
-            image = base64_to_numpy(image_base64)
+            image_bytes = base64.b64decode(image_base64)
+            header = probe_image_header(image_bytes)
             
-            # 1. Detect faces
-            faces = await self._detect_faces(image)
+            # 1. Detect faces and crop the primary face (largest or first detected)
+            if config.face_detection_fast_path and header is not None and header.format == "JPEG":
+                faces, face_crop = await self._detect_on_preview(image_bytes, header)
+            else:
+                image = decode_bgr(image_bytes)
+                faces = await self._detect_faces(image)
+                face_crop = self._crop_face(image, faces[0, :4].tolist()) if len(faces) else None
             
-            if not faces or len(faces) == 0:
+            if len(faces) == 0:
                 return {
                     "face_count": 0,
                     "faces": [],
                     "processing_time_ms": (time.time() - start_time) * 1000
                 }
-            
-            # Get the primary face (largest or first detected)
-            primary_face = faces[0]
-            face_crop = self._crop_face(image, primary_face["bbox"])
 
             # 2. Analyze gender and race with FairFace
             gender_race = await self._analyze_fairface(face_crop)
@@ -63,7 +74,7 @@ class FaceAnalyzer:
             
             return {
                 "face_count": len(faces),
-                "faces": faces,
+                **self._format_detections(faces, detections),
                 **gender_race,
                 **emotion,
                 **attractiveness,
@@ -75,18 +86,43 @@ class FaceAnalyzer:
             logger.error(f"Error analyzing face: {e}")
             raise
     
-    async def _detect_faces(self, image: np.ndarray) -> List[Dict[str, Any]]:
-        """Detect faces using YuNet."""
+    def _format_detections(self, faces: np.ndarray, detections: str) -> Dict[str, Any]:
+        """Per-face boxes and landmarks in the requested representation."""
+        if detections == "omit":
+            return {"faces": []}
+        if detections == "packed":
+            return {"faces": [], "packed_faces": pack_detections(faces).model_dump()}
+        
+        return {
+            "faces": [
+                {
+                    "bbox": row[:4],
+                    "confidence": row[14],
+                    "landmarks": [row[i:i + 2] for i in range(4, 14, 2)]
+                }
+                for row in faces.astype(np.float64).tolist()
+            ]
+        }
+    
+    async def _detect_faces(self, image: np.ndarray) -> np.ndarray:
+        """
+        Detect faces using YuNet.
+        
+        Returns:
+            float32 array of shape (N, 15): [x, y, w, h, x_re, y_re, x_le, y_le,
+            x_n, y_n, x_rcm, y_rcm, x_lcm, y_lcm, conf]
+        """
         try:
             if self.model_manager.yunet_detector is None:
                 # Return mock data for testing
                 logger.warning("YuNet not loaded, returning mock face detection")
                 h, w = image.shape[:2]
-                return [{
-                    "bbox": [w * 0.25, h * 0.25, w * 0.5, h * 0.5],
-                    "confidence": 0.95,
-                    "landmarks": [[w * 0.35, h * 0.35], [w * 0.65, h * 0.35]]
-                }]
+                return np.array([[
+                    w * 0.25, h * 0.25, w * 0.5, h * 0.5,
+                    w * 0.35, h * 0.35, w * 0.65, h * 0.35, w * 0.5, h * 0.5,
+                    w * 0.38, h * 0.62, w * 0.62, h * 0.62,
+                    0.95
+                ]], dtype=np.float32)
             
             # Set input size based on image dimensions
             h, w = image.shape[:2]
@@ -96,32 +132,106 @@ class FaceAnalyzer:
             _, faces_data = self.model_manager.yunet_detector.detect(image)
             
             if faces_data is None:
-                return []
-            
-            faces = []
-            for face in faces_data:
-                # YuNet returns: [x, y, w, h, x_re, y_re, x_le, y_le, x_n, y_n, x_rcm, y_rcm, x_lcm, y_lcm, conf]
-                bbox = face[:4].tolist()
-                confidence = float(face[14])
-                landmarks = [
-                    [float(face[4]), float(face[5])],   # right eye
-                    [float(face[6]), float(face[7])],   # left eye
-                    [float(face[8]), float(face[9])],   # nose
-                    [float(face[10]), float(face[11])], # right mouth corner
-                    [float(face[12]), float(face[13])]  # left mouth corner
-                ]
-                
-                faces.append({
-                    "bbox": bbox,
-                    "confidence": confidence,
-                    "landmarks": landmarks
-                })
-            
-            return faces
+                return _NO_FACES
+            return faces_data.astype(np.float32, copy=False).reshape(-1, YUNET_COLUMNS)
             
         except Exception as e:
             logger.error(f"Error detecting faces: {e}")
-            return []
+            return _NO_FACES
+    
+    async def _detect_on_preview(
+        self,
+        image_bytes: bytes,
+        header: ImageHeader
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Detect faces on a small preview, then decode only what the face crop needs.
+
+        The preview is the EXIF thumbnail when it is large enough and has the same
+        aspect ratio as the main image, otherwise a DCT-reduced decode. Detections
+        are mapped back to full-resolution coordinates.
+
+        Args:
+            image_bytes: JPEG file contents
+            header: Dimensions of the main image
+
+        Returns:
+            Tuple of detections (full-resolution coordinates) and the primary face crop
+        """
+        faces = _NO_FACES
+        thumbnail = self._load_exif_thumbnail(image_bytes, header)
+        if thumbnail is not None:
+            metrics.increment("face_preview_exif_thumbnail")
+            faces = await self._detect_scaled(thumbnail, header)
+
+        if len(faces) == 0:
+            # Thumbnails are tiny, so a miss there is retried on a larger preview
+            metrics.increment("face_preview_reduced_decode")
+            preview_size = config.face_detection_preview_size
+            preview = decode_bgr(image_bytes, preview_size, preview_size)
+            faces = await self._detect_scaled(preview, header)
+
+        if len(faces) == 0:
+            return faces, None
+        return faces, self._decode_face_crop(image_bytes, header, faces[0, :4].tolist())
+    
+    def _load_exif_thumbnail(self, image_bytes: bytes, header: ImageHeader) -> Optional[np.ndarray]:
+        """Decode the EXIF thumbnail if it is usable as a detection preview."""
+        if not config.face_detection_use_exif_thumbnail:
+            return None
+        thumbnail_bytes = read_exif_thumbnail(image_bytes)
+        if thumbnail_bytes is None:
+            return None
+        try:
+            thumbnail = decode_bgr(thumbnail_bytes)
+        except ValueError:
+            return None
+        
+        height, width = thumbnail.shape[:2]
+        if min(width, height) < config.face_detection_min_thumbnail_size:
+            return None
+        # Letterboxed or cropped thumbnails would misplace the detections
+        if abs(width / height - header.width / header.height) > 0.02 * header.width / header.height:
+            return None
+        return thumbnail
+    
+    async def _detect_scaled(self, preview: np.ndarray, header: ImageHeader) -> np.ndarray:
+        """Detect faces on a preview and scale them to full-resolution coordinates."""
+        faces = (await self._detect_faces(preview)).copy()
+        # x coordinates and widths sit in even columns, y and heights in odd ones
+        faces[:, 0:14:2] *= header.width / preview.shape[1]
+        faces[:, 1:14:2] *= header.height / preview.shape[0]
+        return faces
+    
+    def _decode_face_crop(
+        self,
+        image_bytes: bytes,
+        header: ImageHeader,
+        bbox: List[float]
+    ) -> np.ndarray:
+        """
+        Crop a face at the smallest DCT scale that keeps it at least face_crop_min_size.
+
+        Args:
+            image_bytes: JPEG file contents
+            header: Dimensions of the main image
+            bbox: Face bounding box in full-resolution coordinates
+
+        Returns:
+            Face crop (BGR)
+        """
+        face_side = min(bbox[2], bbox[3])
+        factor = 1
+        for candidate in (8, 4, 2):
+            if face_side / candidate >= config.face_crop_min_size:
+                factor = candidate
+                break
+        
+        image = decode_bgr_reduced(image_bytes, factor)
+        scale_x = image.shape[1] / header.width
+        scale_y = image.shape[0] / header.height
+        x, y, w, h = bbox
+        return self._crop_face(image, [x * scale_x, y * scale_y, w * scale_x, h * scale_y])
     
     def _crop_face(self, image: np.ndarray, bbox: List[float]) -> np.ndarray:
         """Crop face region from image."""
@@ -1,4 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from libs.common.health import HealthPoller
+from libs.common.metrics import metrics
+from libs.common.schemas import FACE_DETECTIONS_HEADER, FACE_DETECTIONS_MODES, DownstreamStatus
+from libs.common.serialization import encoded_response, trusted_body
 from services.image_processing_orchestrator.app.models.schemas import (
     HealthResponse,
     ErrorResponse,
@@ -11,15 +16,20 @@ from services.image_processing_orchestrator.app.config import config
 
 router = APIRouter()
 orchestrator = ImageProcessingOrchestrator()
+health_poller = HealthPoller(
+    orchestrator.health_probes(),
+    interval=config.health_poll_interval_seconds,
+    timeout=config.health_probe_timeout_seconds
+)
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
-    """Health check endpoint."""
-    downstream_health = await orchestrator.health_check()
+    """Health check endpoint, answered from the background poller's last snapshot."""
+    downstream_health = await health_poller.current()
     
     # Service is healthy if all downstream services are healthy
-    all_healthy = all(downstream_health.values()) if downstream_health else False
+    all_healthy = all(service.healthy for service in downstream_health.values())
     
     return HealthResponse(
         status="healthy" if all_healthy else "degraded",
@@ -28,6 +38,18 @@ async def health_check() -> HealthResponse:
     )
 
 
+@router.get("/health/downstream", response_model=Dict[str, DownstreamStatus])
+async def downstream_health() -> Dict[str, DownstreamStatus]:
+    """Last probe of each downstream service: status, latency, and when it was checked and last changed."""
+    return await health_poller.current()
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """In-process counters and gauges (cache hit rates, work queue depth and lag)."""
+    return metrics.snapshot()
+
+
 @router.post(
     "/api/v1/process",
     response_model=ImageProcessResponse,
@@ -36,27 +58,46 @@ async def health_check() -> HealthResponse:
         500: {"model": ErrorResponse}
     }
 )
-async def process_image(request: ImageProcessRequest) -> ImageProcessResponse:
+async def process_image(
+    http_request: Request,
+    request: ImageProcessRequest = Depends(
+        trusted_body(ImageProcessRequest, config.internal_validation)
+    ),
+    face_detections: Optional[str] = Header(None, alias="X-Face-Detections")
+) -> Response:
     """
     Process an image by calling all vision model services in parallel.
     
+    Internal endpoint: accepts JSON or msgpack bodies, answers in the type
+    negotiated from the Accept header, and skips response model re-validation.
+    
     Args:
+        http_request: Incoming request (used for content negotiation)
         request: Image processing request with base64 image and request ID
+        face_detections: "list" (default), "packed" or "omit" for per-face boxes
+            and landmarks; forwarded to face analysis
     
     Returns:
         ImageProcessResponse with aggregated results from all services
     
     Raises:
-        HTTPException: If processing fails
+        HTTPException: If X-Face-Detections is invalid or processing fails
     """
+    if face_detections is not None and face_detections not in FACE_DETECTIONS_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{FACE_DETECTIONS_HEADER} must be one of {', '.join(FACE_DETECTIONS_MODES)}."
+        )
+    
     try:
         # Process image through all services
         results = await orchestrator.process_image(
             image_base64=request.image_base64,
-            request_id=request.request_id
+            request_id=request.request_id,
+            face_detections=face_detections or "list"
         )
         
-        return ImageProcessResponse(**results)
+        return encoded_response(results, http_request.headers.get("accept"))
     
     except Exception as e:
         raise HTTPException(
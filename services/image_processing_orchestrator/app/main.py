@@ -3,7 +3,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from services.image_processing_orchestrator.app.api.routes import router
+from libs.common.deadline import DeadlineMiddleware
+from services.image_processing_orchestrator.app.api.routes import health_poller, orchestrator, router
 from services.image_processing_orchestrator.app.config import config
 
 
@@ -26,10 +27,21 @@ async def lifespan(app: FastAPI):
     logger.info(f"Quality/Aesthetics URL: {config.quality_aesthetics_url}")
     logger.info(f"Max concurrent requests: {config.max_concurrent_requests}")
     
+    # Open the disk (or shared) result cache tier
+    if orchestrator.result_cache is not None:
+        await orchestrator.result_cache.open()
+    
+    # Probe downstream services in the background; /health serves the results
+    health_poller.start()
+    
     yield
     
     # Shutdown
     logger.info(f"Shutting down {config.service_name}")
+    await health_poller.stop()
+    await orchestrator.transport.close()
+    if orchestrator.result_cache is not None:
+        await orchestrator.result_cache.close()
 
 
 app = FastAPI(
@@ -39,6 +51,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rejects or cancels requests past the caller's X-Request-Deadline, and
+# requests whose caller disconnects
+app.add_middleware(DeadlineMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -72,6 +88,7 @@ if __name__ == "__main__":
         "services.image_processing_orchestrator.app.main:app",
         host=config.host,
         port=config.port,
+        uds=config.uds,
         reload=config.reload,
         log_level=config.log_level.lower()
     )
@@ -1,9 +1,24 @@
 import asyncio
 import logging
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Awaitable, Callable
 import aiohttp
+from libs.common.deadline import DeadlineExceededError, check_deadline, deadline_headers
+from libs.common.http import control_plane_url
+from libs.common.schemas import FACE_DETECTIONS_HEADER, FACE_DETECTIONS_MODES
+from libs.common.transport import TransportError, create_transport
+from libs.common.work_queue import (
+    DISPATCH_QUEUE,
+    FACE_ANALYSIS_QUEUE,
+    VLM_SCENE_ANALYSIS_QUEUE,
+    QueueTransport,
+    create_queue_backend,
+)
 from services.image_processing_orchestrator.app.config import config
+from services.image_processing_orchestrator.app.services.result_cache import (
+    AnalyzerResultCache,
+    content_hash,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -16,25 +31,67 @@ class ImageProcessingOrchestrator:
         self.face_analysis_url = config.face_analysis_url
         self.vlm_scene_analysis_url = config.vlm_scene_analysis_url
         self.timeout = config.service_timeout
+        # Health probes go to the analyzers' control ports when configured; in
+        # queue mode the queues themselves are probed
+        self.face_analysis_health_url = self.face_analysis_url
+        self.vlm_scene_analysis_health_url = self.vlm_scene_analysis_url
+        if config.dispatch_mode == DISPATCH_QUEUE:
+            # Analyzer workers pull jobs; each job expires after the service timeout
+            self.transport = QueueTransport(
+                create_queue_backend(config.work_queue_url),
+                queues={
+                    self.face_analysis_url: FACE_ANALYSIS_QUEUE,
+                    self.vlm_scene_analysis_url: VLM_SCENE_ANALYSIS_QUEUE,
+                },
+                deadline_seconds=self.timeout
+            )
+        else:
+            # Analyzers take JSON bodies
+            self.transport = create_transport(
+                config.deployment_mode, aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self.face_analysis_health_url = config.face_analysis_health_url or control_plane_url(
+                self.face_analysis_url, config.face_analysis_control_port
+            )
+            self.vlm_scene_analysis_health_url = config.vlm_scene_analysis_health_url or control_plane_url(
+                self.vlm_scene_analysis_url, config.vlm_scene_analysis_control_port
+            )
         self.max_concurrent = config.max_concurrent_requests
+        self.result_cache: Optional[AnalyzerResultCache] = (
+            AnalyzerResultCache.from_config() if config.result_cache_enabled else None
+        )
     
-    async def process_image(self, image_base64: str, request_id: str) -> Dict[str, Any]:
+    async def process_image(
+        self, image_base64: str, request_id: str, face_detections: str = "list"
+    ) -> Dict[str, Any]:
         """
         Process image by calling vision services in parallel.
 
         Args:
             image_base64: Base64 encoded image
             request_id: Request ID for tracking
+            face_detections: How face analysis returns per-face boxes and landmarks
+                ("list", "packed" or "omit")
 
         Returns:
             Dictionary with aggregated results from all services
+
+        Raises:
+            ValueError: If face_detections is not a known mode
         """
+        if face_detections not in FACE_DETECTIONS_MODES:
+            raise ValueError(
+                f"{FACE_DETECTIONS_HEADER} must be one of {', '.join(FACE_DETECTIONS_MODES)}"
+            )
         start_time = time.time()
+        image_hash = content_hash(image_base64) if self.result_cache else None
 
         # Create tasks for active services (Face Analysis + VLM Scene Analysis)
         tasks = {
-            "face_analysis": self._call_face_analysis(image_base64, request_id),
-            "vlm_scene_analysis": self._call_vlm_scene_analysis(image_base64, request_id),
+            "face_analysis": self._call_face_analysis(
+                image_base64, request_id, image_hash, face_detections
+            ),
+            "vlm_scene_analysis": self._call_vlm_scene_analysis(image_base64, request_id, image_hash),
         }
 
         # Execute all tasks in parallel with semaphore for rate limiting
@@ -69,45 +126,99 @@ class ImageProcessingOrchestrator:
             "processing_time_ms": processing_time_ms
         }
     
-    async def _call_face_analysis(self, image_base64: str, request_id: str) -> Optional[Dict[str, Any]]:
+    async def _call_face_analysis(
+        self,
+        image_base64: str,
+        request_id: str,
+        image_hash: Optional[str] = None,
+        face_detections: str = "list"
+    ) -> Optional[Dict[str, Any]]:
         """Call Face Analysis service."""
+        if face_detections == "list":
+            headers, variant = None, None
+        else:
+            # Each representation is cached separately
+            headers = {FACE_DETECTIONS_HEADER: face_detections}
+            variant = "lite" if face_detections == "omit" else face_detections
         return await self._call_service(
             url=f"{self.face_analysis_url}/api/v1/analyze",
             payload={"image_base64": image_base64, "request_id": request_id},
-            service_name="face_analysis"
+            service_name="face_analysis",
+            image_hash=image_hash,
+            headers=headers,
+            cache_variant=variant
         )
 
-    async def _call_vlm_scene_analysis(self, image_base64: str, request_id: str) -> Optional[Dict[str, Any]]:
+    async def _call_vlm_scene_analysis(
+        self, image_base64: str, request_id: str, image_hash: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """Call VLM Scene Analysis service."""
         return await self._call_service(
             url=f"{self.vlm_scene_analysis_url}/api/v1/analyze",
             payload={"image_base64": image_base64, "request_id": request_id},
-            service_name="vlm_scene_analysis"
+            service_name="vlm_scene_analysis",
+            image_hash=image_hash
         )
     
-    async def _call_service(self, url: str, payload: Dict[str, Any], service_name: str) -> Optional[Dict[str, Any]]:
+    async def _call_service(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        service_name: str,
+        image_hash: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        cache_variant: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """
-        Generic method to call a service.
+        Generic method to call a service, consulting the result cache first.
+        
+        The request deadline is forwarded; once it has passed the service is
+        not called at all.
         
         Args:
             url: Service endpoint URL
             payload: Request payload
             service_name: Name of the service for logging
+            image_hash: Content hash of the image; enables result caching when set
+            headers: Extra request headers
+            cache_variant: Cache namespace for responses shaped by those headers
         
         Returns:
             Response data or None if failed
         """
+        forwarded = deadline_headers()
+        if forwarded:
+            headers = {**(headers or {}), **forwarded}
+        if self.result_cache is None or image_hash is None:
+            return await self._post_service(url, payload, service_name, headers)
+
+        # Failures come back as None and are not cached, so the next request retries
+        return await self.result_cache.get_or_compute(
+            image_hash,
+            service_name,
+            lambda: self._post_service(url, payload, service_name, headers),
+            variant=cache_variant
+        )
+
+    async def _post_service(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        service_name: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """POST a payload to a service, returning None on any failure."""
         try:
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"{service_name} completed successfully")
-                        return data
-                    else:
-                        logger.error(f"{service_name} returned status {response.status}")
-                        return None
+            check_deadline(service_name)
+            data = await self.transport.post(url, payload, headers)
+            logger.info(f"{service_name} completed successfully")
+            return data
+        except DeadlineExceededError as e:
+            logger.warning(f"Skipped {service_name}: {e}")
+            return None
+        except TransportError as e:
+            logger.error(f"{service_name} failed: {e}")
+            return None
         except asyncio.TimeoutError:
             logger.error(f"{service_name} timed out after {self.timeout}s")
             return None
@@ -115,22 +226,16 @@ class ImageProcessingOrchestrator:
             logger.error(f"Error calling {service_name}: {e}")
             return None
     
-    async def health_check(self) -> Dict[str, bool]:
-        """Check health of all downstream services."""
-        services = {
-            "face_analysis": f"{self.face_analysis_url}/health",
-            "vlm_scene_analysis": f"{self.vlm_scene_analysis_url}/health",
+    def health_probes(self) -> Dict[str, Callable[[], Awaitable[bool]]]:
+        """Health probe per downstream service (through the current transport)."""
+        return {
+            "face_analysis": lambda: self.transport.healthy(self.face_analysis_health_url),
+            "vlm_scene_analysis": lambda: self.transport.healthy(self.vlm_scene_analysis_health_url),
         }
 
-        health_status = {}
-
-        async with aiohttp.ClientSession() as session:
-            for service_name, url in services.items():
-                try:
-                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
-                        health_status[service_name] = response.status == 200
-                except Exception:
-                    health_status[service_name] = False
-
-        return health_status
+    async def health_check(self) -> Dict[str, bool]:
+        """Check health of all downstream services concurrently."""
+        probes = self.health_probes()
+        results = await asyncio.gather(*(probe() for probe in probes.values()))
+        return dict(zip(probes, results, strict=True))
 
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from libs.common.cache import (
+    CacheBackend,
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    create_cache_backend,
+)
+from libs.common.coalesce import CoalescingCache
+from libs.common.metrics import metrics
+from services.image_processing_orchestrator.app.config import config
+
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(image_base64: str) -> str:
+    """SHA-256 of the encoded image, identifying byte-identical uploads."""
+    return hashlib.sha256(image_base64.encode("ascii")).hexdigest()
+
+
+class AnalyzerResultCache:
+    """
+    Caches analyzer responses keyed by image content hash, analyzer name and version.
+
+    Concurrent misses for the same key are coalesced, across replicas too when the
+    cache is backed by a shared tier.
+    """
+
+    def __init__(
+        self,
+        cache: TieredCache,
+        enabled: Dict[str, bool],
+        versions: Dict[str, str],
+        ttl_seconds: Optional[float] = None,
+        lock_ttl_seconds: float = 60.0
+    ):
+        self.cache = cache
+        self.enabled = enabled
+        self.versions = versions
+        self.ttl_seconds = ttl_seconds
+        self.coalescer = CoalescingCache(cache, lock_ttl=lock_ttl_seconds)
+
+    @classmethod
+    def from_config(cls) -> "AnalyzerResultCache":
+        """
+        Build the memory tier described by the service config.
+
+        The slower tier is attached by open(), from the service lifespan.
+        """
+        memory = MemoryCache(
+            max_bytes=config.result_cache_memory_max_bytes,
+            default_ttl=config.result_cache_ttl_seconds
+        )
+        return cls(
+            cache=TieredCache(memory),
+            enabled={
+                "face_analysis": config.cache_face_analysis,
+                "vlm_scene_analysis": config.cache_vlm_scene_analysis,
+            },
+            versions={
+                "face_analysis": config.face_analysis_version,
+                "vlm_scene_analysis": config.vlm_scene_analysis_version,
+            },
+            ttl_seconds=config.result_cache_ttl_seconds,
+            lock_ttl_seconds=config.shared_cache_lock_ttl_seconds
+        )
+
+    async def open(self) -> None:
+        """
+        Attach the slower tiers: the SQLite file at ``result_cache_disk_path`` under
+        ``data_dir`` and, when ``shared_cache_url`` is set, the shared tier below it.
+
+        Hits in the shared tier are promoted to disk, so results survive restarts
+        and repeat lookups stay off the network. The cache keeps working from the
+        tiers that opened if the disk tier cannot be.
+        """
+        if self.cache.disk is not None:
+            return
+        local: Optional[CacheBackend] = None
+        if config.result_cache_disk_path:
+            path = config.data_path(config.result_cache_disk_path)
+            try:
+                local = await asyncio.to_thread(
+                    SQLiteCache,
+                    path=str(path),
+                    max_bytes=config.result_cache_disk_max_bytes,
+                    default_ttl=config.result_cache_ttl_seconds
+                )
+            except Exception as e:
+                logger.warning(f"Disk result cache {path} unavailable, skipping the disk tier: {e}")
+
+        if not config.shared_cache_url:
+            self.cache.disk = local
+            return
+        shared = create_cache_backend(
+            config.shared_cache_url,
+            max_bytes=config.result_cache_disk_max_bytes,
+            default_ttl=config.result_cache_ttl_seconds
+        )
+        self.cache.disk = TieredCache(local, shared) if local is not None else shared
+
+    async def close(self) -> None:
+        """Close every tier and detach the slower ones."""
+        await self.cache.close()
+        self.cache.disk = None
+
+    def is_enabled(self, service_name: str) -> bool:
+        """Whether results of this analyzer may be cached."""
+        return self.enabled.get(service_name, False)
+
+    def key(self, image_hash: str, service_name: str, variant: Optional[str] = None) -> str:
+        """Cache key for one analyzer's result on one image (and output variant)."""
+        version = self.versions.get(service_name, "0")
+        if variant:
+            version = f"{version}:{variant}"
+        return f"analyzer:{service_name}:{version}:{image_hash}"
+
+    async def get_or_compute(
+        self,
+        image_hash: str,
+        service_name: str,
+        compute: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+        variant: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached analyzer result, calling the analyzer once on a miss.
+
+        Args:
+            image_hash: Content hash of the image
+            service_name: Analyzer name
+            compute: Coroutine factory calling the analyzer; None results are not cached
+            variant: Distinguishes reduced outputs of the same analyzer (e.g. "lite")
+
+        Returns:
+            Analyzer result or None if the analyzer failed
+        """
+        if not self.is_enabled(service_name):
+            return await compute()
+
+        computed = False
+
+        async def produce() -> Optional[bytes]:
+            nonlocal computed
+            computed = True
+            result = await compute()
+            return json.dumps(result).encode("utf-8") if result is not None else None
+
+        value = await self.coalescer.get_or_compute(
+            self.key(image_hash, service_name, variant), produce, ttl=self.ttl_seconds
+        )
+
+        if computed:
+            metrics.increment(f"result_cache_misses.{service_name}")
+        else:
+            metrics.increment(f"result_cache_hits.{service_name}")
+        return json.loads(value) if value is not None else None
@@ -11,6 +11,6 @@ fi
 # Set PYTHONPATH to include project root
 export PYTHONPATH="${PYTHONPATH}:$(cd ../.. && pwd)"
 
-# Run the service
-python -m uvicorn app.main:app --host 0.0.0.0 --port 8001 --reload
+# Run the service (set UDS to bind a Unix domain socket instead of the TCP port)
+python -m uvicorn app.main:app --host 0.0.0.0 --port 8001 ${UDS:+--uds "$UDS"} --reload
 
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from libs.common.control_plane import LoadTracker
+from libs.common.deadline import DeadlineExceededError, check_deadline
+from libs.common.serialization import encoded_response, trusted_body
 from services.llm_inferencer.app.models.schemas import (
     HealthResponse,
     ErrorResponse,
@@ -12,6 +15,9 @@ from services.llm_inferencer.app.config import config
 
 router = APIRouter()
 
+# Requests in inference (running or waiting); readiness fails at capacity
+inference_load = LoadTracker(config.readiness_max_in_flight)
+
 # Global instances (will be initialized in lifespan)
 llm_manager: LLMManager = None
 roast_generator: RoastGenerator = None
@@ -45,18 +51,28 @@ async def health_check() -> HealthResponse:
         500: {"model": ErrorResponse}
     }
 )
-async def generate_roast(request: LLMGenerateRequest) -> LLMGenerateResponse:
+async def generate_roast(
+    http_request: Request,
+    request: LLMGenerateRequest = Depends(
+        trusted_body(LLMGenerateRequest, config.internal_validation)
+    )
+) -> Response:
     """
     Generate a witty roast from image features.
     
+    Internal endpoint: accepts JSON or msgpack bodies built by the main
+    orchestrator and answers in the type negotiated from the Accept header.
+    
     Args:
+        http_request: Incoming request (used for content negotiation)
         request: LLM generation request with features and roast level
     
     Returns:
         LLMGenerateResponse with generated roast text
     
     Raises:
-        HTTPException: If generation fails
+        HTTPException: If generation fails; 504 if the request deadline passes
+            before or during generation
     """
     if not llm_manager or not llm_manager.model_loaded:
         raise HTTPException(
@@ -72,14 +88,25 @@ async def generate_roast(request: LLMGenerateRequest) -> LLMGenerateResponse:
         )
     
     try:
+        check_deadline("roast generation")
+        
         # Generate roast
-        result = await roast_generator.generate_roast(
-            features=request.features,
-            roast_level=request.roast_level
-        )
+        with inference_load.track():
+            result = await roast_generator.generate_roast(
+                features=request.features,
+                roast_level=request.roast_level
+            )
         
-        return LLMGenerateResponse(**result)
+        return encoded_response(
+            LLMGenerateResponse(**result).model_dump(mode="json"),
+            http_request.headers.get("accept")
+        )
     
+    except DeadlineExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -3,7 +3,9 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from services.llm_inferencer.app.api.routes import router, set_llm_manager
+from libs.common.control_plane import ControlPlaneServer
+from libs.common.deadline import DeadlineMiddleware
+from services.llm_inferencer.app.api.routes import inference_load, router, set_llm_manager
 from services.llm_inferencer.app.services.llm_manager import LLMManager
 from services.llm_inferencer.app.config import config
 
@@ -29,6 +31,20 @@ async def lifespan(app: FastAPI):
     llm_manager = LLMManager()
     set_llm_manager(llm_manager)
     
+    # Health, readiness and metrics on their own thread, answered even while
+    # inference (or model loading) keeps the event loop busy
+    control_plane = None
+    if config.control_port:
+        control_plane = ControlPlaneServer(
+            config.host,
+            config.control_port,
+            config.service_name,
+            config.service_version,
+            models_loaded=lambda: llm_manager.model_loaded,
+            load=inference_load
+        )
+        control_plane.start()
+    
     try:
         await llm_manager.load_model()
         logger.info("LLM model loaded successfully")
@@ -41,6 +57,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info(f"Shutting down {config.service_name}")
     await llm_manager.unload_model()
+    if control_plane:
+        control_plane.stop()
 
 
 app = FastAPI(
@@ -50,6 +68,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rejects or cancels requests past the caller's X-Request-Deadline, and
+# requests whose caller disconnects
+app.add_middleware(DeadlineMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -83,6 +105,7 @@ if __name__ == "__main__":
         "services.llm_inferencer.app.main:app",
         host=config.host,
         port=config.port,
+        uds=config.uds,
         reload=config.reload,
         log_level=config.log_level.lower()
     )
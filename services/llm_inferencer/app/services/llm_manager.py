@@ -1,5 +1,10 @@
+import asyncio
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Any, Optional
+from libs.common.deadline import DeadlineExceededError, current_deadline, remaining
+from libs.common.metrics import metrics
 from services.llm_inferencer.app.config import config
 
 
@@ -7,12 +12,21 @@ logger = logging.getLogger(__name__)
 
 
 class LLMManager:
-    """Manages loading and inference for the LLM model."""
+    """
+    Manages loading and inference for the LLM model.
+    
+    Generations run one at a time in a worker thread. Waiting requests leave the
+    queue as soon as their deadline passes or they are cancelled (e.g. the
+    client disconnected), and a generation in progress stops at the next token.
+    """
     
     def __init__(self):
         self.model_loaded = False
         self.model = None
         self.tokenizer = None
+        self.generate_fn = None
+        self.stream_fn = None
+        self._generation_lock = asyncio.Lock()
         
     async def load_model(self):
         """Load the LLM model."""
@@ -23,6 +37,11 @@ class LLMManager:
             try:
                 from mlx_lm import load, generate
                 self.generate_fn = generate
+                try:
+                    from mlx_lm import stream_generate
+                    self.stream_fn = stream_generate
+                except ImportError:
+                    logger.warning("mlx_lm has no stream_generate; generations cannot be interrupted")
             except ImportError:
                 logger.warning("mlx_lm not installed. Using placeholder mode.")
                 self.model_loaded = True
@@ -58,6 +77,9 @@ class LLMManager:
         
         Returns:
             Generated text
+        
+        Raises:
+            DeadlineExceededError: If the request deadline passes while queued or generating
         """
         if not self.model_loaded:
             raise RuntimeError("Model not loaded")
@@ -80,7 +102,60 @@ class LLMManager:
             sampler = make_sampler(temp=temperature, top_p=top_p)
 
             # Generate using mlx_lm
-            response = self.generate_fn(
+            return await self._run_generation(prompt, max_tokens, sampler)
+
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating text: {e}")
+            # Fallback to placeholder
+            return self._placeholder_generate(prompt)
+    
+    async def _run_generation(self, prompt: str, max_tokens: int, sampler: Any) -> str:
+        """Wait for the model (until the deadline at most), then generate in a worker thread."""
+        acquire = asyncio.ensure_future(self._generation_lock.acquire())
+        try:
+            await asyncio.wait_for(asyncio.shield(acquire), remaining())
+        except BaseException as e:
+            if acquire.done() and not acquire.cancelled():
+                self._generation_lock.release()
+            acquire.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.increment("llm_generations_expired_in_queue")
+                raise DeadlineExceededError("Request deadline passed while queued for the LLM")
+            raise
+
+        left = remaining()
+        if left is not None and left <= 0:
+            self._generation_lock.release()
+            metrics.increment("llm_generations_expired_in_queue")
+            raise DeadlineExceededError("Request deadline passed while queued for the LLM")
+
+        stop = threading.Event()
+        worker = asyncio.ensure_future(asyncio.to_thread(
+            self._generate_blocking, prompt, max_tokens, sampler, current_deadline(), stop
+        ))
+        # The model is handed to the next request only once the thread has let go of it
+        worker.add_done_callback(lambda _: self._generation_lock.release())
+        try:
+            return await asyncio.shield(worker)
+        except asyncio.CancelledError:
+            metrics.increment("llm_generations_cancelled")
+            raise
+        finally:
+            stop.set()
+    
+    def _generate_blocking(
+        self,
+        prompt: str,
+        max_tokens: int,
+        sampler: Any,
+        deadline: Optional[float],
+        stop: threading.Event
+    ) -> str:
+        """Run one generation, stopping at the next token once stop is set or the deadline passes."""
+        if self.stream_fn is None:
+            return self.generate_fn(
                 self.model,
                 self.tokenizer,
                 prompt=prompt,
@@ -88,13 +163,16 @@ class LLMManager:
                 sampler=sampler,
                 verbose=False
             )
-
-            return response
-
-        except Exception as e:
-            logger.error(f"Error generating text: {e}")
-            # Fallback to placeholder
-            return self._placeholder_generate(prompt)
+        
+        pieces = []
+        for response in self.stream_fn(
+            self.model, self.tokenizer, prompt, max_tokens=max_tokens, sampler=sampler
+        ):
+            pieces.append(response.text)
+            if stop.is_set() or (deadline is not None and time.time() >= deadline):
+                metrics.increment("llm_generations_stopped")
+                raise DeadlineExceededError("Generation stopped: request cancelled or past its deadline")
+        return "".join(pieces)
     
     def _placeholder_generate(self, prompt: str) -> str:
         """Placeholder generation for testing without actual model."""
@@ -1,24 +1,101 @@
-import io
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from PIL import Image
-from libs.common.utils import validate_image_format, resize_image_if_needed
-from libs.common.schemas import AnalyzeImageResponse
+import functools
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import aiohttp
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+from libs.common.deadline import DeadlineExceededError, deadline_scope, remaining, until_deadline
+from libs.common.health import HealthPoller
+from libs.common.metrics import metrics
+from libs.common.workers import WorkerPoolFullError
+from libs.common.schemas import (
+    AnalyzeImageResponse,
+    CapabilitiesResponse,
+    DownstreamStatus,
+    JobResponse,
+)
 from services.main_orchestrator.app.models.schemas import HealthResponse, ErrorResponse
+from services.main_orchestrator.app.services.admission import (
+    PRIORITIES,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    AdmissionController,
+    AdmissionRejectedError,
+)
+from services.main_orchestrator.app.services.batch import (
+    BatchItem,
+    InvalidManifestError,
+    download_image,
+    ndjson_lines,
+    parse_manifest,
+    run_batch,
+)
+from services.main_orchestrator.app.services.burst import prepare_burst
+from services.main_orchestrator.app.services.fields import FieldSelection, InvalidFieldsError
+from services.main_orchestrator.app.services.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyStore,
+)
+from services.main_orchestrator.app.services.jobs import (
+    InvalidCallbackError,
+    JobScheduler,
+    JobStoreFullError,
+    validate_callback_url,
+)
+from services.main_orchestrator.app.services.ingestion import (
+    UploadRejectedError,
+    read_limited,
+    read_upload,
+)
 from services.main_orchestrator.app.services.orchestrator import OrchestratorService
+from services.main_orchestrator.app.services.outbound import outbound_session
+from services.main_orchestrator.app.services.preprocessing import (
+    UnsupportedImageError,
+    prepare_upload,
+    preprocess_pool,
+)
 from services.main_orchestrator.app.config import config
 
 
 router = APIRouter()
 orchestrator = OrchestratorService()
+idempotency_store = IdempotencyStore.from_config()
+job_scheduler = JobScheduler.from_config()
+admission = AdmissionController.from_config()
+health_poller = HealthPoller(
+    orchestrator.health_probes(),
+    interval=config.health_poll_interval_seconds,
+    timeout=config.health_probe_timeout_seconds
+)
+
+ROAST_LEVELS = ["mild", "medium", "savage"]
+SUPPORTED_UPLOAD_FORMATS = ["image/jpeg", "image/png", "image/webp"]
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
-    """Health check endpoint."""
-    downstream_health = await orchestrator.health_check()
+    """Health check endpoint, answered from the background poller's last snapshot."""
+    downstream_health = await health_poller.current()
     
     # Service is healthy if all downstream services are healthy
-    all_healthy = all(downstream_health.values())
+    all_healthy = all(service.healthy for service in downstream_health.values())
     
     return HealthResponse(
         status="healthy" if all_healthy else "degraded",
@@ -27,6 +104,38 @@ async def health_check() -> HealthResponse:
     )
 
 
+@router.get("/health/downstream", response_model=Dict[str, DownstreamStatus])
+async def downstream_health() -> Dict[str, DownstreamStatus]:
+    """Last probe of each downstream service: status, latency, and when it was checked and last changed."""
+    return await health_poller.current()
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """In-process counters and gauges (cache hit rates, etc.)."""
+    return metrics.snapshot()
+
+
+@router.get("/api/v1/capabilities", response_model=CapabilitiesResponse)
+async def get_capabilities(response: Response) -> CapabilitiesResponse:
+    """
+    Upload constraints for clients.
+
+    Clients that downscale and JPEG-encode to these limits before uploading send
+    less data and are forwarded downstream without a server-side re-encode.
+    """
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return CapabilitiesResponse(
+        max_width=config.downstream_max_width,
+        max_height=config.downstream_max_height,
+        max_upload_bytes=config.max_request_size,
+        passthrough_max_bytes=config.passthrough_max_bytes,
+        jpeg_quality=config.client_jpeg_quality,
+        supported_formats=SUPPORTED_UPLOAD_FORMATS,
+        roast_levels=ROAST_LEVELS
+    )
+
+
 @router.post(
     "/api/v1/analyze",
     response_model=AnalyzeImageResponse,
@@ -36,59 +145,489 @@ async def health_check() -> HealthResponse:
     }
 )
 async def analyze_image(
+    request: Request,
     image: UploadFile = File(..., description="Image file to analyze"),
-    roast_level: str = Form("medium", description="Roast level: mild, medium, or savage")
-) -> AnalyzeImageResponse:
+    roast_level: str = Form("medium", description="Roast level: mild, medium, or savage"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated response fields to return, e.g. "
+                    "'roast,features.face_analysis.emotion' (default: all)"
+    ),
+    include_features: bool = Query(True, description="Set to false to return only the roast"),
+    face_geometry: str = Query(
+        "list",
+        description="Face boxes and landmarks as 'list' (FaceDetection objects) or "
+                    "'packed' (base64 float32 array of shape (N, 15))"
+    ),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        description="Client-generated key; retries with the same key replay the first response"
+    ),
+    request_priority: Optional[str] = Header(
+        None,
+        alias="X-Request-Priority",
+        description="'interactive' (default) or 'batch'; batch requests queue behind interactive ones"
+    )
+) -> JSONResponse:
     """
     Analyze an uploaded image and generate a witty roast.
     
     Args:
+        request: Incoming request (client identity for rate limiting)
         image: Uploaded image file (JPEG, PNG, WEBP)
         roast_level: Intensity of the roast (mild/medium/savage)
+        fields: Optional comma-separated dotted paths selecting response fields
+        include_features: Whether to return extracted features at all
+        face_geometry: Representation of per-face boxes and landmarks ("list" or "packed")
+        idempotency_key: Optional Idempotency-Key header for safe client retries
+        request_priority: Optional X-Request-Priority header
     
     Returns:
-        AnalyzeImageResponse with roast text and extracted features
+        AnalyzeImageResponse (selected, non-null fields) with roast text and features
     
     Raises:
-        HTTPException: If image is invalid or processing fails
+        HTTPException: If image is invalid or processing fails; 429/503 with
+            Retry-After when rate limited or overloaded
     """
-    # Validate roast level
-    if roast_level not in ["mild", "medium", "savage"]:
+    _check_rate(request)
+    priority = _priority(request_priority)
+    
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid roast_level. Must be 'mild', 'medium', or 'savage'."
+            detail=f"Idempotency-Key must be 1-{MAX_IDEMPOTENCY_KEY_LENGTH} characters."
         )
     
-    # Read and validate image
+    image_bytes, content_hash, selection = await _read_request(
+        image, roast_level, fields, include_features, face_geometry
+    )
+    
+    face_detections = selection.face_detections
+    
+    if idempotency_key is None:
+        result = await _analyze(image_bytes, roast_level, content_hash, face_detections, priority)
+        return JSONResponse(selection.dump(result))
+    
+    # Completed (or in-flight) requests with this key are replayed without decoding again
     try:
-        image_bytes = await image.read()
-        
-        # Check file size
-        if len(image_bytes) > config.max_request_size:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Image too large. Maximum size is {config.max_request_size / (1024*1024)}MB"
+        result, replayed = await idempotency_store.run(
+            _client_id(request),
+            idempotency_key,
+            fingerprint=f"{content_hash}:{roast_level}:{'full' if face_detections else 'lite'}",
+            compute=lambda: _analyze(
+                image_bytes, roast_level, content_hash, face_detections, priority
             )
-        
-        # Open image with PIL
-        pil_image = Image.open(io.BytesIO(image_bytes))
-        
-        # Validate format
-        if not validate_image_format(pil_image):
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(selection.dump(result), headers=headers)
+
+
+@router.post(
+    "/api/v1/jobs",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        400: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
+    }
+)
+async def submit_job(
+    request: Request,
+    response: Response,
+    image: UploadFile = File(..., description="Image file to analyze"),
+    roast_level: str = Form("medium", description="Roast level: mild, medium, or savage"),
+    callback_url: Optional[str] = Form(
+        None, description="URL the finished job (as returned by GET /api/v1/jobs/{id}) is POSTed to"
+    ),
+    fields: Optional[str] = Query(None, description="As for /api/v1/analyze"),
+    include_features: bool = Query(True, description="As for /api/v1/analyze"),
+    face_geometry: str = Query("list", description="As for /api/v1/analyze")
+) -> JobResponse:
+    """
+    Submit an image for analysis without waiting for the roast.
+    
+    The upload is validated and read immediately; the pipeline then runs in the
+    background. Poll GET /api/v1/jobs/{job_id} (see the Location header) or pass
+    callback_url to have the result POSTed when the job finishes.
+    
+    Args:
+        request: Incoming request (client identity for rate limiting)
+        response: Response (Location header)
+        image: Uploaded image file (JPEG, PNG, WEBP)
+        roast_level: Intensity of the roast (mild/medium/savage)
+        callback_url: Optional http(s) URL notified on completion
+        fields: Optional comma-separated dotted paths selecting result fields
+        include_features: Whether the result includes extracted features at all
+        face_geometry: Representation of per-face boxes and landmarks ("list" or "packed")
+    
+    Returns:
+        JobResponse with the job id and status "queued"
+    
+    Raises:
+        HTTPException: If the upload is invalid or too many jobs are pending
+    """
+    _check_rate(request)
+    
+    if callback_url is not None:
+        try:
+            await validate_callback_url(callback_url)
+        except InvalidCallbackError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported image format: {pil_image.format}. Supported: JPEG, PNG, WEBP"
+                detail=str(e)
+            )
+    
+    image_bytes, content_hash, selection = await _read_request(
+        image, roast_level, fields, include_features, face_geometry
+    )
+    
+    async def compute() -> Dict[str, Any]:
+        result = await _analyze(
+            image_bytes, roast_level, content_hash, selection.face_detections, PRIORITY_BATCH
+        )
+        return selection.dump(result)
+    
+    try:
+        job = job_scheduler.submit(compute, callback_url=callback_url)
+    except JobStoreFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    response.headers["Location"] = f"/api/v1/jobs/{job.job_id}"
+    return job.to_response()
+
+
+@router.get(
+    "/api/v1/jobs/{job_id}",
+    response_model=JobResponse,
+    response_model_exclude_none=True,
+    responses={404: {"model": ErrorResponse}}
+)
+async def get_job(job_id: str, response: Response) -> JobResponse:
+    """
+    Status of a submitted job, with its result once it has finished.
+    
+    Raises:
+        HTTPException: If the job is unknown or its result has expired
+    """
+    job = job_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or expired."
+        )
+    
+    if not job.finished:
+        response.headers["Retry-After"] = "1"
+    return job.to_response()
+
+
+@router.post(
+    "/api/v1/analyze/batch",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}},
+        400: {"model": ErrorResponse}
+    }
+)
+async def analyze_batch(
+    request: Request,
+    images: List[UploadFile] = File([], description="Image files to analyze"),
+    manifest: Optional[str] = Form(
+        None, description='JSON array of {"url": ..., "id": ...} images to download'
+    ),
+    roast_level: str = Form("medium", description="Roast level: mild, medium, or savage"),
+    fields: Optional[str] = Query(None, description="As for /api/v1/analyze"),
+    include_features: bool = Query(True, description="As for /api/v1/analyze"),
+    face_geometry: str = Query("list", description="As for /api/v1/analyze")
+) -> StreamingResponse:
+    """
+    Analyze many images and stream each result as a JSON line as soon as it is ready.
+    
+    Images come as repeated `images` uploads and/or a `manifest` of URLs. Identical
+    images are analyzed once; at most batch_max_concurrent pipelines run at a time.
+    A failing image yields an error line instead of failing the batch.
+    
+    The whole batch takes one token from the client's rate limit; its items run
+    at batch priority, behind interactive requests, and at most
+    batch_max_concurrent at a time, which bounds what one batch can consume.
+    
+    Args:
+        request: Incoming request (client identity for rate limiting)
+        images: Uploaded image files (JPEG, PNG, WEBP)
+        manifest: Optional JSON array of image URLs with client ids
+        roast_level: Intensity of the roasts (mild/medium/savage)
+        fields: Optional comma-separated dotted paths selecting result fields
+        include_features: Whether results include extracted features at all
+        face_geometry: Representation of per-face boxes and landmarks ("list" or "packed")
+    
+    Returns:
+        application/x-ndjson stream, one line per image in completion order:
+        {"index", "id", "status", "result" | "error", "error_code"}
+    
+    Raises:
+        HTTPException: If the options or the manifest are invalid, or the batch is empty or too large
+    """
+    _check_rate(request)
+    selection = _parse_options(roast_level, fields, include_features, face_geometry)
+    
+    try:
+        entries = parse_manifest(manifest) if manifest else []
+    except InvalidManifestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    total = len(images) + len(entries)
+    if not 0 < total <= config.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch must contain 1-{config.batch_max_items} images."
+        )
+    
+    # Uploads are read when their turn comes (the files stay open while the
+    # response streams), so only batch_max_concurrent are in memory at once
+    items = [
+        BatchItem(index, upload.filename or str(index), _upload_loader(upload))
+        for index, upload in enumerate(images)
+    ]
+    
+    async def analyze(image_bytes: bytes, content_hash: str) -> Dict[str, Any]:
+        result = await _analyze(
+            image_bytes, roast_level, content_hash, selection.face_detections, PRIORITY_BATCH
+        )
+        return selection.dump(result)
+    
+    async def stream() -> AsyncIterator[bytes]:
+        timeout = aiohttp.ClientTimeout(total=config.batch_download_timeout_seconds)
+        async with outbound_session(timeout) as session:
+            for offset, entry in enumerate(entries):
+                items.append(BatchItem(
+                    len(images) + offset,
+                    entry["id"],
+                    functools.partial(download_image, session, entry["url"])
+                ))
+            metrics.increment("batch_images", len(items))
+            async for line in ndjson_lines(run_batch(items, analyze, config.batch_max_concurrent)):
+                yield line
+    
+    return StreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _upload_loader(upload: UploadFile) -> Callable[[], Awaitable[bytes]]:
+    async def load() -> bytes:
+        image_bytes, _ = await read_upload(
+            upload, max_bytes=config.max_request_size, chunk_size=config.upload_chunk_size
+        )
+        return image_bytes
+    return load
+
+
+@router.post(
+    "/api/v1/analyze/burst",
+    responses={
+        400: {"model": ErrorResponse},
+        500: {"model": ErrorResponse}
+    }
+)
+async def analyze_burst(
+    request: Request,
+    video: Optional[UploadFile] = File(None, description="Short video clip"),
+    images: List[UploadFile] = File([], description="Burst / live-photo frames, in order"),
+    roast_level: str = Form("medium", description="Roast level: mild, medium, or savage"),
+    fields: Optional[str] = Query(None, description="As for /api/v1/analyze"),
+    include_features: bool = Query(True, description="As for /api/v1/analyze"),
+    face_geometry: str = Query("list", description="As for /api/v1/analyze")
+) -> JSONResponse:
+    """
+    Roast a short clip or a photo burst at roughly the cost of a single image.
+    
+    Frames are sampled, near-duplicate frames dropped by perceptual hash, and the
+    sharpest few keyframes tiled into one montage, which runs through the normal
+    pipeline once (one face detection pass, one VLM call, one roast).
+    
+    Args:
+        request: Incoming request (client identity for rate limiting)
+        video: Video file (mutually exclusive with images)
+        images: Burst frames (JPEG, PNG, WEBP)
+        roast_level: Intensity of the roast (mild/medium/savage)
+        fields: Optional comma-separated dotted paths selecting response fields
+        include_features: Whether to return extracted features at all
+        face_geometry: Representation of per-face boxes and landmarks ("list" or "packed")
+    
+    Returns:
+        AnalyzeImageResponse fields plus "frames": {"sampled", "distinct", "keyframes"}
+    
+    Raises:
+        HTTPException: If the input is missing, invalid or too large, or processing fails
+    """
+    _check_rate(request)
+    selection = _parse_options(roast_level, fields, include_features, face_geometry)
+    
+    if (video is None) == (not images):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Send either a video or burst images."
+        )
+    if len(images) > config.burst_max_images:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A burst may contain at most {config.burst_max_images} images."
+        )
+    
+    digest = hashlib.sha256()
+    video_bytes = None
+    image_bytes: List[bytes] = []
+    try:
+        if video is not None:
+            video_bytes = await read_limited(
+                video, max_bytes=config.max_video_bytes, chunk_size=config.upload_chunk_size
+            )
+            digest.update(video_bytes)
+        for upload in images:
+            data, _ = await read_upload(
+                upload, max_bytes=config.max_request_size, chunk_size=config.upload_chunk_size
             )
-        
-        # Convert to RGB if needed (handle RGBA, grayscale, etc.)
-        if pil_image.mode != "RGB":
-            pil_image = pil_image.convert("RGB")
-        
-        # Resize if too large
-        pil_image = resize_image_if_needed(pil_image)
-        
+            image_bytes.append(data)
+            digest.update(hashlib.sha256(data).digest())
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        prepared, image_hash, frames = await preprocess_pool.run(
+            prepare_burst, video_bytes, image_bytes
+        )
+    except WorkerPoolFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy processing other uploads. Please retry shortly."
+        )
+    except UnsupportedImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    metrics.increment("burst_frames_skipped", frames["sampled"] - frames["keyframes"])
+    
+    try:
+        async with _admitted(PRIORITY_INTERACTIVE):
+            result = await until_deadline(orchestrator.process_image(
+                prepared,
+                roast_level,
+                image_hash=image_hash,
+                content_hash=f"burst:{digest.hexdigest()}",
+                face_detections=selection.face_detections
+            ))
     except HTTPException:
         raise
+    except DeadlineExceededError as e:
+        raise _deadline_exceeded(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Image processing failed: {str(e)}"
+        )
+    
+    return JSONResponse({**selection.dump(result), "frames": frames})
+
+
+async def _read_request(
+    image: UploadFile,
+    roast_level: str,
+    fields: Optional[str],
+    include_features: bool,
+    face_geometry: str
+) -> Tuple[bytes, str, FieldSelection]:
+    """
+    Validate the analyze parameters and read the upload.
+    
+    Returns:
+        Tuple of the image bytes, their SHA-256 hex digest and the field selection
+    
+    Raises:
+        HTTPException: If a parameter or the upload is invalid
+    """
+    selection = _parse_options(roast_level, fields, include_features, face_geometry)
+    
+    # Read image in chunks, validating magic bytes, dimensions and size as it arrives
+    try:
+        image_bytes, _ = await read_upload(
+            image, max_bytes=config.max_request_size, chunk_size=config.upload_chunk_size
+        )
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Exact content hash coalesces concurrent identical uploads
+    return image_bytes, hashlib.sha256(image_bytes).hexdigest(), selection
+
+
+def _parse_options(
+    roast_level: str,
+    fields: Optional[str],
+    include_features: bool,
+    face_geometry: str
+) -> FieldSelection:
+    """
+    Validate the roast level and response field options.
+    
+    Raises:
+        HTTPException: If an option is invalid
+    """
+    # Validate roast level
+    if roast_level not in ROAST_LEVELS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid roast_level. Must be 'mild', 'medium', or 'savage'."
+        )
+    
+    try:
+        return FieldSelection.parse(fields, include_features, face_geometry)
+    except InvalidFieldsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+async def _analyze(
+    image_bytes: bytes,
+    roast_level: str,
+    content_hash: str,
+    face_detections: bool = True,
+    priority: int = PRIORITY_INTERACTIVE
+) -> AnalyzeImageResponse:
+    """Decode and validate an upload, then run it through the pipeline once admitted."""
+    # Decode off the event loop so large uploads do not stall other requests
+    try:
+        prepared, image_hash = await preprocess_pool.run(
+            prepare_upload, image_bytes, config.phash_cache_enabled
+        )
+    except WorkerPoolFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy processing other uploads. Please retry shortly."
+        )
+    except UnsupportedImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,14 +636,99 @@ async def analyze_image(
     
     # Process image through the pipeline
     try:
-        result = await orchestrator.process_image(pil_image, roast_level)
+        async with _admitted(priority):
+            result = await until_deadline(orchestrator.process_image(
+                prepared,
+                roast_level,
+                image_hash=image_hash,
+                content_hash=content_hash,
+                face_detections=face_detections
+            ))
         return result
     
     except HTTPException:
         raise
+    except DeadlineExceededError as e:
+        raise _deadline_exceeded(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Image processing failed: {str(e)}"
         )
 
+
+def _client_id(request: Request) -> str:
+    """
+    Client identity for rate limits and idempotency keys.
+    
+    The remote address, or the X-Client-Id header when the request comes from one
+    of config.trusted_proxies (clients could otherwise pick a new identity per request).
+    """
+    address = request.client.host if request.client else "unknown"
+    if address in config.trusted_proxies:
+        return request.headers.get("x-client-id") or address
+    return address
+
+
+def _check_rate(request: Request) -> None:
+    """
+    Apply the per-client rate limit.
+    
+    Raises:
+        HTTPException: 429 with Retry-After if the client is over its limit
+    """
+    try:
+        admission.check_rate(_client_id(request))
+    except AdmissionRejectedError as e:
+        raise _rejection(e)
+
+
+def _priority(request_priority: Optional[str]) -> int:
+    """Queue priority from the X-Request-Priority header (default interactive)."""
+    if request_priority is None:
+        return PRIORITY_INTERACTIVE
+    if request_priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"X-Request-Priority must be one of {', '.join(PRIORITIES)}."
+        )
+    return PRIORITIES[request_priority]
+
+
+@asynccontextmanager
+async def _admitted(priority: int) -> AsyncIterator[None]:
+    """
+    Hold a pipeline slot and run under the request deadline.
+    
+    Interactive requests must finish within request_timeout, batch ones within
+    admission_batch_deadline_seconds (or by an earlier X-Request-Deadline sent
+    by the client). The deadline is forwarded to every downstream service.
+    
+    Raises:
+        HTTPException: 503 with Retry-After if the request cannot be admitted in time
+    """
+    budget = (
+        config.request_timeout if priority == PRIORITY_INTERACTIVE
+        else config.admission_batch_deadline_seconds
+    )
+    with deadline_scope(time.time() + budget):
+        try:
+            async with admission.admit(priority, remaining()):
+                yield
+        except AdmissionRejectedError as e:
+            raise _rejection(e)
+
+
+def _deadline_exceeded(error: DeadlineExceededError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=str(error)
+    )
+
+
+def _rejection(error: AdmissionRejectedError) -> HTTPException:
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": error.retry_after_header}
+    )
@@ -3,7 +3,15 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from services.main_orchestrator.app.api.routes import router
+from libs.common.body_limit import BodySizeLimitMiddleware
+from libs.common.deadline import DeadlineMiddleware
+from services.main_orchestrator.app.api.routes import (
+    health_poller,
+    job_scheduler,
+    orchestrator,
+    router,
+)
+from services.main_orchestrator.app.services.preprocessing import preprocess_pool
 from services.main_orchestrator.app.config import config
 
 
@@ -13,6 +21,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Allowance for multipart boundaries and form fields on top of the upload itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Request body limits of the upload routes, enforced before the body is parsed
+UPLOAD_LIMITS = {
+    "/api/v1/analyze": config.max_request_size + MULTIPART_OVERHEAD_BYTES,
+    "/api/v1/jobs": config.max_request_size + MULTIPART_OVERHEAD_BYTES,
+    "/api/v1/analyze/burst": config.max_video_bytes + MULTIPART_OVERHEAD_BYTES,
+    "/api/v1/analyze/batch": config.batch_max_request_bytes,
+}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -21,11 +40,19 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {config.service_name} v{config.service_version}")
     logger.info(f"Image Processing Orchestrator URL: {config.image_processing_orchestrator_url}")
     logger.info(f"LLM Inferencer URL: {config.llm_inferencer_url}")
+    logger.info(f"Preprocessing workers: {preprocess_pool.max_workers}")
+    
+    # Probe downstream services in the background; /health serves the results
+    health_poller.start()
     
     yield
     
     # Shutdown
     logger.info(f"Shutting down {config.service_name}")
+    await health_poller.stop()
+    await job_scheduler.shutdown()
+    await orchestrator.transport.close()
+    preprocess_pool.shutdown()
 
 
 app = FastAPI(
@@ -35,6 +62,13 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Cancels requests whose client disconnects (or whose X-Request-Deadline passes);
+# pipeline runs get their deadline when admitted
+app.add_middleware(DeadlineMiddleware)
+
+# Rejects oversized uploads before FastAPI spools the multipart body
+app.add_middleware(BodySizeLimitMiddleware, limits=UPLOAD_LIMITS)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -68,6 +102,7 @@ if __name__ == "__main__":
         "services.main_orchestrator.app.main:app",
         host=config.host,
         port=config.port,
+        uds=config.uds,
         reload=config.reload,
         log_level=config.log_level.lower()
     )
@@ -0,0 +1,251 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
+from libs.common.metrics import metrics
+from services.main_orchestrator.app.config import config
+
+
+logger = logging.getLogger(__name__)
+
+# Queue priorities: lower is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITIES = {"interactive": PRIORITY_INTERACTIVE, "batch": PRIORITY_BATCH}
+
+# Hard cap on tracked clients: idle (full) buckets are pruned first, then the
+# least recently used ones
+MAX_TRACKED_CLIENTS = 10_000
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is not admitted; carries the HTTP status and a Retry-After estimate."""
+
+    def __init__(self, message: str, status_code: int, retry_after: float):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (at least 1)."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """Refills rate_per_minute tokens per minute up to capacity."""
+
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self, now: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Take one token if available.
+
+        Returns:
+            Tuple of whether a token was taken and the seconds until one is available
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+    def full(self, now: float) -> bool:
+        """Whether the bucket would be full at time now."""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class AdmissionController:
+    """
+    Decides which pipeline runs start, and when.
+
+    At most max_in_flight runs execute at once; others wait in a priority queue
+    (interactive before batch, then arrival order). A request whose estimated
+    queueing plus service time exceeds its deadline is rejected immediately with
+    503 rather than timing out later. Per-client token buckets reject clients
+    over rate_per_minute with 429. Estimates use an exponentially weighted
+    moving average of observed service times.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        rate_per_minute: float = 0,
+        burst: int = 1,
+        initial_service_time: float = 5.0,
+        ewma_alpha: float = 0.2
+    ):
+        """
+        Args:
+            max_in_flight: Pipeline runs executing at once
+            max_queue: Requests allowed to wait for a slot
+            rate_per_minute: Sustained requests per client per minute (0 = unlimited)
+            burst: Requests a client may make back to back
+            initial_service_time: Service time estimate (seconds) before any observation
+            ewma_alpha: Weight of the newest observation in the service time average
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.rate_per_minute = rate_per_minute
+        self.burst = max(1, burst)
+        self.service_time = initial_service_time
+        self.ewma_alpha = ewma_alpha
+
+        self.in_flight = 0
+        self._waiters: List[List] = []  # [priority, sequence, future]
+        self._sequence = itertools.count()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls) -> "AdmissionController":
+        """Build the controller from service configuration."""
+        return cls(
+            max_in_flight=config.admission_max_in_flight,
+            max_queue=config.admission_max_queue,
+            rate_per_minute=config.rate_limit_per_minute,
+            burst=config.rate_limit_burst,
+            initial_service_time=config.admission_initial_service_time_seconds
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def check_rate(self, client_id: str) -> None:
+        """
+        Take a token from the client's bucket.
+
+        Raises:
+            AdmissionRejectedError: 429 if the client is over its rate limit
+        """
+        if self.rate_per_minute <= 0:
+            return
+
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                self._prune_buckets()
+            bucket = self._buckets[client_id] = TokenBucket(self.rate_per_minute, self.burst)
+        else:
+            self._buckets.move_to_end(client_id)
+
+        allowed, retry_after = bucket.try_acquire()
+        if not allowed:
+            metrics.increment("admission_rejected_rate_limited")
+            raise AdmissionRejectedError(
+                f"Rate limit of {self.rate_per_minute} requests per minute exceeded",
+                429,
+                retry_after
+            )
+
+    def estimate_wait(self, priority: int) -> float:
+        """Expected seconds before a new request of this priority gets a slot."""
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            return 0.0
+        ahead = sum(
+            1 for waiter_priority, _, future in self._waiters
+            if waiter_priority <= priority and not future.done()
+        )
+        # Slots free up at max_in_flight per service time on average
+        return (ahead + 1) * self.service_time / self.max_in_flight
+
+    @asynccontextmanager
+    async def admit(self, priority: int, deadline_seconds: float) -> AsyncIterator[None]:
+        """
+        Hold a pipeline slot for the duration of the block.
+
+        Args:
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BATCH
+            deadline_seconds: Time the caller will wait for the whole run
+
+        Raises:
+            AdmissionRejectedError: 503 if the queue is full or the request cannot
+                finish within its deadline
+        """
+        start = time.monotonic()
+        await self._acquire(priority, deadline_seconds)
+        metrics.set_gauge("admission_wait_ms", (time.monotonic() - start) * 1000)
+
+        run_start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            if ok:
+                self._observe(time.monotonic() - run_start)
+            self._release()
+
+    async def _acquire(self, priority: int, deadline_seconds: float) -> None:
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            self.in_flight += 1
+            self._record_gauges()
+            return
+
+        wait = self.estimate_wait(priority)
+        if self.queue_depth >= self.max_queue:
+            self._reject("Server is at capacity", wait)
+        if wait + self.service_time > deadline_seconds:
+            self._reject("Server cannot complete the request within its deadline", wait)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+        self._record_gauges()
+        try:
+            # The slot is handed over (in_flight already counted) when the future resolves
+            await asyncio.wait_for(asyncio.shield(future), deadline_seconds - self.service_time)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Got the slot just as the wait expired: give it back
+                self._release()
+            future.cancel()
+            self._reject("Timed out waiting for capacity", self.estimate_wait(priority))
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            future.cancel()
+            raise
+        finally:
+            self._record_gauges()
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                self._record_gauges()
+                return
+        self.in_flight -= 1
+        self._record_gauges()
+
+    def _observe(self, seconds: float) -> None:
+        self.service_time += self.ewma_alpha * (seconds - self.service_time)
+        metrics.set_gauge("admission_service_time_ms", self.service_time * 1000)
+
+    def _reject(self, message: str, retry_after: float) -> None:
+        metrics.increment("admission_rejected_overload")
+        raise AdmissionRejectedError(message, 503, retry_after)
+
+    def _record_gauges(self) -> None:
+        metrics.set_gauge("admission_in_flight", self.in_flight)
+        metrics.set_gauge("admission_queue_depth", self.queue_depth)
+
+    def _prune_buckets(self) -> None:
+        now = time.monotonic()
+        for client_id in [key for key, bucket in self._buckets.items() if bucket.full(now)]:
+            del self._buckets[client_id]
+        while len(self._buckets) >= MAX_TRACKED_CLIENTS:
+            self._buckets.popitem(last=False)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+import aiohttp
+from libs.common.metrics import metrics
+from services.main_orchestrator.app.config import config
+from services.main_orchestrator.app.services.ingestion import UploadRejectedError, read_upload
+from services.main_orchestrator.app.services.outbound import (
+    BlockedDestinationError,
+    check_host,
+    check_url,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidManifestError(ValueError):
+    """Raised when a batch manifest cannot be parsed."""
+
+
+@dataclass
+class BatchItem:
+    """One image of a batch; load() returns its validated bytes."""
+
+    index: int
+    item_id: str
+    load: Callable[[], Awaitable[bytes]]
+
+
+def parse_manifest(manifest: str) -> List[Dict[str, str]]:
+    """
+    Parse a batch manifest: a JSON array of {"url": ..., "id": optional} objects.
+
+    Returns:
+        Entries with "url" and "id" (defaults to the URL)
+
+    Raises:
+        InvalidManifestError: If the manifest is not a list of http(s) URL entries,
+            or a URL's host is not allowed (see outbound.check_host)
+    """
+    try:
+        entries = json.loads(manifest)
+    except ValueError as e:
+        raise InvalidManifestError(f"Manifest is not valid JSON: {e}")
+    if not isinstance(entries, list):
+        raise InvalidManifestError("Manifest must be a JSON array")
+
+    parsed = []
+    for position, entry in enumerate(entries):
+        url = entry.get("url") if isinstance(entry, dict) else None
+        if not isinstance(url, str):
+            raise InvalidManifestError(f"Manifest entry {position} needs an http(s) 'url'")
+        try:
+            check_host(url)
+        except BlockedDestinationError as e:
+            raise InvalidManifestError(f"Manifest entry {position}: {e}")
+        parsed.append({"url": url, "id": str(entry.get("id") or url)})
+    return parsed
+
+
+async def download_image(session: aiohttp.ClientSession, url: str) -> bytes:
+    """
+    Download a manifest image with the same checks as an upload.
+
+    The session should come from outbound.outbound_session, so that the
+    addresses connected to are checked too.
+
+    Raises:
+        UploadRejectedError: If the URL may not be fetched, the download fails or
+            the image is rejected
+    """
+    try:
+        await check_url(url)
+        async with session.get(url, allow_redirects=False) as response:
+            if response.status != 200:
+                raise UploadRejectedError(f"Download returned status {response.status}")
+            image_bytes, _ = await read_upload(
+                response.content,
+                max_bytes=config.max_request_size,
+                chunk_size=config.upload_chunk_size
+            )
+            return image_bytes
+    except BlockedDestinationError as e:
+        raise UploadRejectedError(f"Image URL rejected: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # Details (addresses, resolver errors) stay in the log
+        logger.warning(f"Download of {url} failed: {e or type(e).__name__}")
+        raise UploadRejectedError("Download failed")
+
+
+async def run_batch(
+    items: List[BatchItem],
+    analyze: Callable[[bytes, str], Awaitable[Dict[str, Any]]],
+    max_concurrent: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a batch through the pipeline and yield each item's outcome as soon as it is ready.
+
+    Identical images (by SHA-256) are analyzed once and reported for every item
+    carrying them. An item holds one of max_concurrent slots from loading its
+    image until its result is ready, so at most max_concurrent images are in
+    memory or being analyzed at once.
+
+    Args:
+        items: Batch items in submission order
+        analyze: Coroutine taking image bytes and their content hash, returning the result
+        max_concurrent: Pipelines (and downloads) in flight at once
+
+    Yields:
+        {"index", "id", "status": "success", "result"} or
+        {"index", "id", "status": "error", "error", "error_code"} per item;
+        deduplicated items also carry "duplicate_of" (index of the analyzed item)
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    analyses: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+    owners: Dict[str, int] = {}
+
+    async def analyze_once(image_bytes: bytes, content_hash: str) -> Dict[str, Any]:
+        return await analyze(image_bytes, content_hash)
+
+    async def process(item: BatchItem) -> Dict[str, Any]:
+        line: Dict[str, Any] = {"index": item.index, "id": item.item_id}
+        try:
+            async with semaphore:
+                image_bytes = await item.load()
+                content_hash = hashlib.sha256(image_bytes).hexdigest()
+
+                task = analyses.get(content_hash)
+                if task is None:
+                    task = asyncio.create_task(analyze_once(image_bytes, content_hash))
+                    analyses[content_hash] = task
+                    owners[content_hash] = item.index
+                else:
+                    metrics.increment("batch_duplicates")
+                    line["duplicate_of"] = owners[content_hash]
+
+                result = await asyncio.shield(task)
+            line.update(status="success", result=result)
+        except Exception as e:
+            line.update(
+                status="error",
+                error=str(getattr(e, "detail", e)),
+                error_code=getattr(e, "status_code", 400 if isinstance(e, ValueError) else 500)
+            )
+        return line
+
+    tasks = [asyncio.create_task(process(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away (or the batch finished): stop whatever is still running
+        for task in [*tasks, *analyses.values()]:
+            task.cancel()
+        await asyncio.gather(*tasks, *analyses.values(), return_exceptions=True)
+
+
+async def ndjson_lines(lines: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode each item as one JSON line."""
+    async for line in lines:
+        yield json.dumps(line).encode("utf-8") + b"\n"
+
@@ -0,0 +1,238 @@
+import math
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from PIL import Image
+from libs.common.codec import decode_pil, fit_size
+from libs.common.phash import dhash, hamming_distance
+from services.main_orchestrator.app.config import config
+from services.main_orchestrator.app.services.preprocessing import PreparedImage, UnsupportedImageError
+
+
+# Frames are decoded at this size for hashing, sharpness and the montage tiles
+FRAME_MAX_SIDE = 960
+
+# Gap between montage tiles (pixels)
+MONTAGE_GAP = 8
+
+# Sampled positions further apart than this (frames) are reached by seeking;
+# closer ones are cheaper to reach by grabbing the frames in between
+SEEK_MIN_GAP = 30
+
+
+@dataclass
+class Frame:
+    """One sampled frame of a clip or burst."""
+
+    index: int
+    image: Image.Image
+    timestamp_ms: Optional[float] = None
+    image_hash: int = field(init=False)
+    sharpness: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.image_hash = dhash(self.image)
+        gray = cv2.cvtColor(np.asarray(self.image), cv2.COLOR_RGB2GRAY)
+        # Variance of the Laplacian: low for blurry or motion-smeared frames
+        self.sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def sample_video_frames(data: bytes, max_frames: int) -> List[Frame]:
+    """
+    Decode up to max_frames frames spread evenly over a video.
+
+    Long gaps between sampled positions are skipped by seeking (the backend
+    decodes from the nearest keyframe); short gaps are grabbed but not converted.
+
+    Args:
+        data: Encoded video (any container/codec OpenCV's backend can read)
+        max_frames: Maximum number of frames to return
+
+    Returns:
+        Sampled frames in time order
+
+    Raises:
+        UnsupportedImageError: If the video cannot be decoded
+    """
+    # OpenCV reads videos from a path only
+    fd, path = tempfile.mkstemp(suffix=".video")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        capture = cv2.VideoCapture(path)
+        try:
+            if not capture.isOpened():
+                raise UnsupportedImageError("Unsupported or corrupt video")
+            total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+            if total <= 0:
+                raise UnsupportedImageError("Video has no frames")
+
+            count = min(max_frames, total)
+            wanted = {round(i * (total - 1) / max(count - 1, 1)) for i in range(count)}
+            frames = []
+            next_position = 0  # Frame the next grab() returns
+            for position in sorted(wanted):
+                if position - next_position > SEEK_MIN_GAP and capture.set(cv2.CAP_PROP_POS_FRAMES, position):
+                    next_position = position
+                while next_position < position and capture.grab():
+                    next_position += 1
+                # The frame count is only an estimate for some containers
+                if next_position < position or not capture.grab():
+                    break
+                next_position += 1
+                ok, bgr = capture.retrieve()
+                if not ok:
+                    continue
+                frames.append(Frame(
+                    index=position,
+                    image=_fit(Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))),
+                    timestamp_ms=position * 1000 / fps if fps else None
+                ))
+        finally:
+            capture.release()
+    finally:
+        os.unlink(path)
+
+    if not frames:
+        raise UnsupportedImageError("Could not decode any video frame")
+    return frames
+
+
+def burst_frames(images: List[bytes]) -> List[Frame]:
+    """
+    Decode burst photos (already validated uploads) as frames.
+
+    Raises:
+        UnsupportedImageError: If an image cannot be decoded
+    """
+    frames = []
+    for index, data in enumerate(images):
+        try:
+            image = decode_pil(data, FRAME_MAX_SIDE, FRAME_MAX_SIDE)
+        except Exception as e:
+            raise UnsupportedImageError(f"Could not decode burst image {index}: {e}")
+        frames.append(Frame(index=index, image=image))
+    return frames
+
+
+def drop_near_duplicates(frames: List[Frame], max_distance: int) -> List[Frame]:
+    """
+    Collapse runs of consecutive near-identical frames into their sharpest frame.
+
+    Args:
+        frames: Frames in time order
+        max_distance: Largest dHash distance (bits of 64) still counted as the same shot
+
+    Returns:
+        Distinct frames in time order
+    """
+    distinct: List[Frame] = []
+    for frame in frames:
+        if distinct and hamming_distance(frame.image_hash, distinct[-1].image_hash) <= max_distance:
+            if frame.sharpness > distinct[-1].sharpness:
+                distinct[-1] = frame
+            continue
+        distinct.append(frame)
+    return distinct
+
+
+def select_keyframes(frames: List[Frame], count: int) -> List[Frame]:
+    """
+    Pick the sharpest frame from each of count equal stretches of the clip.
+
+    Args:
+        frames: Distinct frames in time order
+        count: Number of keyframes wanted
+
+    Returns:
+        Up to count frames in time order
+    """
+    if len(frames) <= count:
+        return list(frames)
+    bounds = np.linspace(0, len(frames), count + 1).round().astype(int)
+    return [
+        max(frames[start:end], key=lambda frame: frame.sharpness)
+        for start, end in zip(bounds[:-1], bounds[1:], strict=True)
+        if end > start
+    ]
+
+
+def make_montage(frames: List[Frame], max_width: int, max_height: int) -> Image.Image:
+    """
+    Tile frames into one image no larger than max_width x max_height.
+
+    A single frame is returned as-is (fitted to the bounds).
+
+    Args:
+        frames: Keyframes in time order (row-major in the grid)
+        max_width: Maximum montage width
+        max_height: Maximum montage height
+
+    Returns:
+        RGB montage
+    """
+    if len(frames) == 1:
+        image = frames[0].image
+        return image.resize(fit_size(image.width, image.height, max_width, max_height), Image.Resampling.BOX)
+
+    columns = math.ceil(math.sqrt(len(frames)))
+    rows = math.ceil(len(frames) / columns)
+    cell_width = (max_width - MONTAGE_GAP * (columns - 1)) // columns
+    cell_height = (max_height - MONTAGE_GAP * (rows - 1)) // rows
+
+    montage = Image.new("RGB", (max_width, max_height))
+    for position, frame in enumerate(frames):
+        tile = frame.image.resize(
+            fit_size(frame.image.width, frame.image.height, cell_width, cell_height),
+            Image.Resampling.BOX
+        )
+        row, column = divmod(position, columns)
+        left = column * (cell_width + MONTAGE_GAP) + (cell_width - tile.width) // 2
+        top = row * (cell_height + MONTAGE_GAP) + (cell_height - tile.height) // 2
+        montage.paste(tile, (left, top))
+    return montage
+
+
+def prepare_burst(
+    video: Optional[bytes],
+    images: List[bytes]
+) -> Tuple[PreparedImage, int, Dict[str, int]]:
+    """
+    Reduce a clip or burst to one montage of a few distinct, sharp keyframes.
+
+    The montage goes through the single-image pipeline, so face detection and
+    the VLM each run once over all keyframes instead of once per frame.
+    CPU-bound; runs inside the preprocessing pool.
+
+    Args:
+        video: Encoded video, or None for a burst
+        images: Burst photos (ignored when a video is given)
+
+    Returns:
+        Tuple of the prepared montage, its perceptual hash and frame counts
+        ({"sampled", "distinct", "keyframes"})
+
+    Raises:
+        UnsupportedImageError: If the frames cannot be decoded
+    """
+    if video is not None:
+        frames = sample_video_frames(video, config.burst_max_sampled_frames)
+    else:
+        frames = burst_frames(images)
+
+    distinct = drop_near_duplicates(frames, config.burst_duplicate_max_distance)
+    keyframes = select_keyframes(distinct, config.burst_keyframes)
+    montage = make_montage(keyframes, config.downstream_max_width, config.downstream_max_height)
+
+    counts = {"sampled": len(frames), "distinct": len(distinct), "keyframes": len(keyframes)}
+    return PreparedImage(image=montage), dhash(montage), counts
+
+
+def _fit(image: Image.Image) -> Image.Image:
+    size = fit_size(image.width, image.height, FRAME_MAX_SIDE, FRAME_MAX_SIDE)
+    return image if size == image.size else image.resize(size, Image.Resampling.BOX)
@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from libs.common.cache import CacheBackend
+from libs.common.coalesce import CoalescingCache
+from libs.common.metrics import metrics
+from libs.common.phash import BKTree
+from libs.common.schemas import AggregatedImageFeatures
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedAnalysis:
+    """Features (and roasts per level) cached for one perceptual hash."""
+
+    image_hash: int
+    features: AggregatedImageFeatures
+    roasts: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+
+def is_complete(features: AggregatedImageFeatures) -> bool:
+    """Only results from every analyzer are cached, so a failed analyzer is retried."""
+    return features.face_analysis is not None and features.vlm_scene_analysis is not None
+
+
+def has_face_detections(features: AggregatedImageFeatures) -> bool:
+    """Whether per-face boxes and landmarks are present (or there are no faces)."""
+    face_analysis = features.face_analysis
+    return (
+        face_analysis is None or
+        face_analysis.face_count == 0 or
+        bool(face_analysis.faces) or
+        face_analysis.packed_faces is not None
+    )
+
+
+class PerceptualFeatureCache:
+    """
+    LRU cache of image features keyed by perceptual hash.
+
+    Lookups match any stored hash within max_distance bits, so re-encoded,
+    resized or slightly recompressed copies of an image share one entry.
+
+    With a shared backend, exact-hash entries and roasts are also published for other
+    replicas, and concurrent misses for the same hash are computed once cluster-wide.
+    Near-duplicate matching stays local to each replica's BK-tree.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_distance: int,
+        ttl_seconds: float,
+        shared: Optional[CacheBackend] = None,
+        lock_ttl_seconds: float = 60.0
+    ):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+
+        self._entries: "OrderedDict[int, CachedAnalysis]" = OrderedDict()
+        self._index = BKTree()
+        self._lock = threading.Lock()
+        self._coalescer = (
+            CoalescingCache(shared, lock_ttl=lock_ttl_seconds) if shared is not None else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, image_hash: int, face_detections: bool = False) -> Optional[CachedAnalysis]:
+        """
+        Find the closest cached entry for an image hash.
+
+        Args:
+            image_hash: Perceptual hash of the uploaded image
+            face_detections: Skip entries computed without per-face boxes and landmarks
+
+        Returns:
+            Cached analysis or None on a miss
+        """
+        with self._lock:
+            now = time.time()
+            for distance, candidate, _ in self._index.search(image_hash, self.max_distance):
+                entry = self._entries.get(candidate)
+                if entry is None:
+                    continue
+                if now - entry.created_at >= self.ttl_seconds:
+                    self._evict(candidate)
+                    continue
+                if face_detections and not has_face_detections(entry.features):
+                    continue
+                self._entries.move_to_end(candidate)
+                metrics.increment("phash_cache_hits")
+                logger.info(f"Perceptual cache hit at distance {distance}")
+                return entry
+
+        metrics.increment("phash_cache_misses")
+        return None
+
+    def store(self, image_hash: int, features: AggregatedImageFeatures) -> CachedAnalysis:
+        """Cache features for an image hash, evicting the least recently used entry."""
+        with self._lock:
+            entry = CachedAnalysis(image_hash=image_hash, features=features)
+            self._entries[image_hash] = entry
+            self._entries.move_to_end(image_hash)
+            self._index.add(image_hash)
+
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._evict(oldest)
+
+            metrics.set_gauge("phash_cache_entries", len(self._entries))
+            return entry
+
+    def store_roast(self, image_hash: int, roast_level: str, roast: str) -> None:
+        """Attach a generated roast to an existing entry."""
+        with self._lock:
+            entry = self._entries.get(image_hash)
+            if entry is not None:
+                entry.roasts[roast_level] = roast
+
+    async def get_or_compute(
+        self,
+        image_hash: int,
+        compute: Callable[[], Awaitable[AggregatedImageFeatures]],
+        face_detections: bool = True
+    ) -> Tuple[AggregatedImageFeatures, Optional[CachedAnalysis]]:
+        """
+        Return features for an image, computing them on a miss.
+
+        Entries computed without per-face detections only satisfy requests that do
+        not need them; a full computation replaces them.
+
+        Args:
+            image_hash: Perceptual hash of the uploaded image
+            compute: Coroutine factory running the image processing pipeline
+            face_detections: Whether the caller needs per-face boxes and landmarks
+
+        Returns:
+            Tuple of features and the cache entry holding them (None if not cacheable)
+        """
+        entry = self.lookup(image_hash, face_detections)
+        if entry is not None:
+            return entry.features, entry
+
+        if self._coalescer is None:
+            features = await compute()
+        else:
+            computed: Optional[AggregatedImageFeatures] = None
+
+            async def produce() -> Optional[bytes]:
+                nonlocal computed
+                computed = await compute()
+                return computed.model_dump_json().encode("utf-8") if is_complete(computed) else None
+
+            kind = "features" if face_detections else "features:lite"
+            value = await self._coalescer.get_or_compute(
+                self._shared_key(kind, image_hash), produce, ttl=self.ttl_seconds
+            )
+            if computed is not None:
+                features = computed
+            elif value is not None:
+                metrics.increment("phash_cache_shared_hits")
+                features = AggregatedImageFeatures.model_validate_json(value)
+            else:
+                # The coalesced computation produced an incomplete result; run our own
+                features = await compute()
+
+        if not is_complete(features):
+            return features, None
+        return features, self.store(image_hash, features)
+
+    async def get_roast(self, entry: CachedAnalysis, roast_level: str) -> Optional[str]:
+        """Cached roast for an entry, checking the shared tier on a local miss."""
+        roast = entry.roasts.get(roast_level)
+        if roast is not None or self.shared is None:
+            return roast
+
+        try:
+            value = await self.shared.get(self._shared_key(f"roast:{roast_level}", entry.image_hash))
+        except Exception as e:
+            logger.error(f"Shared roast lookup failed: {e}")
+            return None
+
+        if value is None:
+            return None
+        roast = value.decode("utf-8")
+        entry.roasts[roast_level] = roast
+        return roast
+
+    async def save_roast(self, entry: CachedAnalysis, roast_level: str, roast: str) -> None:
+        """Attach a roast to an entry and publish it to the shared tier."""
+        self.store_roast(entry.image_hash, roast_level, roast)
+        if self.shared is None:
+            return
+
+        try:
+            await self.shared.set(
+                self._shared_key(f"roast:{roast_level}", entry.image_hash),
+                roast.encode("utf-8"),
+                ttl=self.ttl_seconds
+            )
+        except Exception as e:
+            logger.error(f"Shared roast write failed: {e}")
+
+    @staticmethod
+    def _shared_key(kind: str, image_hash: int) -> str:
+        return f"phash:{kind}:{image_hash:016x}"
+
+    def _evict(self, image_hash: int) -> None:
+        """Drop an entry; rebuild the index once stale hashes dominate it."""
+        self._entries.pop(image_hash, None)
+        # BK-trees do not support deletion, so stale hashes are skipped on lookup
+        if len(self._index) > 2 * max(len(self._entries), 1):
+            self._index = BKTree()
+            for hash_value in self._entries:
+                self._index.add(hash_value)
@@ -0,0 +1,173 @@
+import typing
+from typing import Any, Dict, List, Optional, Type
+from pydantic import BaseModel
+from libs.common.geometry import detections_to_faces, unpack_array
+from libs.common.schemas import AnalyzeImageResponse
+
+
+# Always returned, whatever the selection
+REQUIRED_FIELDS = ("request_id", "roast", "status")
+
+# Per-face bounding boxes and landmarks, which analyzers can skip producing
+FACE_DETECTIONS_PATH = "features.face_analysis.faces"
+PACKED_FACES_PATH = "features.face_analysis.packed_faces"
+
+# Representations of face geometry a client can ask for
+FACE_GEOMETRY_FORMATS = ("list", "packed")
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a field selection names a field that does not exist."""
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Model type inside an annotation such as Optional[X] or List[X]."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+def _is_under(path: str, prefix: str) -> bool:
+    return path == prefix or path.startswith(prefix + ".")
+
+
+def _is_list(annotation: Any) -> bool:
+    if typing.get_origin(annotation) in (list, List):
+        return True
+    return any(_is_list(arg) for arg in typing.get_args(annotation))
+
+
+class FieldSelection:
+    """
+    Subset of AnalyzeImageResponse requested by a client.
+
+    Paths are dotted field names (``features.face_analysis.emotion``); selecting
+    a field selects everything beneath it. Null fields are always omitted.
+
+    Face geometry is returned either as FaceDetection lists (``faces``) or as
+    the packed float32 array (``packed_faces``); selecting ``faces`` selects
+    whichever representation was requested.
+    """
+
+    def __init__(self, paths: Optional[List[str]] = None, face_geometry: str = "list"):
+        self.paths = paths
+        self.face_geometry = face_geometry
+
+    @classmethod
+    def parse(
+        cls,
+        fields: Optional[str],
+        include_features: bool = True,
+        face_geometry: str = "list"
+    ) -> "FieldSelection":
+        """
+        Build a selection from the ``fields`` and ``include_features`` parameters.
+
+        Args:
+            fields: Comma-separated dotted paths, or None for every field
+            include_features: Whether any part of ``features`` may be returned
+            face_geometry: "list" or "packed"
+
+        Returns:
+            FieldSelection
+
+        Raises:
+            InvalidFieldsError: If a path does not name a response field, or the
+                face geometry format is unknown
+        """
+        if face_geometry not in FACE_GEOMETRY_FORMATS:
+            raise InvalidFieldsError(f"Unknown face geometry format: {face_geometry}")
+
+        if fields is None:
+            if include_features:
+                return cls(face_geometry=face_geometry)
+            paths = [name for name in AnalyzeImageResponse.model_fields if name != "features"]
+            return cls(paths, face_geometry)
+
+        paths = [path.strip() for path in fields.split(",") if path.strip()]
+        for path in paths:
+            cls._validate(path)
+        if not include_features:
+            paths = [path for path in paths if path.split(".")[0] != "features"]
+        if face_geometry == "packed" and any(_is_under(path, FACE_DETECTIONS_PATH) for path in paths):
+            paths = [path for path in paths if not _is_under(path, FACE_DETECTIONS_PATH)]
+            paths.append(PACKED_FACES_PATH)
+        return cls(sorted(set(paths) | set(REQUIRED_FIELDS)), face_geometry)
+
+    @property
+    def is_full(self) -> bool:
+        """Whether every field is selected."""
+        return self.paths is None
+
+    @property
+    def face_detections(self) -> bool:
+        """Whether per-face bounding boxes and landmarks are needed."""
+        if self.paths is None:
+            return True
+        return any(
+            FACE_DETECTIONS_PATH.startswith(path + ".") or
+            _is_under(path, FACE_DETECTIONS_PATH) or
+            _is_under(path, PACKED_FACES_PATH)
+            for path in self.paths
+        )
+
+    def dump(self, response: AnalyzeImageResponse) -> Dict[str, Any]:
+        """Serialize the selected, non-null fields of a response."""
+        return self._apply_face_geometry(response).model_dump(
+            mode="json", include=self._include_tree(), exclude_none=True
+        )
+
+    def _apply_face_geometry(self, response: AnalyzeImageResponse) -> AnalyzeImageResponse:
+        """Convert face geometry to the requested representation."""
+        face_analysis = response.features.face_analysis if response.features else None
+        if (
+            self.face_geometry == "packed" or
+            face_analysis is None or
+            face_analysis.packed_faces is None
+        ):
+            return response
+
+        faces = detections_to_faces(unpack_array(face_analysis.packed_faces))
+        features = response.features.model_copy(update={
+            "face_analysis": face_analysis.model_copy(
+                update={"faces": faces, "packed_faces": None}
+            )
+        })
+        return response.model_copy(update={"features": features})
+
+    def _include_tree(self) -> Optional[Dict[str, Any]]:
+        if self.paths is None:
+            return None
+
+        tree: Dict[str, Any] = {}
+        for path in self.paths:
+            node = tree
+            model: Optional[Type[BaseModel]] = AnalyzeImageResponse
+            parts = path.split(".")
+            for index, part in enumerate(parts):
+                last = index == len(parts) - 1
+                if node.get(part) is True:
+                    break
+                if last:
+                    node[part] = True
+                    break
+                annotation = model.model_fields[part].annotation
+                child = node.setdefault(part, {})
+                if _is_list(annotation):
+                    # Apply the sub-selection to every list item
+                    child = child.setdefault("__all__", {})
+                node = child
+                model = _nested_model(annotation)
+        return tree
+
+    @staticmethod
+    def _validate(path: str) -> None:
+        model: Optional[Type[BaseModel]] = AnalyzeImageResponse
+        for part in path.split("."):
+            if model is None or part not in model.model_fields:
+                raise InvalidFieldsError(f"Unknown field: {path}")
+            model = _nested_model(model.model_fields[part].annotation)
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+from typing import Awaitable, Callable, Optional, Tuple
+from libs.common.cache import CacheBackend, MemoryCache, create_cache_backend
+from libs.common.coalesce import CoalescingCache
+from libs.common.metrics import metrics
+from libs.common.schemas import AnalyzeImageResponse
+from services.main_orchestrator.app.config import config
+
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused for a different request."""
+
+
+class IdempotencyStore:
+    """
+    Replays completed responses for client-supplied idempotency keys.
+
+    Keys are scoped to the client as the server identifies it (remote address, or
+    X-Client-Id from a trusted proxy), so one client cannot replay another's
+    response by guessing its key. A retry that arrives while the
+    original request is still running attaches to it instead of starting a new
+    pipeline (across replicas when the backend is shared).
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float, lock_ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.coalescer = CoalescingCache(backend, lock_ttl=lock_ttl_seconds)
+
+    @classmethod
+    def from_config(cls) -> "IdempotencyStore":
+        """Build the store on the shared cache tier if configured, else in memory."""
+        if config.shared_cache_url:
+            backend = create_cache_backend(
+                config.shared_cache_url, default_ttl=config.idempotency_ttl_seconds
+            )
+        else:
+            backend = MemoryCache(
+                max_bytes=config.idempotency_max_bytes,
+                default_ttl=config.idempotency_ttl_seconds
+            )
+        return cls(
+            backend,
+            ttl_seconds=config.idempotency_ttl_seconds,
+            lock_ttl_seconds=config.shared_cache_lock_ttl_seconds
+        )
+
+    async def run(
+        self,
+        client_id: str,
+        idempotency_key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[AnalyzeImageResponse]]
+    ) -> Tuple[AnalyzeImageResponse, bool]:
+        """
+        Run compute once per idempotency key and replay its response afterwards.
+
+        Args:
+            client_id: Server-established client identity (remote address, or
+                X-Client-Id from a trusted proxy); never a header taken as given
+            idempotency_key: Client-supplied Idempotency-Key header
+            fingerprint: Identifies the request payload (content hash + roast level)
+            compute: Coroutine factory running the pipeline
+
+        Returns:
+            Tuple of the response and whether it was replayed rather than computed here
+
+        Raises:
+            IdempotencyConflictError: If the key was used for a different payload
+        """
+        computed: Optional[AnalyzeImageResponse] = None
+
+        async def produce() -> bytes:
+            nonlocal computed
+            computed = await compute()
+            return json.dumps({
+                "fingerprint": fingerprint,
+                "response": computed.model_dump(mode="json"),
+            }).encode("utf-8")
+
+        # Failures raise out of produce() and are never stored, so a retry re-runs them
+        client = hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:32]
+        value = await self.coalescer.get_or_compute(
+            f"idempotency:{client}:{idempotency_key}", produce, ttl=self.ttl_seconds
+        )
+        if computed is not None:
+            return computed, False
+
+        stored = json.loads(value)
+        if stored["fingerprint"] != fingerprint:
+            raise IdempotencyConflictError(
+                "Idempotency-Key was already used for a different request"
+            )
+
+        metrics.increment("idempotency_replays")
+        return AnalyzeImageResponse.model_validate(stored["response"]), True
@@ -0,0 +1,128 @@
+from typing import AsyncIterator, Optional, Tuple
+from fastapi import UploadFile
+from libs.common.image_probe import ImageHeader, header_end, probe_image_header, sniff_format
+from libs.common.metrics import metrics
+from services.main_orchestrator.app.config import config
+
+
+# The header is searched for within this many leading bytes (JPEG EXIF/ICC blocks can be large)
+MAX_HEADER_BYTES = 512 * 1024
+
+
+class UploadRejectedError(ValueError):
+    """Raised when an upload is rejected before being fully read or decoded."""
+
+
+def check_dimensions(header: ImageHeader) -> None:
+    """
+    Reject images whose declared dimensions are absurd before decoding them.
+
+    Raises:
+        UploadRejectedError: If either side or the total pixel count exceeds the limits
+    """
+    if header.width <= 0 or header.height <= 0:
+        raise UploadRejectedError(f"Invalid image dimensions {header.width}x{header.height}")
+    if max(header.width, header.height) > config.max_image_dimension:
+        raise UploadRejectedError(
+            f"Image dimensions {header.width}x{header.height} exceed the maximum side of "
+            f"{config.max_image_dimension}px"
+        )
+    if header.width * header.height > config.max_image_pixels:
+        raise UploadRejectedError(
+            f"Image has {header.width * header.height} pixels; maximum is {config.max_image_pixels}"
+        )
+
+
+async def _read_chunks(
+    upload: UploadFile,
+    max_bytes: int,
+    chunk_size: int,
+    kind: str = "Image"
+) -> AsyncIterator[bytearray]:
+    """Read an upload in chunks, yielding the data read so far after each one."""
+    buffer = bytearray()
+    while chunk := await upload.read(chunk_size):
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            metrics.increment("uploads_rejected_size")
+            raise UploadRejectedError(
+                f"{kind} too large. Maximum size is {max_bytes / (1024*1024)}MB"
+            )
+        yield buffer
+
+
+async def read_limited(
+    upload: UploadFile,
+    max_bytes: int,
+    chunk_size: int,
+    kind: str = "File"
+) -> bytes:
+    """
+    Read an upload of any type in chunks, rejecting it as soon as it exceeds max_bytes.
+
+    Raises:
+        UploadRejectedError: If the upload is too large
+    """
+    data = bytearray()
+    # Every chunk yields the same growing buffer; keep the last one
+    async for buffer in _read_chunks(upload, max_bytes, chunk_size, kind):
+        data = buffer
+    return bytes(data)
+
+
+async def read_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    chunk_size: int
+) -> Tuple[bytes, Optional[ImageHeader]]:
+    """
+    Read an upload in chunks, validating it as early as possible.
+
+    The magic bytes are checked on the first chunk, the header dimensions as soon as
+    the header has been read, and the size cap on every chunk, so invalid or oversized
+    uploads are abandoned without being buffered in full.
+
+    Args:
+        upload: Uploaded file (or any stream with an async read(n), e.g. a download)
+        max_bytes: Maximum accepted file size
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        Tuple of the file contents and its parsed header (None if it could not be found)
+
+    Raises:
+        UploadRejectedError: If the upload is too large, not an image or has absurd dimensions
+    """
+    buffer = bytearray()
+    header: Optional[ImageHeader] = None
+    format_checked = False
+    header_done = False
+
+    async for buffer in _read_chunks(upload, max_bytes, chunk_size):
+        if not format_checked and len(buffer) >= 12:
+            if sniff_format(buffer) is None:
+                metrics.increment("uploads_rejected_format")
+                raise UploadRejectedError("Unsupported image format. Supported: JPEG, PNG, WEBP")
+            format_checked = True
+
+        if format_checked and not header_done:
+            # Probe once, when the bytes holding the dimensions have all arrived
+            end = header_end(buffer)
+            if end is None or end > MAX_HEADER_BYTES:
+                # Leave the final verdict to the decoder
+                header_done = True
+            elif len(buffer) >= end:
+                header = probe_image_header(bytes(buffer[:end]))
+                if header is not None:
+                    try:
+                        check_dimensions(header)
+                    except UploadRejectedError:
+                        metrics.increment("uploads_rejected_dimensions")
+                        raise
+                header_done = True
+
+    if not format_checked:
+        metrics.increment("uploads_rejected_format")
+        raise UploadRejectedError("Unsupported image format. Supported: JPEG, PNG, WEBP")
+
+    return bytes(buffer), header
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+import aiohttp
+from libs.common.metrics import metrics
+from libs.common.schemas import JobResponse
+from services.main_orchestrator.app.config import config
+from services.main_orchestrator.app.services.outbound import (
+    BlockedDestinationError,
+    check_url,
+    outbound_session,
+)
+
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobStoreFullError(Exception):
+    """Raised when no more jobs can be accepted until some finish or expire."""
+
+
+class InvalidCallbackError(Exception):
+    """Raised when a callback URL is not an absolute http(s) URL the service may reach."""
+
+
+@dataclass
+class Job:
+    """State of one submitted analysis."""
+
+    job_id: str
+    callback_url: Optional[str] = None
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    completed_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    error_code: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_response(self) -> JobResponse:
+        """Public view of the job."""
+        return JobResponse(
+            job_id=self.job_id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            result=self.result,
+            error=self.error,
+            error_code=self.error_code
+        )
+
+
+async def validate_callback_url(url: str) -> str:
+    """
+    Check that a callback URL can be delivered to.
+
+    The host must be on outbound_allowed_hosts (if set) and resolve only to
+    public addresses.
+
+    Raises:
+        InvalidCallbackError: If the URL is not an absolute http(s) URL or its
+            host may not be reached
+    """
+    try:
+        return await check_url(url)
+    except BlockedDestinationError as e:
+        raise InvalidCallbackError(f"callback_url rejected: {e}")
+
+
+class JobScheduler:
+    """
+    Runs submitted analyses in the background and keeps their results for polling.
+
+    At most max_concurrent jobs run at once; the rest wait in submission order.
+    Finished jobs are kept for ttl_seconds, and at most max_entries jobs are held
+    in total (the oldest finished ones are evicted first). Results are optionally
+    POSTed to a callback URL when the job finishes.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_entries: int,
+        ttl_seconds: float,
+        callback_timeout_seconds: float = 10.0,
+        callback_retries: int = 3
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.callback_timeout_seconds = callback_timeout_seconds
+        self.callback_retries = callback_retries
+
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls) -> "JobScheduler":
+        """Build the scheduler from service configuration."""
+        return cls(
+            max_concurrent=config.jobs_max_concurrent,
+            max_entries=config.jobs_max_entries,
+            ttl_seconds=config.jobs_ttl_seconds,
+            callback_timeout_seconds=config.jobs_callback_timeout_seconds,
+            callback_retries=config.jobs_callback_retries
+        )
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def submit(
+        self,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        callback_url: Optional[str] = None
+    ) -> Job:
+        """
+        Queue an analysis to run in the background.
+
+        Args:
+            compute: Coroutine factory returning the JSON result
+            callback_url: Optional URL the finished job is POSTed to
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobStoreFullError: If max_entries jobs are queued or running
+        """
+        self._evict()
+        if len(self._jobs) >= self.max_entries:
+            metrics.increment("jobs_rejected")
+            raise JobStoreFullError("Too many jobs in progress. Please retry shortly.")
+
+        job = Job(job_id=uuid.uuid4().hex, callback_url=callback_url)
+        self._jobs[job.job_id] = job
+        metrics.increment("jobs_submitted")
+
+        task = asyncio.create_task(self._run(job, compute))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by id, or None if unknown or expired."""
+        self._evict()
+        return self._jobs.get(job_id)
+
+    async def shutdown(self) -> None:
+        """Cancel queued and running jobs."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, job: Job, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        async with self._semaphore:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await compute()
+                job.status = JOB_SUCCEEDED
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.job_id} failed: {e}")
+                job.status = JOB_FAILED
+                job.error = str(getattr(e, "detail", e))
+                job.error_code = getattr(e, "status_code", 500)
+            job.completed_at = time.time()
+
+        metrics.increment(f"jobs_{job.status}")
+        metrics.set_gauge("jobs_last_duration_ms", (job.completed_at - job.created_at) * 1000)
+        if job.callback_url:
+            await self._deliver(job)
+
+    async def _deliver(self, job: Job) -> None:
+        """POST the finished job to its callback URL, retrying with backoff."""
+        body = job.to_response().model_dump(mode="json")
+        timeout = aiohttp.ClientTimeout(total=self.callback_timeout_seconds)
+        for attempt in range(self.callback_retries):
+            try:
+                # Checked again: the host may resolve differently than at submission
+                await check_url(job.callback_url)
+            except BlockedDestinationError as e:
+                logger.warning(f"Callback for job {job.job_id} not delivered: {e}")
+                break
+            try:
+                async with outbound_session(timeout) as session:
+                    async with session.post(
+                        job.callback_url, json=body, allow_redirects=False
+                    ) as response:
+                        if response.status < 300:
+                            metrics.increment("jobs_callbacks_delivered")
+                            return
+                        logger.warning(
+                            f"Callback for job {job.job_id} returned status {response.status}"
+                        )
+            except Exception as e:
+                logger.warning(f"Callback for job {job.job_id} failed: {e}")
+            if attempt + 1 < self.callback_retries:
+                await asyncio.sleep(2 ** attempt)
+
+        metrics.increment("jobs_callbacks_failed")
+
+    def _evict(self) -> None:
+        """Drop expired finished jobs, then the oldest finished ones beyond max_entries."""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished:
+            if now - job.completed_at > self.ttl_seconds:
+                del self._jobs[job.job_id]
+        for job in finished:
+            if len(self._jobs) < self.max_entries:
+                break
+            self._jobs.pop(job.job_id, None)
@@ -1,15 +1,24 @@
+import asyncio
 import time
 import aiohttp
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Optional, Union
 from PIL import Image
+from libs.common.cache import create_cache_backend
+from libs.common.coalesce import SingleFlight
+from libs.common.deadline import DeadlineExceededError, check_deadline, deadline_headers
+from libs.common.http import control_plane_url
+from libs.common.metrics import metrics
+from libs.common.serialization import load_model
+from libs.common.transport import TransportError, create_transport
 from libs.common.utils import generate_request_id, image_to_base64
-from libs.common.schemas import AggregatedImageFeatures, AnalyzeImageResponse
-from services.main_orchestrator.app.models.schemas import (
-    ImageProcessRequest,
-    ImageProcessResponse,
-    LLMGenerateRequest,
-    LLMGenerateResponse,
+from libs.common.schemas import (
+    FACE_DETECTIONS_HEADER,
+    AggregatedImageFeatures,
+    AnalyzeImageResponse,
 )
+from services.main_orchestrator.app.services.feature_cache import PerceptualFeatureCache
+from services.main_orchestrator.app.services.preprocessing import PreparedImage, preprocess_pool
+from services.main_orchestrator.app.models.schemas import LLMGenerateResponse
 from services.main_orchestrator.app.config import config
 
 
@@ -19,35 +28,114 @@ class OrchestratorService:
     def __init__(self) -> None:
         self.image_processing_url = config.image_processing_orchestrator_url
         self.llm_url = config.llm_inferencer_url
+        # Probed at the LLM inferencer's control port, which answers while it is busy
+        self.llm_health_url = config.llm_inferencer_health_url or control_plane_url(
+            self.llm_url, config.llm_inferencer_control_port
+        )
         self.timeout = aiohttp.ClientTimeout(total=config.request_timeout)
+        self.transport = create_transport(
+            config.deployment_mode,
+            self.timeout,
+            prefer_msgpack=config.internal_msgpack,
+            user_agent=f"judgy-buddy/main-orchestrator/{config.service_version}"
+        )
+        self.inflight: SingleFlight[AnalyzeImageResponse] = SingleFlight()
+        self.feature_cache: Optional[PerceptualFeatureCache] = None
+        if config.phash_cache_enabled:
+            shared = None
+            if config.shared_cache_url:
+                shared = create_cache_backend(
+                    config.shared_cache_url, default_ttl=config.phash_cache_ttl_seconds
+                )
+            self.feature_cache = PerceptualFeatureCache(
+                max_entries=config.phash_cache_max_entries,
+                max_distance=config.phash_cache_max_distance,
+                ttl_seconds=config.phash_cache_ttl_seconds,
+                shared=shared,
+                lock_ttl_seconds=config.shared_cache_lock_ttl_seconds
+            )
     
     async def process_image(
         self, 
-        image: Image.Image, 
-        roast_level: str = "medium"
+        image: Union[Image.Image, PreparedImage], 
+        roast_level: str = "medium",
+        image_hash: Optional[int] = None,
+        content_hash: Optional[str] = None,
+        face_detections: bool = True
     ) -> AnalyzeImageResponse:
         """
         Process an image through the entire pipeline.
         
+        Concurrent calls with the same content hash and roast level share a single
+        pipeline run; each caller still gets its own request ID.
+        
         Args:
-            image: PIL Image object
+            image: Prepared upload, or a PIL Image object to be JPEG-encoded
             roast_level: Roast intensity level (mild/medium/savage)
+            image_hash: Perceptual hash of the image, used for near-duplicate caching
+            content_hash: Hash of the uploaded bytes, used to coalesce identical requests
+            face_detections: Whether per-face boxes and landmarks are needed in the result
         
         Returns:
             AnalyzeImageResponse with roast and features
         """
+        if isinstance(image, Image.Image):
+            image = PreparedImage(image=image)
+        
+        if content_hash is None:
+            return await self._run_pipeline(image, roast_level, image_hash, face_detections)
+        
+        key = f"{content_hash}:{roast_level}:{'full' if face_detections else 'lite'}"
+        joined = self.inflight.in_flight(key)
+        result = await self.inflight.do(
+            key, lambda: self._run_pipeline(image, roast_level, image_hash, face_detections)
+        )
+        
+        if joined:
+            metrics.increment("inflight_coalesced_requests")
+            return result.model_copy(update={"request_id": generate_request_id()})
+        return result
+    
+    async def _run_pipeline(
+        self,
+        image: PreparedImage,
+        roast_level: str,
+        image_hash: Optional[int] = None,
+        face_detections: bool = True
+    ) -> AnalyzeImageResponse:
+        """Run image processing and roast generation for one image."""
         start_time = time.time()
         request_id = generate_request_id()
         
-        # Convert image to base64
-        image_base64 = image_to_base64(image)
+        # Step 1: Send to Image Processing Orchestrator (unless a cached result exists)
+        cached = None
+        if self.feature_cache is not None and image_hash is not None:
+            features, cached = await self.feature_cache.get_or_compute(
+                image_hash,
+                lambda: self._encode_and_process(image, request_id, face_detections),
+                face_detections=face_detections
+            )
+        else:
+            features = await self._encode_and_process(image, request_id, face_detections)
         
-        # Step 1: Send to Image Processing Orchestrator
-        features = await self._call_image_processing(image_base64, request_id)
+        if cached is not None and config.phash_cache_reuse_roast:
+            roast_text = await self.feature_cache.get_roast(cached, roast_level)
+            if roast_text is not None:
+                metrics.increment("phash_cache_roast_hits")
+                return AnalyzeImageResponse(
+                    request_id=request_id,
+                    roast=roast_text,
+                    features=features,
+                    total_processing_time_ms=(time.time() - start_time) * 1000,
+                    status="success"
+                )
         
         # Step 2: Send features to LLM for roast generation
         roast_response = await self._call_llm_generator(features, roast_level)
         
+        if cached is not None and config.phash_cache_reuse_roast:
+            await self.feature_cache.save_roast(cached, roast_level, roast_response.roast_text)
+        
         # Calculate total processing time
         total_time_ms = (time.time() - start_time) * 1000
         
@@ -60,83 +148,83 @@ class OrchestratorService:
             status="success"
         )
     
+    async def _encode_and_process(
+        self, image: PreparedImage, request_id: str, face_detections: bool = True
+    ) -> AggregatedImageFeatures:
+        """Encode the image for transport (re-encoding only if needed), then run image processing."""
+        if image.passthrough:
+            metrics.increment("reencodes_avoided")
+            image_base64 = image.to_base64()
+        else:
+            metrics.increment("reencodes_performed")
+            image_base64 = await preprocess_pool.run(image_to_base64, image.image)
+        return await self._call_image_processing(image_base64, request_id, face_detections)
+    
     async def _call_image_processing(
         self, 
         image_base64: str, 
-        request_id: str
+        request_id: str,
+        face_detections: bool = True
     ) -> AggregatedImageFeatures:
         """Call Image Processing Orchestrator service."""
-        url = f"{self.image_processing_url}/api/v1/process"
+        check_deadline("image processing")
+        headers = {"X-Request-ID": request_id, **deadline_headers()}
+        if not face_detections:
+            headers[FACE_DETECTIONS_HEADER] = "omit"
+        elif config.internal_packed_geometry:
+            # Expanded into FaceDetection lists only if the client asks for them
+            headers[FACE_DETECTIONS_HEADER] = "packed"
         
-        request_data = ImageProcessRequest(
-            image_base64=image_base64,
-            request_id=request_id
+        data = await self.transport.post(
+            f"{self.image_processing_url}/api/v1/process",
+            {"image_base64": image_base64, "request_id": request_id},
+            headers
         )
-        
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            async with session.post(
-                url,
-                json=request_data.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "X-Request-ID": request_id,
-                    "User-Agent": f"judgy-buddy/main-orchestrator/{config.service_version}"
-                }
-            ) as response:
-                response.raise_for_status()
-                data = await response.json()
-                
-                # Convert response to AggregatedImageFeatures
-                return AggregatedImageFeatures(**data)
+        # These features go out in the public response: validate them once, here
+        # (the analyzers' own hops skip validation)
+        return AggregatedImageFeatures.model_validate(data)
     
     async def _call_llm_generator(
         self, 
         features: AggregatedImageFeatures, 
         roast_level: str
     ) -> LLMGenerateResponse:
-        """Call LLM Inferencer service."""
-        url = f"{self.llm_url}/api/v1/generate"
-        
-        request_data = LLMGenerateRequest(
-            features=features,
-            roast_level=roast_level
-        )
+        """
+        Call LLM Inferencer service.
         
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            async with session.post(
-                url,
-                json=request_data.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "User-Agent": f"judgy-buddy/main-orchestrator/{config.service_version}"
-                }
-            ) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return LLMGenerateResponse(**data)
-    
-    async def health_check(self) -> dict[str, bool]:
-        """Check health of downstream services."""
-        health_status = {
-            "image_processing_orchestrator": False,
-            "llm_inferencer": False
+        Raises:
+            DeadlineExceededError: If the request deadline passes before or during generation
+        """
+        check_deadline("roast generation")
+        request_data = {
+            # Face geometry is not used for roasting
+            "features": features.model_dump(
+                mode="json",
+                exclude_none=True,
+                exclude={"face_analysis": {"faces", "packed_faces"}}
+            ),
+            "roast_level": roast_level
         }
         
-        # Check Image Processing Orchestrator
-        try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get(f"{self.image_processing_url}/health") as response:
-                    health_status["image_processing_orchestrator"] = response.status == 200
-        except Exception:
-            pass
-        
-        # Check LLM Inferencer
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get(f"{self.llm_url}/health") as response:
-                    health_status["llm_inferencer"] = response.status == 200
-        except Exception:
-            pass
-        
-        return health_status
-
+            data = await self.transport.post(
+                f"{self.llm_url}/api/v1/generate", request_data, deadline_headers()
+            )
+        except TransportError as e:
+            if e.status == 504:
+                raise DeadlineExceededError(str(e))
+            raise
+        return load_model(LLMGenerateResponse, data, config.internal_validation)
+    
+    def health_probes(self) -> Dict[str, Callable[[], Awaitable[bool]]]:
+        """Health probe per downstream service (through the current transport)."""
+        return {
+            "image_processing_orchestrator": lambda: self.transport.healthy(self.image_processing_url),
+            "llm_inferencer": lambda: self.transport.healthy(self.llm_health_url)
+        }
+    
+    async def health_check(self) -> dict[str, bool]:
+        """Check health of downstream services concurrently."""
+        probes = self.health_probes()
+        results = await asyncio.gather(*(probe() for probe in probes.values()))
+        return dict(zip(probes, results, strict=True))
@@ -0,0 +1,138 @@
+import asyncio
+import ipaddress
+import socket
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+import aiohttp
+from aiohttp.abc import AbstractResolver
+from services.main_orchestrator.app.config import config
+
+
+OUTBOUND_SCHEMES = ("http", "https")
+
+
+class BlockedDestinationError(ValueError):
+    """Raised when a client-supplied URL points somewhere the service may not connect to."""
+
+
+def host_allowed(host: str, allowed_hosts: Iterable[str]) -> bool:
+    """
+    Whether host is on the allowlist (an empty allowlist allows every host).
+
+    Entries match the host exactly; entries starting with "." also match subdomains.
+    """
+    allowed = [entry.lower().rstrip(".") for entry in allowed_hosts]
+    if not allowed:
+        return True
+    host = host.lower().rstrip(".")
+    return any(
+        host == entry or (entry.startswith(".") and host.endswith(entry))
+        for entry in allowed
+    )
+
+
+def check_address(address: str) -> None:
+    """
+    Refuse private, loopback, link-local and other non-public addresses.
+
+    Raises:
+        BlockedDestinationError: If the address is not public
+    """
+    if config.outbound_allow_private_networks:
+        return
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    if not ip.is_global or ip.is_multicast:
+        raise BlockedDestinationError("URL points to a private or reserved network address")
+
+
+def check_host(url: str, allowed_hosts: Optional[List[str]] = None) -> str:
+    """
+    Check the parts of a URL that need no DNS lookup: scheme, allowlist and IP literals.
+
+    Args:
+        url: Client-supplied URL
+        allowed_hosts: Host allowlist (default: outbound_allowed_hosts)
+
+    Returns:
+        The URL's host
+
+    Raises:
+        BlockedDestinationError: If the URL may not be fetched
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in OUTBOUND_SCHEMES or not parsed.hostname:
+        raise BlockedDestinationError("URL must be an absolute http or https URL")
+    host = parsed.hostname
+    if allowed_hosts is None:
+        allowed_hosts = config.outbound_allowed_hosts
+    if not host_allowed(host, allowed_hosts):
+        raise BlockedDestinationError(f"Host {host} is not allowed")
+    try:
+        ipaddress.ip_address(host.split("%", 1)[0])
+    except ValueError:
+        return host
+    check_address(host)
+    return host
+
+
+async def check_url(url: str, allowed_hosts: Optional[List[str]] = None) -> str:
+    """
+    Check a URL and every address its host resolves to.
+
+    Args:
+        url: Client-supplied URL
+        allowed_hosts: Host allowlist (default: outbound_allowed_hosts)
+
+    Returns:
+        The URL
+
+    Raises:
+        BlockedDestinationError: If the URL may not be fetched
+    """
+    host = check_host(url, allowed_hosts)
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            host, None, type=socket.SOCK_STREAM
+        )
+    except OSError:
+        raise BlockedDestinationError(f"Host {host} could not be resolved")
+    for *_, sockaddr in addresses:
+        check_address(sockaddr[0])
+    return url
+
+
+class PublicResolver(AbstractResolver):
+    """
+    aiohttp resolver that refuses hosts resolving to non-public addresses.
+
+    Connections go to exactly the addresses checked here, so a host cannot pass
+    check_url and then re-resolve to an internal address (DNS rebinding).
+    """
+
+    def __init__(self) -> None:
+        self._resolver = aiohttp.ThreadedResolver()
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        hosts = await self._resolver.resolve(host, port, family)
+        for entry in hosts:
+            check_address(entry["host"])
+        return hosts
+
+    async def close(self) -> None:
+        await self._resolver.close()
+
+
+def outbound_session(timeout: aiohttp.ClientTimeout) -> aiohttp.ClientSession:
+    """
+    HTTP session for requests to client-supplied URLs.
+
+    Callers must check_url first (IP literal hosts skip the resolver) and pass
+    allow_redirects=False, so a redirect cannot lead to an internal address.
+    """
+    return aiohttp.ClientSession(
+        timeout=timeout, connector=aiohttp.TCPConnector(resolver=PublicResolver())
+    )
@@ -0,0 +1,113 @@
+import base64
+import io
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from PIL import Image
+from libs.common.codec import fit_pil_image
+from libs.common.phash import dhash
+from libs.common.utils import image_to_base64, validate_image_format
+from libs.common.workers import BoundedWorkerPool
+from services.main_orchestrator.app.config import config
+
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# Smallest decode size requested when only the perceptual hash is needed
+PHASH_DRAFT_SIZE = 64
+
+
+class UnsupportedImageError(ValueError):
+    """Raised when an upload is not in a supported image format."""
+
+
+@dataclass
+class PreparedImage:
+    """
+    Upload ready to be sent downstream.
+
+    Holds either the original compressed bytes, when they already satisfy the
+    downstream constraints, or the decoded and normalized image to re-encode.
+    """
+
+    image: Optional[Image.Image] = None
+    original_bytes: Optional[bytes] = None
+
+    @property
+    def passthrough(self) -> bool:
+        """Whether the original bytes are forwarded without re-encoding."""
+        return self.original_bytes is not None
+
+    def to_base64(self) -> str:
+        """Base64 payload for downstream services (re-encodes only if needed)."""
+        if self.original_bytes is not None:
+            return base64.b64encode(self.original_bytes).decode("utf-8")
+        return image_to_base64(self.image)
+
+
+def can_pass_through(image: Image.Image, size_bytes: int) -> bool:
+    """
+    Whether an opened (not yet decoded) upload can be forwarded as-is.
+
+    Downstream services expect an RGB JPEG within the configured maximum size whose
+    pixels are already upright, so only those uploads skip the decode/re-encode.
+    """
+    if image.format != "JPEG" or image.mode != "RGB":
+        return False
+    width, height = image.size
+    if width > config.downstream_max_width or height > config.downstream_max_height:
+        return False
+    if size_bytes > config.passthrough_max_bytes:
+        return False
+    return image.getexif().get(EXIF_ORIENTATION_TAG, 1) == 1
+
+
+def prepare_upload(image_bytes: bytes, compute_hash: bool) -> Tuple[PreparedImage, Optional[int]]:
+    """
+    Validate, normalize and hash an uploaded image.
+
+    CPU-bound; runs inside the preprocessing pool rather than on the event loop.
+
+    Args:
+        image_bytes: Raw uploaded file
+        compute_hash: Whether to compute the perceptual hash
+
+    Returns:
+        Tuple of the prepared image and its perceptual hash
+
+    Raises:
+        UnsupportedImageError: If the format is not JPEG, PNG or WEBP
+    """
+    # Open image with PIL (reads the header only)
+    pil_image = Image.open(io.BytesIO(image_bytes))
+
+    # Validate format
+    if not validate_image_format(pil_image):
+        raise UnsupportedImageError(
+            f"Unsupported image format: {pil_image.format}. Supported: JPEG, PNG, WEBP"
+        )
+
+    if can_pass_through(pil_image, len(image_bytes)):
+        image_hash = None
+        if compute_hash:
+            # The hash only needs a thumbnail; let libjpeg decode at reduced scale
+            pil_image.draft("RGB", (PHASH_DRAFT_SIZE, PHASH_DRAFT_SIZE))
+            image_hash = dhash(pil_image)
+        return PreparedImage(original_bytes=image_bytes), image_hash
+
+    # Convert to RGB and downscale if too large (JPEGs decode at reduced DCT scale)
+    pil_image = fit_pil_image(
+        pil_image, config.downstream_max_width, config.downstream_max_height
+    )
+
+    # Perceptual hash for near-duplicate lookups
+    image_hash = dhash(pil_image) if compute_hash else None
+    return PreparedImage(image=pil_image), image_hash
+
+
+preprocess_pool = BoundedWorkerPool(
+    name="preprocess",
+    max_workers=config.preprocess_workers or os.cpu_count() or 1,
+    max_queue=config.preprocess_max_queue,
+    use_processes=config.preprocess_use_processes
+)
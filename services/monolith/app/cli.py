@@ -0,0 +1,133 @@
+"""
+Offline bulk roasting of a directory of images, with every model loaded in this process.
+
+Run from the project root:
+    python -m services.monolith.app.cli --input ./contest --output results.jsonl
+    python -m services.monolith.app.cli --input ./contest --output results.parquet --format parquet
+
+Interrupted runs resume where they stopped (see --checkpoint). Per-stage throughput
+is logged at the end and written next to the output as <output>.stats.json.
+"""
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Tuple
+from services.main_orchestrator.app.services.preprocessing import PreparedImage, prepare_upload
+from services.monolith.app.config import config
+from services.monolith.app.services.bulk import (
+    STAGE_ANALYSIS,
+    STAGE_GENERATION,
+    Checkpoint,
+    ResultWriter,
+    StageStats,
+    TimedTransport,
+    find_images,
+    read_and_hash,
+    run_bulk,
+)
+
+
+logger = logging.getLogger(__name__)
+
+ROAST_LEVELS = ["mild", "medium", "savage"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, required=True, help="Directory of images (searched recursively)")
+    parser.add_argument("--output", type=Path, required=True, help="Results file")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--checkpoint", type=Path, default=None,
+                        help="Completed inputs (default: <output>.checkpoint)")
+    parser.add_argument("--roast-level", choices=ROAST_LEVELS, default="medium")
+    parser.add_argument("--concurrency", type=int, default=4, help="Images in the pipeline at once")
+    parser.add_argument("--decode-workers", type=int, default=4, help="Decoder threads")
+    parser.add_argument("--prefetch", type=int, default=16, help="Decoded images held ahead of the pipeline")
+    parser.add_argument("--skip-face-geometry", action="store_true",
+                        help="Leave per-face boxes and landmarks out of the results")
+    return parser.parse_args()
+
+
+def decode(path: Path) -> Tuple[PreparedImage, Any, str]:
+    """Read, validate and downscale one image (runs in the decoder pool)."""
+    data, content_hash = read_and_hash(path)
+    prepared, image_hash = prepare_upload(data, True)
+    return prepared, image_hash, content_hash
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # Imported here: loading the monolith imports every service and its models
+    from services.main_orchestrator.app.api import routes as main_routes
+    from services.main_orchestrator.app.config import config as main_config
+    from services.monolith.app import main as monolith
+
+    paths = find_images(args.input)
+    logger.info(f"Found {len(paths)} images under {args.input}")
+
+    stats = StageStats()
+    writer = ResultWriter(args.output, args.format)
+    checkpoint = Checkpoint(args.checkpoint or args.output.with_suffix(args.output.suffix + ".checkpoint"))
+
+    async with monolith.lifespan(monolith.app):
+        orchestrator = main_routes.orchestrator
+        orchestrator.transport = TimedTransport(
+            orchestrator.transport,
+            {
+                main_config.image_processing_orchestrator_url: STAGE_ANALYSIS,
+                main_config.llm_inferencer_url: STAGE_GENERATION,
+            },
+            stats
+        )
+
+        async def process(decoded: Tuple[PreparedImage, Any, str]) -> Dict[str, Any]:
+            prepared, image_hash, content_hash = decoded
+            result = await orchestrator.process_image(
+                prepared,
+                args.roast_level,
+                image_hash=image_hash,
+                content_hash=content_hash,
+                face_detections=not args.skip_face_geometry
+            )
+            return result.model_dump(mode="json", exclude_none=True)
+
+        try:
+            processed = await run_bulk(
+                paths,
+                args.input,
+                decode,
+                process,
+                writer,
+                checkpoint,
+                stats,
+                decode_workers=args.decode_workers,
+                prefetch_depth=args.prefetch,
+                concurrency=args.concurrency
+            )
+        finally:
+            writer.close()
+
+    summary = {"processed": processed, **stats.summary()}
+    args.output.with_suffix(args.output.suffix + ".stats.json").write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=getattr(logging, config.log_level),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    args = parse_args()
+    summary = asyncio.run(run(args))
+
+    print(f"\nProcessed {summary['processed']} images in {summary['elapsed_s']:.1f}s")
+    for stage, stage_stats in summary["stages"].items():
+        print(
+            f"{stage:<12} {stage_stats['count']:>7} items  {stage_stats['errors']:>5} errors  "
+            f"mean {stage_stats['mean_ms']:>9.1f} ms  {stage_stats['per_second']:>8.2f} /s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from libs.common.config import MonolithConfig
+
+
+config = MonolithConfig()
@@ -0,0 +1,107 @@
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from libs.common.body_limit import BodySizeLimitMiddleware
+from libs.common.deadline import DeadlineMiddleware
+from libs.common.transport import in_process_transport
+from services.face_analysis.app import main as face_main
+from services.image_processing_orchestrator.app import main as ipo_main
+from services.llm_inferencer.app import main as llm_main
+from services.main_orchestrator.app import main as main_orchestrator_main
+from services.monolith.app.config import config
+from services.monolith.app.services.wiring import wire_services
+from services.vlm_scene_analysis.app import main as vlm_main
+
+
+logging.basicConfig(
+    level=getattr(logging, config.log_level),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Services in start-up order; the orchestrators come last and shut down first
+SERVICES = {
+    "face-analysis": face_main,
+    "vlm-scene-analysis": vlm_main,
+    "llm-inferencer": llm_main,
+    "image-processing": ipo_main,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run every service's own start-up and shutdown in one process."""
+    logger.info(f"Starting {config.service_name} v{config.service_version} (in-process pipeline)")
+
+    # One process, one /health: the analyzers' control-plane listeners stay off
+    for module in [face_main, vlm_main, llm_main]:
+        module.config.control_port = 0
+
+    async with AsyncExitStack() as stack:
+        for module in [*SERVICES.values(), main_orchestrator_main]:
+            await stack.enter_async_context(module.lifespan(module.app))
+
+        wire_services(in_process_transport)
+
+        yield
+
+        logger.info(f"Shutting down {config.service_name}")
+    in_process_transport.clear()
+
+
+app = FastAPI(
+    title="Judgy Buddy",
+    description="Whole roast pipeline in one process, without HTTP hops between services",
+    version=config.service_version,
+    lifespan=lifespan
+)
+
+# Cancels requests whose client disconnects (or whose X-Request-Deadline passes);
+# pipeline runs get their deadline when admitted
+app.add_middleware(DeadlineMiddleware)
+
+# Same upload limits as the main orchestrator, checked before FastAPI spools the body
+app.add_middleware(BodySizeLimitMiddleware, limits=main_orchestrator_main.UPLOAD_LIMITS)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=config.cors_origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Public API of the main orchestrator; the internal services stay reachable
+# under /internal/<service> for debugging
+app.include_router(main_orchestrator_main.router)
+for name, module in SERVICES.items():
+    app.include_router(module.router, prefix=f"{config.internal_routes_prefix}/{name}")
+
+
+@app.exception_handler(Exception)
+async def global_exception_handler(request, exc):
+    """Global exception handler."""
+    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    return JSONResponse(
+        status_code=500,
+        content={
+            "detail": "Internal server error",
+            "status": "error",
+            "error_code": "INTERNAL_ERROR"
+        }
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(
+        "services.monolith.app.main:app",
+        host=config.host,
+        port=config.port,
+        uds=config.uds,
+        reload=config.reload,
+        log_level=config.log_level.lower()
+    )
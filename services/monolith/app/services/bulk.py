@@ -0,0 +1,343 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from libs.common.transport import Transport
+
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet output is optional
+    pyarrow = None
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# Stage names in the statistics
+STAGE_DECODE = "decode"
+STAGE_ANALYSIS = "analysis"
+STAGE_GENERATION = "generation"
+STAGE_PIPELINE = "pipeline"
+
+
+def find_images(root: Path) -> List[Path]:
+    """Image files under root, recursively, in a stable order."""
+    return sorted(
+        path for path in root.rglob("*")
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+class Checkpoint:
+    """
+    Append-only list of inputs that are done, so an interrupted run can resume.
+
+    Each key is flushed to disk as soon as its result has been written. Only
+    successful inputs are recorded; failed ones are retried by the next run.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self) -> Set[str]:
+        """Keys completed by previous runs."""
+        if not self.path.exists():
+            return set()
+        with open(self.path, encoding="utf-8") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def mark(self, key: str) -> None:
+        """Record a key as done."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(key + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class StageStats:
+    """Per-stage item counts and busy time, for throughput reporting."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._busy: Dict[str, float] = {}
+        self._errors: Dict[str, int] = {}
+        self._started = time.perf_counter()
+
+    def record(self, stage: str, seconds: float, ok: bool = True) -> None:
+        """Record one item passing through a stage."""
+        with self._lock:
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            self._busy[stage] = self._busy.get(stage, 0.0) + seconds
+            if not ok:
+                self._errors[stage] = self._errors.get(stage, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Statistics per stage.
+
+        Returns:
+            {"elapsed_s": wall time, "stages": {stage: {"count", "errors", "mean_ms",
+            "per_second"}}} where per_second is items per wall-clock second
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "stages": {
+                    stage: {
+                        "count": count,
+                        "errors": self._errors.get(stage, 0),
+                        "mean_ms": round(self._busy[stage] / count * 1000, 2),
+                        "per_second": round(count / elapsed, 3) if elapsed > 0 else 0.0,
+                    }
+                    for stage, count in self._counts.items()
+                },
+            }
+
+
+class TimedTransport(Transport):
+    """Wraps a transport and records how long calls to each service take as a stage."""
+
+    def __init__(self, inner: Transport, stages: Dict[str, str], stats: StageStats):
+        """
+        Args:
+            inner: Transport doing the calls
+            stages: Stage name keyed by configured service URL
+            stats: Statistics to record into
+        """
+        self.inner = inner
+        self.stages = {url.rstrip("/"): stage for url, stage in stages.items()}
+        self.stats = stats
+
+    async def post(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        stage = next(
+            (name for service_url, name in self.stages.items() if url.startswith(service_url)),
+            None
+        )
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await self.inner.post(url, payload, headers)
+            ok = True
+            return result
+        finally:
+            if stage is not None:
+                self.stats.record(stage, time.perf_counter() - start, ok)
+
+    async def healthy(self, service_url: str) -> bool:
+        return await self.inner.healthy(service_url)
+
+
+async def prefetch(
+    paths: Iterable[Path],
+    decode: Callable[[Path], Any],
+    workers: int,
+    depth: int,
+    stats: Optional[StageStats] = None
+) -> AsyncIterator[Tuple[Path, Any, Optional[Exception]]]:
+    """
+    Decode files in a thread pool, keeping up to depth of them ready ahead of the consumer.
+
+    Args:
+        paths: Files in the order to yield them
+        decode: CPU-bound function turning a path into a pipeline input
+        workers: Decoder threads
+        depth: Decoded (or in-progress) files held at once
+        stats: Optional statistics to record the decode stage into
+
+    Yields:
+        (path, decoded value, None) or (path, None, exception) in input order
+    """
+    def timed(path: Path) -> Any:
+        start = time.perf_counter()
+        ok = False
+        try:
+            value = decode(path)
+            ok = True
+            return value
+        finally:
+            if stats is not None:
+                stats.record(STAGE_DECODE, time.perf_counter() - start, ok)
+
+    loop = asyncio.get_running_loop()
+    pending: List[Tuple[Path, "asyncio.Future[Any]"]] = []
+    path_iter = iter(paths)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-decode")
+    try:
+        while True:
+            while len(pending) < depth:
+                path = next(path_iter, None)
+                if path is None:
+                    break
+                pending.append((path, loop.run_in_executor(executor, timed, path)))
+            if not pending:
+                return
+
+            path, future = pending.pop(0)
+            try:
+                yield path, await future, None
+            except Exception as e:
+                yield path, None, e
+    finally:
+        for _, future in pending:
+            future.cancel()
+        # Waiting for decodes in progress would block the event loop
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ResultWriter:
+    """
+    Appends result rows to a JSONL file; optionally converts it to Parquet at the end.
+
+    Rows are appended as they complete, so the JSONL file and the checkpoint stay
+    consistent across interruptions. Parquet needs pyarrow.
+    """
+
+    def __init__(self, path: Path, output_format: str = "jsonl"):
+        if output_format not in ("jsonl", "parquet"):
+            raise ValueError(f"Unknown output format: {output_format}")
+        if output_format == "parquet" and pyarrow is None:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+
+        self.path = path
+        self.output_format = output_format
+        self.rows_path = path if output_format == "jsonl" else path.with_suffix(path.suffix + ".jsonl")
+        self._file = open(self.rows_path, "a", encoding="utf-8")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        """Append one row and flush it."""
+        self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the rows file and, for Parquet output, write the Parquet file."""
+        self._file.close()
+        if self.output_format != "parquet":
+            return
+
+        with open(self.rows_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            # Nested features vary per image; keep them as a JSON string column
+            row["features"] = json.dumps(row["features"]) if row.get("features") is not None else None
+        pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), self.path)
+
+
+def result_row(key: str, result: Optional[Dict[str, Any]], error: Optional[Exception]) -> Dict[str, Any]:
+    """Output row for one input."""
+    if error is not None:
+        return {
+            "path": key,
+            "status": "error",
+            "error": str(getattr(error, "detail", error)),
+        }
+    return {
+        "path": key,
+        "status": result.get("status", "success"),
+        "request_id": result.get("request_id"),
+        "roast": result.get("roast"),
+        "total_processing_time_ms": result.get("total_processing_time_ms"),
+        "features": result.get("features"),
+    }
+
+
+async def run_bulk(
+    paths: List[Path],
+    root: Path,
+    decode: Callable[[Path], Any],
+    process: Callable[[Any], Awaitable[Dict[str, Any]]],
+    writer: ResultWriter,
+    checkpoint: Checkpoint,
+    stats: StageStats,
+    decode_workers: int = 4,
+    prefetch_depth: int = 16,
+    concurrency: int = 4
+) -> int:
+    """
+    Run every input not yet in the checkpoint through the pipeline.
+
+    Decoding runs ahead in a thread pool while up to `concurrency` images are in
+    the pipeline, so the decoder, analyzers and LLM work on different images at
+    once. Results are written in completion order. Successful inputs are
+    checkpointed; failed ones get an error row and are retried by the next run,
+    whose row for them supersedes the earlier one.
+
+    Args:
+        paths: Input files
+        root: Directory the checkpoint keys and output paths are relative to
+        decode: Turns a file into a pipeline input (runs in the decoder pool)
+        process: Runs one decoded input through the pipeline, returning the response dict
+        writer: Output rows
+        checkpoint: Completed inputs
+        stats: Per-stage statistics
+        decode_workers: Decoder threads
+        prefetch_depth: Decoded inputs held ahead of the pipeline
+        concurrency: Images in the pipeline at once
+
+    Returns:
+        Number of inputs processed in this run
+    """
+    done = checkpoint.load()
+    todo = [path for path in paths if str(path.relative_to(root)) not in done]
+    if len(todo) < len(paths):
+        logger.info(f"Resuming: {len(paths) - len(todo)} of {len(paths)} inputs already done")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks: Set[asyncio.Task] = set()
+    processed = 0
+
+    async def handle(key: str, decoded: Any, error: Optional[Exception]) -> None:
+        nonlocal processed
+        result = None
+        if error is None:
+            start = time.perf_counter()
+            try:
+                result = await process(decoded)
+            except Exception as e:
+                error = e
+            stats.record(STAGE_PIPELINE, time.perf_counter() - start, error is None)
+        if error is not None:
+            logger.warning(f"{key}: {error}")
+
+        writer.write(result_row(key, result, error))
+        if error is None:
+            checkpoint.mark(key)
+        processed += 1
+        if processed % 100 == 0:
+            logger.info(f"Processed {processed}/{len(todo)}")
+
+    async def bounded(key: str, decoded: Any, error: Optional[Exception]) -> None:
+        try:
+            await handle(key, decoded, error)
+        finally:
+            semaphore.release()
+
+    async for path, decoded, error in prefetch(todo, decode, decode_workers, prefetch_depth, stats):
+        await semaphore.acquire()
+        task = asyncio.create_task(bounded(str(path.relative_to(root)), decoded, error))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks)
+    return processed
+
+
+def read_and_hash(path: Path) -> Tuple[bytes, str]:
+    """File contents and their SHA-256 hex digest."""
+    data = path.read_bytes()
+    return data, hashlib.sha256(data).hexdigest()
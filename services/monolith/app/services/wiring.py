@@ -0,0 +1,91 @@
+from typing import Any, Dict
+from libs.common.schemas import FACE_DETECTIONS_HEADER, AggregatedImageFeatures
+from libs.common.serialization import load_model
+from libs.common.transport import InProcessTransport, TransportError
+from services.face_analysis.app.api import routes as face_routes
+from services.image_processing_orchestrator.app.api import routes as ipo_routes
+from services.image_processing_orchestrator.app.config import config as ipo_config
+from services.llm_inferencer.app.api import routes as llm_routes
+from services.main_orchestrator.app.api import routes as main_routes
+from services.main_orchestrator.app.config import config as main_config
+from services.vlm_scene_analysis.app.api import routes as vlm_routes
+
+
+def _face_ready() -> bool:
+    return bool(face_routes.model_manager and face_routes.model_manager.models_loaded)
+
+
+def _scene_ready() -> bool:
+    return bool(vlm_routes.vlm_manager and vlm_routes.vlm_manager.models_loaded)
+
+
+def _llm_ready() -> bool:
+    return bool(llm_routes.llm_manager and llm_routes.llm_manager.model_loaded)
+
+
+def _require(ready: bool, service_name: str) -> None:
+    if not ready:
+        raise TransportError(f"{service_name} models are not loaded", 503)
+
+
+async def process_image(payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """In-process /api/v1/process of the image processing orchestrator."""
+    try:
+        return await ipo_routes.orchestrator.process_image(
+            image_base64=payload["image_base64"],
+            request_id=payload["request_id"],
+            face_detections=headers.get(FACE_DETECTIONS_HEADER) or "list"
+        )
+    except ValueError as e:
+        # Invalid X-Face-Detections, as the HTTP endpoint's 400
+        raise TransportError(str(e), 400)
+
+
+async def generate_roast(payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """In-process /api/v1/generate of the LLM inferencer."""
+    _require(_llm_ready(), "LLM inferencer")
+    # Built by the main orchestrator in this process, so it is trusted
+    features = load_model(AggregatedImageFeatures, payload["features"])
+    return await llm_routes.roast_generator.generate_roast(
+        features=features,
+        roast_level=payload["roast_level"]
+    )
+
+
+def wire_services(transport: InProcessTransport) -> None:
+    """
+    Register every service on the in-process transport and point the orchestrators at it.
+
+    Handlers are registered under the URLs the orchestrators are configured with,
+    so the orchestrators run unchanged; only their transport differs.
+
+    Args:
+        transport: Transport shared by the orchestrators in this process
+    """
+    transport.register(
+        main_config.image_processing_orchestrator_url,
+        {"/api/v1/process": process_image},
+        health=lambda: _face_ready() and _scene_ready()
+    )
+    transport.register(
+        main_config.llm_inferencer_url,
+        {"/api/v1/generate": generate_roast},
+        health=_llm_ready
+    )
+    transport.register(
+        ipo_config.face_analysis_url,
+        {"/api/v1/analyze": face_routes.analyze_job},
+        health=_face_ready
+    )
+    transport.register(
+        ipo_config.vlm_scene_analysis_url,
+        {"/api/v1/analyze": vlm_routes.analyze_job},
+        health=_scene_ready
+    )
+
+    main_routes.orchestrator.transport = transport
+    ipo_routes.orchestrator.transport = transport
+    # No control planes in one process: health is answered by the handlers above
+    main_routes.orchestrator.llm_health_url = main_config.llm_inferencer_url
+    ipo_routes.orchestrator.face_analysis_health_url = ipo_config.face_analysis_url
+    ipo_routes.orchestrator.vlm_scene_analysis_health_url = ipo_config.vlm_scene_analysis_url
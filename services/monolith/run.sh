@@ -0,0 +1,16 @@
+#!/bin/bash
+
+# Run every service in one process (single-box deployment)
+cd "$(dirname "$0")"
+
+# Activate virtual environment if it exists
+if [ -d "../../.venv" ]; then
+    source ../../.venv/bin/activate
+fi
+
+# Set PYTHONPATH to include project root
+export PYTHONPATH="${PYTHONPATH}:$(cd ../.. && pwd)"
+export DEPLOYMENT_MODE=monolith
+
+# Run the service (set UDS to bind a Unix domain socket instead of the TCP port)
+python -m uvicorn app.main:app --host 0.0.0.0 --port 8000 ${UDS:+--uds "$UDS"}
@@ -1,5 +1,9 @@
 import logging
+from typing import Any, Dict
 from fastapi import APIRouter, HTTPException, status
+from libs.common.control_plane import LoadTracker
+from libs.common.deadline import DeadlineExceededError, check_deadline
+from libs.common.transport import TransportError
 from services.vlm_scene_analysis.app.models.schemas import (
     HealthResponse,
     ErrorResponse,
@@ -15,6 +19,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Requests in inference (running or waiting); readiness fails at capacity
+inference_load = LoadTracker(config.readiness_max_in_flight)
+
 # Global instances (will be initialized in lifespan)
 vlm_manager: VLMManager = None
 scene_analyzer: SceneAnalyzer = None
@@ -67,12 +74,21 @@ async def analyze_scene(request: VLMSceneAnalysisRequest) -> VLMSceneAnalysisRes
         )
 
     try:
-        # Analyze scene
-        results = await scene_analyzer.analyze(
-            image_base64=request.image_base64,
-            request_id=request.request_id
+        check_deadline("scene analysis")
+    except DeadlineExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
         )
 
+    try:
+        # Analyze scene
+        with inference_load.track():
+            results = await scene_analyzer.analyze(
+                image_base64=request.image_base64,
+                request_id=request.request_id
+            )
+
         return VLMSceneAnalysisResponse(**results)
 
     except Exception as e:
@@ -81,3 +97,31 @@ async def analyze_scene(request: VLMSceneAnalysisRequest) -> VLMSceneAnalysisRes
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Scene analysis failed: {str(e)}"
         )
+
+
+async def analyze_job(payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    /api/v1/analyze for callers that skip HTTP (queue workers, monolith).
+
+    Args:
+        payload: Request data as sent to the HTTP endpoint
+        headers: Request headers (unused)
+
+    Returns:
+        Scene analysis results
+
+    Raises:
+        TransportError: If the VLM is not loaded yet or the request deadline has passed
+    """
+    if not vlm_manager or not vlm_manager.models_loaded:
+        raise TransportError("VLM scene analysis models are not loaded", 503)
+    try:
+        check_deadline("scene analysis")
+    except DeadlineExceededError as e:
+        raise TransportError(str(e), 504)
+
+    with inference_load.track():
+        return await scene_analyzer.analyze(
+            image_base64=payload["image_base64"],
+            request_id=payload["request_id"]
+        )
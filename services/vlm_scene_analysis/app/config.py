@@ -1,5 +1,5 @@
-import os
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -13,9 +13,20 @@ class Config(BaseSettings):
     # Server config
     host: str = "0.0.0.0"
     port: int = 8008
+    uds: Optional[str] = None  # Unix domain socket to bind instead of host:port
     reload: bool = True
     log_level: str = "INFO"
 
+    # Pull jobs from a work queue instead of serving only HTTP requests
+    dispatch_mode: str = "push"
+    work_queue_url: str = "memory://"
+    work_queue_concurrency: int = 1
+
+    # Health, readiness and metrics served from a separate thread (0 = off);
+    # readiness fails once this many requests are in inference
+    control_port: int = 9008
+    readiness_max_in_flight: int = 2
+
     # CORS
     cors_origins: list[str] = ["*"]
 
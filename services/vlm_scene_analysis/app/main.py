@@ -3,7 +3,10 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from services.vlm_scene_analysis.app.api.routes import router, set_vlm_manager
+from libs.common.control_plane import ControlPlaneServer
+from libs.common.deadline import DeadlineMiddleware
+from libs.common.work_queue import DISPATCH_QUEUE, VLM_SCENE_ANALYSIS_QUEUE, QueueWorker, create_queue_backend
+from services.vlm_scene_analysis.app.api.routes import analyze_job, inference_load, router, set_vlm_manager
 from services.vlm_scene_analysis.app.services.vlm_manager import VLMManager
 from services.vlm_scene_analysis.app.config import config
 
@@ -28,6 +31,20 @@ async def lifespan(app: FastAPI):
     vlm_manager = VLMManager()
     set_vlm_manager(vlm_manager)
 
+    # Health, readiness and metrics on their own thread, answered even while
+    # inference (or model loading) keeps the event loop busy
+    control_plane = None
+    if config.control_port:
+        control_plane = ControlPlaneServer(
+            config.host,
+            config.control_port,
+            config.service_name,
+            config.service_version,
+            models_loaded=lambda: vlm_manager.models_loaded,
+            load=inference_load
+        )
+        control_plane.start()
+
     try:
         await vlm_manager.load_models()
         logger.info("VLM model loaded successfully")
@@ -35,11 +52,26 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error loading VLM model: {e}")
         logger.warning("Service starting with degraded status")
 
+    # Pull jobs from the work queue alongside serving HTTP
+    worker = None
+    if config.dispatch_mode == DISPATCH_QUEUE:
+        worker = QueueWorker(
+            create_queue_backend(config.work_queue_url),
+            VLM_SCENE_ANALYSIS_QUEUE,
+            {"/api/v1/analyze": analyze_job},
+            concurrency=config.work_queue_concurrency
+        )
+        worker.start()
+
     yield
 
     # Shutdown
     logger.info(f"Shutting down {config.service_name}")
+    if worker:
+        await worker.stop()
     await vlm_manager.unload_models()
+    if control_plane:
+        control_plane.stop()
 
 
 app = FastAPI(
@@ -49,6 +81,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rejects or cancels requests past the caller's X-Request-Deadline, and
+# requests whose caller disconnects
+app.add_middleware(DeadlineMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -82,6 +118,7 @@ if __name__ == "__main__":
         "services.vlm_scene_analysis.app.main:app",
         host=config.host,
         port=config.port,
+        uds=config.uds,
         reload=config.reload,
         log_level=config.log_level.lower()
     )
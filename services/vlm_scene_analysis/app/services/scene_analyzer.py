@@ -3,7 +3,7 @@ import time
 import tempfile
 from pathlib import Path
 from typing import Dict, Any
-from libs.common.utils import base64_to_numpy
+from libs.common.codec import decode_base64_bgr
 import cv2
 from services.vlm_scene_analysis.app.services.vlm_manager import VLMManager
 
@@ -31,8 +31,8 @@ class SceneAnalyzer:
         start_time = time.time()
 
         try:
-            # Convert base64 to numpy array
-            image = base64_to_numpy(image_base64)
+            # Decode base64 straight to a contiguous BGR array
+            image = decode_base64_bgr(image_base64)
 
             # Save image to temporary file for VLM processing
             with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
@@ -11,5 +11,5 @@ fi
 # Set PYTHONPATH to include project root
 export PYTHONPATH="${PYTHONPATH}:$(cd ../.. && pwd)"
 
-# Run the service
-python -m uvicorn app.main:app --host 0.0.0.0 --port 8008 --reload
+# Run the service (set UDS to bind a Unix domain socket instead of the TCP port)
+python -m uvicorn app.main:app --host 0.0.0.0 --port 8008 ${UDS:+--uds "$UDS"} --reload
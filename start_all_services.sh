@@ -8,6 +8,12 @@ echo "================================"
 # Activate virtual environment
 source .venv/bin/activate
 
+# Single-process deployment: the whole pipeline on port 8000 without HTTP hops
+if [ "${DEPLOYMENT_MODE}" = "monolith" ]; then
+    echo "Starting monolith (port 8000)..."
+    exec python -m uvicorn services.monolith.app.main:app --host 0.0.0.0 --port 8000
+fi
+
 # Start services in background
 echo "Starting Main Orchestrator (port 8000)..."
 python -m uvicorn services.main_orchestrator.app.main:app --host 0.0.0.0 --port 8000 &
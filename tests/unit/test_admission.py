@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+from services.main_orchestrator.app.services import admission
+from services.main_orchestrator.app.services.admission import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    AdmissionController,
+    AdmissionRejectedError,
+    TokenBucket,
+)
+
+
+@pytest.mark.unit
+def test_token_bucket_refills_over_time():
+    """Test burst capacity, rejection and the refill-based retry estimate."""
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    start = bucket.updated
+
+    assert bucket.try_acquire(start) == (True, 0.0)
+    assert bucket.try_acquire(start)[0]
+    allowed, retry_after = bucket.try_acquire(start)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+    assert bucket.try_acquire(start + 1.0)[0]
+
+
+@pytest.mark.unit
+def test_rate_limit_is_per_client():
+    """Test 429 with Retry-After once a client exhausts its bucket."""
+    controller = AdmissionController(max_in_flight=1, max_queue=1, rate_per_minute=6, burst=1)
+
+    controller.check_rate("alice")
+    controller.check_rate("bob")
+    with pytest.raises(AdmissionRejectedError) as error:
+        controller.check_rate("alice")
+
+    assert error.value.status_code == 429
+    assert error.value.retry_after_header == "10"
+
+
+@pytest.mark.unit
+def test_tracked_clients_are_capped(monkeypatch):
+    """Test that busy buckets are evicted least recently used first once the cap is hit."""
+    monkeypatch.setattr(admission, "MAX_TRACKED_CLIENTS", 3)
+    controller = AdmissionController(max_in_flight=1, max_queue=1, rate_per_minute=6, burst=2)
+
+    for client_id in ["a", "b", "c"]:
+        controller.check_rate(client_id)
+    controller.check_rate("a")
+    controller.check_rate("d")
+
+    assert list(controller._buckets) == ["c", "a", "d"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_ahead_of_batch():
+    """Test that waiting interactive requests are admitted before earlier batch ones."""
+    controller = AdmissionController(max_in_flight=1, max_queue=10, initial_service_time=0.01)
+    order = []
+    release = asyncio.Event()
+
+    async def run(name, priority):
+        async with controller.admit(priority, deadline_seconds=5):
+            order.append(name)
+            if name == "first":
+                await release.wait()
+
+    first = asyncio.create_task(run("first", PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    waiting = [
+        asyncio.create_task(run("batch", PRIORITY_BATCH)),
+        asyncio.create_task(run("interactive", PRIORITY_INTERACTIVE)),
+    ]
+    await asyncio.sleep(0.01)
+    assert controller.queue_depth == 2
+
+    release.set()
+    await asyncio.gather(first, *waiting)
+
+    assert order == ["first", "interactive", "batch"]
+    assert controller.in_flight == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_requests_that_cannot_meet_their_deadline_are_rejected():
+    """Test immediate 503 when the estimated wait exceeds the deadline."""
+    controller = AdmissionController(max_in_flight=1, max_queue=10, initial_service_time=2.0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit(PRIORITY_INTERACTIVE, deadline_seconds=30):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejectedError) as error:
+        async with controller.admit(PRIORITY_INTERACTIVE, deadline_seconds=3):
+            pass
+
+    assert error.value.status_code == 503
+    assert error.value.retry_after == pytest.approx(2.0)
+
+    release.set()
+    await holder
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_queue_is_bounded_and_service_time_is_learned():
+    """Test the queue limit and the EWMA service time estimate."""
+    controller = AdmissionController(
+        max_in_flight=1, max_queue=1, initial_service_time=0.0, ewma_alpha=0.5
+    )
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit(PRIORITY_INTERACTIVE, deadline_seconds=5):
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()), asyncio.create_task(hold())]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejectedError) as error:
+        async with controller.admit(PRIORITY_BATCH, deadline_seconds=5):
+            pass
+    assert error.value.status_code == 503
+
+    await asyncio.sleep(0.05)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert controller.service_time > 0.01
+    assert controller.in_flight == 0
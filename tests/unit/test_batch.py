@@ -0,0 +1,212 @@
+import asyncio
+import io
+import json
+import aiohttp
+import pytest
+from aiohttp import web
+from PIL import Image
+from fastapi import HTTPException
+from services.main_orchestrator.app.services.batch import (
+    BatchItem,
+    InvalidManifestError,
+    download_image,
+    ndjson_lines,
+    parse_manifest,
+    run_batch,
+)
+from services.main_orchestrator.app.config import config
+from services.main_orchestrator.app.services.ingestion import UploadRejectedError
+from services.main_orchestrator.app.services.outbound import outbound_session
+
+
+def make_jpeg(color=(255, 0, 0)):
+    """Create a small JPEG image."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def item(index, data):
+    """Batch item with already-read bytes."""
+    async def load():
+        return data
+    return BatchItem(index, f"img-{index}", load)
+
+
+async def collect(lines):
+    """Gather an async iterator into a list."""
+    return [line async for line in lines]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_identical_images_are_analyzed_once():
+    """Test deduplication by content hash within a batch."""
+    calls = []
+
+    async def analyze(image_bytes, content_hash):
+        calls.append(content_hash)
+        await asyncio.sleep(0.01)
+        return {"roast": f"roast of {image_bytes.decode()}"}
+
+    lines = await collect(run_batch(
+        [item(0, b"a"), item(1, b"b"), item(2, b"a")], analyze, max_concurrent=2
+    ))
+
+    assert len(calls) == 2
+    by_index = {line["index"]: line for line in lines}
+    assert by_index[2]["duplicate_of"] == 0
+    assert by_index[2]["result"] == by_index[0]["result"] == {"roast": "roast of a"}
+    assert by_index[1]["status"] == "success"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order_with_bounded_parallelism():
+    """Test that fast items are yielded first and parallelism is capped."""
+    running = 0
+    peak = 0
+
+    async def analyze(image_bytes, content_hash):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05 if image_bytes == b"slow" else 0.01)
+        running -= 1
+        return {}
+
+    items = [item(0, b"slow"), *[item(i, str(i).encode()) for i in range(1, 5)]]
+    lines = await collect(run_batch(items, analyze, max_concurrent=2))
+
+    assert peak == 2
+    assert lines[-1]["index"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_images_are_loaded_only_when_a_slot_is_free():
+    """Test that loaded images waiting for analysis never exceed max_concurrent."""
+    held = 0
+    peak = 0
+
+    def lazy(index):
+        async def load():
+            nonlocal held, peak
+            held += 1
+            peak = max(peak, held)
+            return str(index).encode()
+        return BatchItem(index, f"img-{index}", load)
+
+    async def analyze(image_bytes, content_hash):
+        nonlocal held
+        await asyncio.sleep(0.01)
+        held -= 1
+        return {}
+
+    lines = await collect(run_batch([lazy(i) for i in range(8)], analyze, max_concurrent=2))
+
+    assert len(lines) == 8
+    assert peak == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_items_yield_error_lines():
+    """Test that one bad image does not fail the batch."""
+    async def rejected():
+        raise UploadRejectedError("Unsupported image format")
+
+    async def analyze(image_bytes, content_hash):
+        if image_bytes == b"boom":
+            raise HTTPException(status_code=500, detail="Image processing failed")
+        return {"roast": "ok"}
+
+    lines = await collect(run_batch(
+        [BatchItem(0, "bad", rejected), item(1, b"boom"), item(2, b"fine")], analyze, 4
+    ))
+    by_index = {line["index"]: line for line in lines}
+
+    assert (by_index[0]["status"], by_index[0]["error_code"]) == ("error", 400)
+    assert by_index[1]["error"] == "Image processing failed"
+    assert by_index[1]["error_code"] == 500
+    assert by_index[2]["status"] == "success"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_ndjson_lines():
+    """Test one JSON document per line."""
+    async def lines():
+        yield {"index": 0}
+        yield {"index": 1}
+
+    encoded = b"".join(await collect(ndjson_lines(lines())))
+    assert [json.loads(line) for line in encoded.splitlines()] == [{"index": 0}, {"index": 1}]
+
+
+@pytest.mark.unit
+def test_parse_manifest():
+    """Test manifest parsing and validation."""
+    entries = parse_manifest('[{"url": "https://example.com/a.jpg", "id": "a"}, {"url": "http://x/b.png"}]')
+
+    assert entries == [
+        {"url": "https://example.com/a.jpg", "id": "a"},
+        {"url": "http://x/b.png", "id": "http://x/b.png"},
+    ]
+    for manifest in ["{", '{"url": "http://x"}', '[{"url": "file:///etc/passwd"}]', '["http://x"]']:
+        with pytest.raises(InvalidManifestError):
+            parse_manifest(manifest)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_download_image_validates_like_an_upload(monkeypatch):
+    """Test manifest downloads and their rejection paths."""
+    monkeypatch.setattr(config, "outbound_allow_private_networks", True)
+    jpeg = make_jpeg()
+
+    async def image(request):
+        return web.Response(body=jpeg, content_type="image/jpeg")
+
+    async def text(request):
+        return web.Response(text="not an image")
+
+    app = web.Application()
+    app.router.add_get("/image.jpg", image)
+    app.router.add_get("/page.html", text)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            assert await download_image(session, f"{base}/image.jpg") == jpeg
+            with pytest.raises(UploadRejectedError):
+                await download_image(session, f"{base}/page.html")
+            with pytest.raises(UploadRejectedError):
+                await download_image(session, f"{base}/missing.jpg")
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_manifest_urls_must_not_reach_internal_hosts(monkeypatch):
+    """Test that manifests cannot point downloads at internal or unlisted hosts."""
+    for url in ["http://10.0.0.1/a.jpg", "http://169.254.169.254/latest", "http://[::1]/a.jpg"]:
+        with pytest.raises(InvalidManifestError):
+            parse_manifest(json.dumps([{"url": url}]))
+
+    monkeypatch.setattr(config, "outbound_allowed_hosts", ["images.example.com"])
+    assert parse_manifest('[{"url": "https://images.example.com/a.jpg"}]')
+    with pytest.raises(InvalidManifestError):
+        parse_manifest('[{"url": "https://example.org/a.jpg"}]')
+    monkeypatch.setattr(config, "outbound_allowed_hosts", [])
+
+    # Names resolving to internal addresses are refused when downloading
+    async with outbound_session(aiohttp.ClientTimeout(total=2)) as session:
+        with pytest.raises(UploadRejectedError) as error:
+            await download_image(session, "http://localhost:1/a.jpg")
+    assert "private" in str(error.value)
@@ -0,0 +1,66 @@
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from libs.common.body_limit import BodySizeLimitMiddleware
+
+
+@pytest.fixture
+def upload_app():
+    """App with one limited upload route; records the uploads its handler saw."""
+    seen = []
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(image: UploadFile = File(...)):
+        seen.append(len(await image.read()))
+        return {"ok": True}
+
+    @app.post("/open")
+    async def open_upload(image: UploadFile = File(...)):
+        seen.append(len(await image.read()))
+        return {"ok": True}
+
+    app.add_middleware(BodySizeLimitMiddleware, limits={"/upload": 4096})
+    return TestClient(app), seen
+
+
+@pytest.mark.unit
+def test_declared_oversized_body_is_rejected_before_parsing(upload_app):
+    """Test 413 for a Content-Length over the limit without reaching the handler."""
+    client, seen = upload_app
+
+    response = client.post("/upload", files={"image": ("a.jpg", b"x" * 8192, "image/jpeg")})
+    assert response.status_code == 413
+    assert response.json()["error_code"] == "REQUEST_TOO_LARGE"
+
+    assert client.post("/upload", files={"image": ("a.jpg", b"x" * 1024, "image/jpeg")}).json() == {"ok": True}
+    # Other paths are not limited
+    assert client.post("/open", files={"image": ("a.jpg", b"x" * 8192, "image/jpeg")}).status_code == 200
+    assert seen == [1024, 8192]
+
+
+@pytest.mark.unit
+def test_streamed_body_is_cut_off_at_the_limit(upload_app):
+    """Test 413 for a chunked body without Content-Length once it passes the limit."""
+    client, seen = upload_app
+    boundary = "limit"
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="image"; filename="a.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode()
+
+    def body():
+        yield head
+        for _ in range(16):
+            yield b"x" * 1024
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/upload",
+        content=body(),
+        headers={"content-type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
+    assert seen == []
@@ -0,0 +1,149 @@
+import json
+import time
+import pytest
+from libs.common.transport import InProcessTransport
+from services.monolith.app.services.bulk import (
+    STAGE_ANALYSIS,
+    STAGE_DECODE,
+    STAGE_PIPELINE,
+    Checkpoint,
+    ResultWriter,
+    StageStats,
+    TimedTransport,
+    find_images,
+    prefetch,
+    run_bulk,
+)
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    """Directory with a few (fake) image files and one non-image."""
+    root = tmp_path / "images"
+    (root / "nested").mkdir(parents=True)
+    for name in ["a.jpg", "b.PNG", "nested/c.webp"]:
+        (root / name).write_bytes(name.encode())
+    (root / "notes.txt").write_text("skip me")
+    return root
+
+
+def read_rows(path):
+    """Rows of a JSONL file."""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.unit
+def test_find_images(image_dir):
+    """Test recursive discovery of supported image files."""
+    paths = [str(path.relative_to(image_dir)) for path in find_images(image_dir)]
+    assert paths == ["a.jpg", "b.PNG", "nested/c.webp"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_prefetch_yields_in_order_with_errors(image_dir):
+    """Test that decoding runs ahead but results keep input order."""
+    def decode(path):
+        if path.name == "b.PNG":
+            raise ValueError("corrupt")
+        return path.read_bytes()
+
+    stats = StageStats()
+    results = [item async for item in prefetch(find_images(image_dir), decode, 2, 2, stats)]
+
+    assert [path.name for path, _, _ in results] == ["a.jpg", "b.PNG", "c.webp"]
+    assert results[0][1] == b"a.jpg"
+    assert isinstance(results[1][2], ValueError)
+    assert stats.summary()["stages"][STAGE_DECODE]["errors"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_prefetch_does_not_wait_for_decodes_when_abandoned(image_dir):
+    """Test that closing the iterator early does not block on decodes in progress."""
+    def decode(path):
+        if path.name != "a.jpg":
+            time.sleep(0.5)
+        return path.read_bytes()
+
+    items = prefetch(find_images(image_dir), decode, 2, 2)
+    assert (await items.__anext__())[1] == b"a.jpg"
+
+    start = time.monotonic()
+    await items.aclose()
+    assert time.monotonic() - start < 0.2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_bulk_writes_results_and_resumes(image_dir, tmp_path):
+    """Test output rows, error rows, skipping checkpointed inputs and retrying failed ones."""
+    output = tmp_path / "results.jsonl"
+    checkpoint = Checkpoint(tmp_path / "results.checkpoint")
+    processed = []
+
+    async def process(decoded):
+        processed.append(decoded)
+        if decoded == b"b.PNG":
+            raise RuntimeError("LLM unavailable")
+        return {"request_id": "r", "roast": f"roast of {decoded.decode()}", "status": "success"}
+
+    async def run():
+        writer = ResultWriter(output)
+        try:
+            return await run_bulk(
+                find_images(image_dir), image_dir, lambda path: path.read_bytes(),
+                process, writer, checkpoint, StageStats(), concurrency=2
+            )
+        finally:
+            writer.close()
+
+    checkpoint.mark("a.jpg")
+    assert await run() == 2
+
+    rows = {row["path"]: row for row in read_rows(output)}
+    assert set(rows) == {"b.PNG", "nested/c.webp"}
+    assert rows["nested/c.webp"]["roast"] == "roast of nested/c.webp"
+    assert rows["b.PNG"] == {"path": "b.PNG", "status": "error", "error": "LLM unavailable"}
+
+    # Only the failed input is left for a rerun
+    assert checkpoint.load() == {"a.jpg", "nested/c.webp"}
+    assert await run() == 1
+    assert processed[2:] == [b"b.PNG"]
+    assert read_rows(output)[-1]["path"] == "b.PNG"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_timed_transport_records_stage_per_service():
+    """Test per-service stage timing."""
+    inner = InProcessTransport()
+
+    async def process(payload, headers):
+        return {"ok": True}
+
+    inner.register("http://localhost:8001", {"/api/v1/process": process}, lambda: True)
+    stats = StageStats()
+    transport = TimedTransport(inner, {"http://localhost:8001/": STAGE_ANALYSIS}, stats)
+
+    assert await transport.post("http://localhost:8001/api/v1/process", {}) == {"ok": True}
+    assert await transport.healthy("http://localhost:8001")
+
+    stages = stats.summary()["stages"]
+    assert stages[STAGE_ANALYSIS]["count"] == 1
+    assert STAGE_PIPELINE not in stages
+
+
+@pytest.mark.unit
+def test_parquet_output(tmp_path):
+    """Test conversion of the rows to Parquet."""
+    parquet = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "results.parquet"
+
+    writer = ResultWriter(output, "parquet")
+    writer.write({"path": "a.jpg", "status": "success", "roast": "Nice.", "features": {"x": 1}})
+    writer.close()
+
+    table = parquet.read_table(output).to_pylist()
+    assert table[0]["roast"] == "Nice."
+    assert json.loads(table[0]["features"]) == {"x": 1}
@@ -0,0 +1,140 @@
+import io
+import cv2
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+from libs.common.phash import hamming_distance
+from services.main_orchestrator.app.services.burst import (
+    Frame,
+    drop_near_duplicates,
+    make_montage,
+    prepare_burst,
+    sample_video_frames,
+    select_keyframes,
+)
+from services.main_orchestrator.app.services.preprocessing import UnsupportedImageError
+
+
+def scene(seed, size=(160, 120)):
+    """Random blocky RGB image (distinct seeds give distinct perceptual hashes)."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, size=(6, 8, 3), dtype=np.uint8)
+    return Image.fromarray(blocks).resize(size, Image.Resampling.NEAREST)
+
+
+def jpeg(image):
+    """Encode an image as JPEG bytes."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+def test_near_duplicates_collapse_to_sharpest_frame():
+    """Test that consecutive near-identical frames keep only the sharpest."""
+    sharp = scene(1)
+    blurred = sharp.filter(ImageFilter.GaussianBlur(2))
+    frames = [Frame(0, blurred), Frame(1, sharp), Frame(2, scene(2)), Frame(3, scene(1))]
+
+    distinct = drop_near_duplicates(frames, max_distance=6)
+
+    # Only consecutive runs collapse; the repeated scene later on is kept
+    assert [frame.index for frame in distinct] == [1, 2, 3]
+
+
+@pytest.mark.unit
+def test_select_keyframes_spreads_over_the_clip():
+    """Test one keyframe per stretch of the clip, preferring sharp frames."""
+    frames = [Frame(i, scene(i)) for i in range(8)]
+    frames[1].sharpness = 1e9
+
+    keyframes = select_keyframes(frames, 4)
+
+    assert len(keyframes) == 4
+    assert keyframes[0].index == 1
+    assert [frame.index for frame in keyframes] == sorted(frame.index for frame in keyframes)
+    assert select_keyframes(frames[:2], 4) == frames[:2]
+
+
+@pytest.mark.unit
+def test_montage_fits_bounds():
+    """Test montage size for one and several frames."""
+    frames = [Frame(i, scene(i, size=(640, 480))) for i in range(3)]
+
+    assert make_montage(frames[:1], 320, 320).size == (320, 240)
+    assert make_montage(frames, 1920, 1080).size == (1920, 1080)
+
+
+@pytest.mark.unit
+def test_sample_video_frames(tmp_path):
+    """Test even frame sampling from a video file."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 120))
+    if not writer.isOpened():
+        pytest.skip("OpenCV cannot write MJPG video here")
+    for i in range(30):
+        writer.write(cv2.cvtColor(np.asarray(scene(i // 10)), cv2.COLOR_RGB2BGR))
+    writer.release()
+
+    with open(path, "rb") as f:
+        frames = sample_video_frames(f.read(), max_frames=6)
+
+    assert [frame.index for frame in frames] == [0, 6, 12, 17, 23, 29]
+    assert frames[-1].timestamp_ms == pytest.approx(2900)
+    assert len(drop_near_duplicates(frames, 6)) == 3
+
+    with pytest.raises(UnsupportedImageError):
+        sample_video_frames(b"not a video", max_frames=6)
+
+
+@pytest.mark.unit
+def test_sparse_video_samples_seek_past_gaps(tmp_path, monkeypatch):
+    """Test that long gaps between sampled frames are seeked over, not grabbed."""
+    path = str(tmp_path / "long.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 120))
+    if not writer.isOpened():
+        pytest.skip("OpenCV cannot write MJPG video here")
+    for i in range(300):
+        writer.write(cv2.cvtColor(np.asarray(scene(i // 100)), cv2.COLOR_RGB2BGR))
+    writer.release()
+
+    grabs = 0
+    real_capture = cv2.VideoCapture
+
+    class CountingCapture:
+        def __init__(self, *args):
+            self.capture = real_capture(*args)
+
+        def grab(self):
+            nonlocal grabs
+            grabs += 1
+            return self.capture.grab()
+
+        def __getattr__(self, name):
+            return getattr(self.capture, name)
+
+    monkeypatch.setattr(cv2, "VideoCapture", CountingCapture)
+    with open(path, "rb") as f:
+        frames = sample_video_frames(f.read(), max_frames=4)
+
+    assert [frame.index for frame in frames] == [0, 100, 199, 299]
+    assert grabs == 4
+    expected = [Frame(index=0, image=scene(s)).image_hash for s in (0, 1, 1, 2)]
+    assert all(
+        hamming_distance(frame.image_hash, h) <= 6 for frame, h in zip(frames, expected)
+    )
+
+
+@pytest.mark.unit
+def test_prepare_burst_from_photos():
+    """Test that a burst is reduced to one montage of distinct frames."""
+    photos = [jpeg(scene(0)), jpeg(scene(0)), jpeg(scene(1)), jpeg(scene(2))]
+
+    prepared, image_hash, counts = prepare_burst(None, photos)
+
+    assert counts == {"sampled": 4, "distinct": 3, "keyframes": 3}
+    assert prepared.image is not None and prepared.image.mode == "RGB"
+    assert isinstance(image_hash, int)
+
+    with pytest.raises(UnsupportedImageError):
+        prepare_burst(None, [b"garbage"])
@@ -0,0 +1,268 @@
+import asyncio
+import time
+import pytest
+from libs.common.cache import (
+    DELETE_IF_SCRIPT,
+    MemoryCache,
+    RedisCache,
+    SQLiteCache,
+    TieredCache,
+    create_cache_backend,
+    read_resp_reply,
+)
+from libs.common.coalesce import CoalescingCache
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    """Create an on-disk cache in a temporary directory."""
+    return SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_cache_evicts_by_size():
+    """Test that the LRU entry is dropped once max_bytes is exceeded."""
+    cache = MemoryCache(max_bytes=10)
+    await cache.set("a", b"12345")
+    await cache.set("b", b"12345")
+    await cache.get("a")
+    await cache.set("c", b"12345")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"12345"
+    assert cache.current_bytes == 10
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_cache_ttl():
+    """Test that expired entries are not returned."""
+    cache = MemoryCache(max_bytes=100)
+    await cache.set("a", b"value", ttl=0)
+
+    assert await cache.get("a") is None
+    assert cache.current_bytes == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sqlite_cache_survives_reopen(tmp_path, sqlite_cache):
+    """Test that disk entries persist across connections."""
+    await sqlite_cache.set("key", b"value")
+    await sqlite_cache.close()
+
+    reopened = SQLiteCache(path=str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+
+    assert await reopened.get("key") == b"value"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_sqlite_cache_trims_to_max_bytes(sqlite_cache):
+    """Test that the least recently accessed rows are removed first."""
+    await sqlite_cache.set("old", b"x" * 600)
+    await sqlite_cache.set("new", b"y" * 600)
+
+    assert await sqlite_cache.get("old") is None
+    assert await sqlite_cache.get("new") == b"y" * 600
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tiered_cache_promotes_disk_hits(sqlite_cache):
+    """Test that a disk hit is copied into the memory tier."""
+    memory = MemoryCache(max_bytes=1024)
+    cache = TieredCache(memory, sqlite_cache)
+    await sqlite_cache.set("key", b"value")
+
+    assert await cache.get("key") == b"value"
+    assert await memory.get("key") == b"value"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tiered_cache_treats_disk_read_errors_as_misses(sqlite_cache):
+    """Test that a broken disk tier does not fail reads."""
+    memory = MemoryCache(max_bytes=1024)
+    cache = TieredCache(memory, sqlite_cache)
+    await cache.set("key", b"value")
+    await sqlite_cache.close()
+
+    assert await cache.get("key") == b"value"
+    assert await cache.get("other") is None
+
+
+class FakeRedisServer:
+    """Minimal in-memory Redis-protocol server supporting GET, SET (PX/NX), DEL and AUTH."""
+
+    def __init__(self, password=None):
+        self.data = {}
+        self.password = password
+        self.connections = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                command = await read_resp_reply(reader)
+                writer.write(self._execute([part for part in command]))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+        finally:
+            self.connections -= 1
+
+    def _execute(self, command):
+        name = command[0].upper()
+        now = time.time()
+        if name == b"GET":
+            entry = self.data.get(command[1])
+            if entry is None or (entry[1] is not None and entry[1] <= now):
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+        if name == b"SET":
+            key, value, options = command[1], command[2], [o.upper() for o in command[3:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = now + int(options[options.index(b"PX") + 1]) / 1000
+            existing = self.data.get(key)
+            alive = existing is not None and (existing[1] is None or existing[1] > now)
+            if b"NX" in options and alive:
+                return b"$-1\r\n"
+            self.data[key] = (value, expires_at)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % (1 if self.data.pop(command[1], None) else 0)
+        if name == b"EVAL" and command[1] == DELETE_IF_SCRIPT:
+            entry = self.data.get(command[3])
+            if entry is None or entry[0] != command[4]:
+                return b":0\r\n"
+            del self.data[command[3]]
+            return b":1\r\n"
+        if name == b"AUTH":
+            if command[1].decode() != self.password:
+                return b"-WRONGPASS invalid password\r\n"
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+async def redis_cache():
+    """Create a RedisCache connected to a local fake server."""
+    server = FakeRedisServer()
+    port = await server.start()
+    cache = create_cache_backend(f"redis://127.0.0.1:{port}/0")
+    yield cache
+    await cache.close()
+    await server.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_redis_cache_roundtrip(redis_cache):
+    """Test get/set/delete against the fake server."""
+    assert isinstance(redis_cache, RedisCache)
+    assert await redis_cache.get("missing") is None
+
+    await redis_cache.set("key", b"\x00binary\r\nvalue")
+    assert await redis_cache.get("key") == b"\x00binary\r\nvalue"
+
+    await redis_cache.delete("key")
+    assert await redis_cache.get("key") is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_redis_cache_add_is_exclusive(redis_cache):
+    """Test that add only succeeds for the first writer."""
+    assert await redis_cache.add("lock", b"1", ttl=10) is True
+    assert await redis_cache.add("lock", b"1", ttl=10) is False
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_coalescing_cache_computes_once_across_nodes(redis_cache):
+    """Test that concurrent misses on two 'replicas' sharing a backend compute once."""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"result"
+
+    node_a = CoalescingCache(redis_cache, poll_interval=0.01)
+    node_b = CoalescingCache(redis_cache, poll_interval=0.01)
+    results = await asyncio.gather(
+        node_a.get_or_compute("k", compute),
+        node_a.get_or_compute("k", compute),
+        node_b.get_or_compute("k", compute),
+    )
+
+    assert results == [b"result"] * 3
+    assert calls == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_delete_if_only_removes_matching_values(redis_cache, sqlite_cache):
+    """Test compare-and-delete on every backend."""
+    tiered = TieredCache(MemoryCache(max_bytes=1024), sqlite_cache)
+    for backend in (MemoryCache(max_bytes=1024), sqlite_cache, redis_cache, tiered):
+        await backend.set("lock", b"mine")
+        assert await backend.delete_if("lock", b"theirs") is False
+        assert await backend.get("lock") == b"mine"
+        assert await backend.delete_if("lock", b"mine") is True
+        assert await backend.get("lock") is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_coalescing_cache_keeps_a_lock_taken_over_after_expiry():
+    """Test that a slow holder does not release the lock another node now holds."""
+    backend = MemoryCache(max_bytes=1024)
+    node = CoalescingCache(backend, lock_ttl=0.05, poll_interval=0.01)
+
+    async def compute():
+        await asyncio.sleep(0.1)
+        # Our lock has expired; another node takes it over
+        assert await backend.add("lock:k", b"other", ttl=10)
+        return b"result"
+
+    assert await node.get_or_compute("k", compute) == b"result"
+    assert await backend.get("lock:k") == b"other"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_redis_client_closes_connections_that_fail_auth():
+    """Test that a connection rejected by AUTH is not left open."""
+    server = FakeRedisServer(password="secret")
+    port = await server.start()
+    cache = create_cache_backend(f"redis://:wrong@127.0.0.1:{port}/0")
+    try:
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await cache.get("key")
+        await asyncio.sleep(0.05)
+        assert server.connections == 0
+    finally:
+        await cache.close()
+        await server.stop()
+
+
+@pytest.mark.unit
+def test_create_cache_backend_rejects_unknown_scheme():
+    """Test that unsupported URLs raise ValueError."""
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached://localhost")
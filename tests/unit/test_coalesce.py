@@ -0,0 +1,139 @@
+import asyncio
+import time
+import pytest
+from libs.common.coalesce import SingleFlight
+from libs.common.deadline import DeadlineExceededError, check_deadline, current_deadline, deadline_scope
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_shares_result():
+    """Test that concurrent calls with the same key run once."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "done"
+
+    results = await asyncio.gather(*[flight.do("key", work) for _ in range(5)])
+
+    assert results == ["done"] * 5
+    assert calls == 1
+    assert not flight.in_flight("key")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors():
+    """Test that every waiter sees the leader's exception."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_keys_are_independent():
+    """Test that different keys do not share work."""
+    flight = SingleFlight()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    results = await asyncio.gather(
+        flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b"))
+    )
+
+    assert results == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_leader():
+    """Test that cancelling the first caller does not fail the callers sharing its work."""
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def leader():
+        with deadline_scope(time.time() + 1):
+            return await flight.do("key", work)
+
+    first = asyncio.create_task(leader())
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await follower == "done"
+    assert first.cancelled()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_cancels_abandoned_work():
+    """Test that the shared work stops once every caller is gone."""
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    callers = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert cancelled.is_set()
+    assert not flight.in_flight("key")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_runs_under_the_callers_deadline():
+    """Test that the shared work sees the deadline and is rerun for callers with more time."""
+    flight = SingleFlight()
+    deadlines = []
+
+    async def work():
+        deadlines.append(current_deadline())
+        await asyncio.sleep(0.03)
+        check_deadline("work")
+        return "done"
+
+    async def call(deadline):
+        with deadline_scope(deadline):
+            return await flight.do("key", work)
+
+    short, long = time.time() + 0.01, time.time() + 5
+    results = await asyncio.gather(
+        call(short), call(long), call(short), return_exceptions=True
+    )
+
+    assert isinstance(results[0], DeadlineExceededError)
+    assert isinstance(results[2], DeadlineExceededError)
+    assert results[1] == "done"
+    assert deadlines == [short, long]
@@ -0,0 +1,110 @@
+import base64
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from libs.common.codec import (
+    ImageCodecError,
+    decode_base64_bgr,
+    decode_bgr,
+    decode_bgr_reduced,
+    decode_pil,
+    encode_jpeg,
+    fit_size,
+    jpeg_reduction_factor,
+)
+
+
+def _encode(image: Image.Image, fmt: str = "JPEG") -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+def test_fit_size_keeps_aspect_ratio_and_never_upscales():
+    """Test target size computation."""
+    assert fit_size(4000, 3000, 1920, 1080) == (1440, 1080)
+    assert fit_size(640, 480, 1920, 1080) == (640, 480)
+
+
+@pytest.mark.unit
+def test_jpeg_reduction_factor_stays_above_target():
+    """Test that the DCT scale never undershoots the target size."""
+    assert jpeg_reduction_factor(4000, 3000, 1920, 1080) == 2
+    assert jpeg_reduction_factor(4000, 3000, 480, 480) == 8
+    assert jpeg_reduction_factor(1000, 800, 1920, 1080) == 1
+
+
+@pytest.mark.unit
+def test_decode_bgr_returns_contiguous_bgr():
+    """Test that decoding yields a C-contiguous array in BGR order."""
+    data = _encode(Image.new("RGB", (64, 48), color=(255, 0, 0)), "PNG")
+
+    image = decode_bgr(data)
+
+    assert image.shape == (48, 64, 3)
+    assert image.flags["C_CONTIGUOUS"]
+    assert tuple(image[0, 0]) == (0, 0, 255)
+
+
+@pytest.mark.unit
+def test_decode_bgr_bounded_jpeg():
+    """Test that a bounded JPEG decode fits within the requested size."""
+    data = _encode(Image.new("RGB", (4000, 3000), color=(0, 128, 0)))
+
+    image = decode_bgr(data, max_width=1920, max_height=1080)
+
+    assert image.shape == (1080, 1440, 3)
+    assert image.flags["C_CONTIGUOUS"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("factor", [1, 2, 4, 8])
+def test_decode_bgr_reduced_scales_by_factor(factor):
+    """Test DCT-scaled decoding at each supported factor."""
+    data = _encode(Image.new("RGB", (800, 400)))
+
+    image = decode_bgr_reduced(data, factor)
+
+    assert image.shape == (400 // factor, 800 // factor, 3)
+
+
+@pytest.mark.unit
+def test_decode_base64_matches_pil_pixels():
+    """Test that the codec decodes the same pixels as PIL."""
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, size=(32, 32, 3), dtype=np.uint8)
+    data = _encode(Image.fromarray(pixels), "PNG")
+
+    image = decode_base64_bgr(base64.b64encode(data).decode("utf-8"))
+
+    assert np.array_equal(image, pixels[:, :, ::-1])
+
+
+@pytest.mark.unit
+def test_decode_pil_fits_and_converts_to_rgb():
+    """Test that PIL decoding fits the bounds and converts the mode."""
+    jpeg = decode_pil(_encode(Image.new("RGB", (4000, 3000))), 1920, 1080)
+    png = decode_pil(_encode(Image.new("RGBA", (300, 200)), "PNG"), 1920, 1080)
+
+    assert jpeg.size == (1440, 1080)
+    assert png.mode == "RGB"
+    assert png.size == (300, 200)
+
+
+@pytest.mark.unit
+def test_decode_invalid_data_raises():
+    """Test that undecodable bytes raise ImageCodecError."""
+    with pytest.raises(ImageCodecError):
+        decode_bgr(b"not an image")
+
+
+@pytest.mark.unit
+def test_encode_jpeg_roundtrip():
+    """Test JPEG encoding of a BGR array."""
+    image = np.zeros((16, 16, 3), dtype=np.uint8)
+
+    decoded = decode_bgr(encode_jpeg(image))
+
+    assert decoded.shape == (16, 16, 3)
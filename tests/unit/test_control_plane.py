@@ -0,0 +1,73 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import urllib.error
+import urllib.request
+import pytest
+from libs.common.control_plane import ControlPlaneServer, LoadTracker
+
+
+def get(server, path):
+    """Status and JSON body of a GET to the control plane."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}{path}", timeout=2) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def control_plane():
+    """Control plane on a free port with switchable model state."""
+    state = {"loaded": False}
+    server = ControlPlaneServer(
+        "127.0.0.1", 0, "llm-inferencer", "0.1.0",
+        models_loaded=lambda: state["loaded"],
+        load=LoadTracker(capacity=1)
+    )
+    server.start()
+    yield server, state
+    server.stop()
+
+
+@pytest.mark.unit
+def test_readiness_is_separate_from_liveness(control_plane):
+    """Test that a busy or loading service is live but not ready."""
+    server, state = control_plane
+
+    assert get(server, "/health") == (200, {
+        "status": "degraded", "service": "llm-inferencer", "version": "0.1.0", "models_loaded": False
+    })
+    status, body = get(server, "/ready")
+    assert status == 503 and body["reason"] == "models not loaded"
+
+    state["loaded"] = True
+    assert get(server, "/ready")[0] == 200
+
+    with server.load.track():
+        status, body = get(server, "/ready")
+        assert status == 503 and body == {
+            "ready": False, "in_flight": 1, "capacity": 1, "reason": "at capacity"
+        }
+        assert get(server, "/health")[0] == 200
+        assert get(server, "/metrics")[1]["gauges"]["inference_in_flight"] == 1
+
+    assert get(server, "/ready")[0] == 200
+    assert get(server, "/missing")[0] == 404
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_answers_while_the_event_loop_is_blocked(control_plane):
+    """Test that health checks do not wait for inference blocking the event loop."""
+    server, _ = control_plane
+    with ThreadPoolExecutor(1) as pool:
+        probe = pool.submit(get, server, "/health")
+
+        # A blocking model call on the event loop
+        start = time.monotonic()
+        while not probe.done() and time.monotonic() - start < 1:
+            time.sleep(0.01)
+
+        assert probe.done() and time.monotonic() - start < 1
+        assert probe.result()[0] == 200
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import time
+import pytest
+from libs.common.deadline import (
+    DEADLINE_HEADER,
+    DeadlineExceededError,
+    DeadlineMiddleware,
+    check_deadline,
+    current_deadline,
+    deadline_headers,
+    deadline_scope,
+    until_deadline,
+)
+from libs.common.work_queue import MemoryQueue, QueueTransport, QueueWorker
+from services.llm_inferencer.app.services.llm_manager import LLMManager
+
+
+class Receiver:
+    """ASGI receive channel fed by the test."""
+
+    def __init__(self, *messages):
+        self.queue = asyncio.Queue()
+        for message in messages:
+            self.queue.put_nowait(message)
+
+    async def __call__(self):
+        return await self.queue.get()
+
+
+async def call(middleware, headers=(), receive=None):
+    """Run one request through the middleware; returns the sent messages."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/work", "headers": list(headers)}
+    receive = receive or Receiver({"type": "http.request", "body": b"", "more_body": False})
+    await middleware(scope, receive, send)
+    return sent
+
+
+def header(deadline):
+    return [(DEADLINE_HEADER.lower().encode(), f"{deadline:.3f}".encode())]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_deadline_scope_nests_to_the_earliest_deadline():
+    """Test nesting, propagation headers and the checks."""
+    now = time.time()
+    assert deadline_headers() == {}
+    check_deadline("anything")
+
+    with deadline_scope(now + 10):
+        with deadline_scope(now + 60):
+            assert current_deadline() == now + 10
+        assert deadline_headers() == {DEADLINE_HEADER: f"{now + 10:.3f}"}
+
+        with deadline_scope(now - 1):
+            with pytest.raises(DeadlineExceededError):
+                check_deadline("analysis")
+
+        with deadline_scope(now + 0.01):
+            with pytest.raises(DeadlineExceededError):
+                await until_deadline(asyncio.sleep(1))
+
+    assert current_deadline() is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_middleware_rejects_late_requests_and_cancels_at_deadline():
+    """Test 504 on arrival after the deadline and when the handler runs past it."""
+    cancelled = asyncio.Event()
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(current_deadline())
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    middleware = DeadlineMiddleware(app)
+
+    sent = await call(middleware, header(time.time() - 1))
+    assert sent[0]["status"] == 504
+    assert seen == []
+
+    deadline = time.time() + 0.05
+    sent = await call(middleware, header(deadline))
+    assert seen == [pytest.approx(deadline, abs=0.001)]
+    assert cancelled.is_set()
+    assert sent[0]["status"] == 504
+    assert json.loads(sent[1]["body"])["error_code"] == "DEADLINE_EXCEEDED"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_middleware_cancels_when_client_disconnects():
+    """Test that a disconnect after the body was read cancels the handler."""
+    cancelled = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    receive = Receiver({"type": "http.request", "body": b"{}", "more_body": False})
+    asyncio.get_running_loop().call_later(0.02, receive.queue.put_nowait, {"type": "http.disconnect"})
+
+    sent = await call(DeadlineMiddleware(app, default_timeout=5), receive=receive)
+
+    assert cancelled.is_set()
+    assert sent == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_queue_jobs_carry_the_request_deadline():
+    """Test that queued jobs expire with the request and handlers see its deadline."""
+    backend = MemoryQueue()
+    seen = []
+
+    async def analyze(payload, headers):
+        seen.append(current_deadline())
+        return {"ok": True}
+
+    worker = QueueWorker(backend, "face_analysis", {"/api/v1/analyze": analyze}, poll_timeout=0.05)
+    worker.start()
+    transport = QueueTransport(backend, {"http://face": "face_analysis"}, deadline_seconds=30)
+
+    deadline = time.time() + 5
+    with deadline_scope(deadline):
+        assert await transport.post("http://face/api/v1/analyze", {}) == {"ok": True}
+    assert seen == [deadline]
+
+    await worker.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_llm_generation_queue_honours_deadlines():
+    """Test that queued generations expire and running ones stop when cancelled."""
+    manager = LLMManager()
+    manager.model, manager.tokenizer, manager.model_loaded = object(), object(), True
+    tokens = []
+
+    class Piece:
+        text = "ha"
+
+    def stream(model, tokenizer, prompt, max_tokens, sampler):
+        for _ in range(max_tokens):
+            tokens.append(prompt)
+            time.sleep(0.01)
+            yield Piece()
+
+    manager.stream_fn = stream
+
+    assert await manager._run_generation("quick", 3, None) == "hahaha"
+
+    slow = asyncio.create_task(manager._run_generation("slow", 1000, None))
+    await asyncio.sleep(0.05)
+    with deadline_scope(time.time() + 0.05):
+        with pytest.raises(DeadlineExceededError):
+            await manager._run_generation("queued", 3, None)
+
+    slow.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await slow
+    # The lock is free again once the generation thread has stopped
+    await asyncio.wait_for(manager._generation_lock.acquire(), 1)
+    manager._generation_lock.release()
+
+    assert "queued" not in tokens
+    assert tokens.count("slow") < 100
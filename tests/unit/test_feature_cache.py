@@ -0,0 +1,117 @@
+import pytest
+from libs.common.schemas import AggregatedImageFeatures
+from services.main_orchestrator.app.services.feature_cache import PerceptualFeatureCache
+
+
+@pytest.fixture
+def features():
+    """Create sample aggregated features."""
+    return AggregatedImageFeatures(vlm_scene_analysis="A cat on a keyboard")
+
+
+@pytest.mark.unit
+def test_near_duplicate_hit(features):
+    """Test that a hash within the threshold reuses the cached entry."""
+    cache = PerceptualFeatureCache(max_entries=10, max_distance=2, ttl_seconds=60)
+    cache.store(0b1010_1010, features)
+
+    entry = cache.lookup(0b1010_1011)
+
+    assert entry is not None
+    assert entry.features == features
+    assert cache.lookup(0b0101_0101) is None
+
+
+@pytest.mark.unit
+def test_lru_eviction(features):
+    """Test that the least recently used entry is evicted first."""
+    cache = PerceptualFeatureCache(max_entries=2, max_distance=0, ttl_seconds=60)
+    cache.store(1, features)
+    cache.store(2, features)
+    cache.lookup(1)
+    cache.store(4, features)
+
+    assert cache.lookup(2) is None
+    assert cache.lookup(1) is not None
+    assert len(cache) == 2
+
+
+@pytest.mark.unit
+def test_expired_entries_miss(features):
+    """Test that entries past their TTL are not returned."""
+    cache = PerceptualFeatureCache(max_entries=10, max_distance=0, ttl_seconds=0)
+    cache.store(7, features)
+
+    assert cache.lookup(7) is None
+
+
+@pytest.mark.unit
+def test_roast_attached_to_entry(features):
+    """Test that roasts are stored per roast level."""
+    cache = PerceptualFeatureCache(max_entries=10, max_distance=1, ttl_seconds=60)
+    entry = cache.store(8, features)
+    cache.store_roast(entry.image_hash, "savage", "Nice keyboard.")
+
+    assert cache.lookup(9).roasts == {"savage": "Nice keyboard."}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_shared_tier_reused_by_other_replica():
+    """Test that a second replica reuses features published by the first."""
+    from libs.common.cache import MemoryCache
+    from libs.common.schemas import FaceAnalysisResult
+
+    complete = AggregatedImageFeatures(
+        face_analysis=FaceAnalysisResult(face_count=0),
+        vlm_scene_analysis="An empty room"
+    )
+    shared = MemoryCache(max_bytes=1024 * 1024)
+    replica_a = PerceptualFeatureCache(max_entries=10, max_distance=0, ttl_seconds=60, shared=shared)
+    replica_b = PerceptualFeatureCache(max_entries=10, max_distance=0, ttl_seconds=60, shared=shared)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return complete
+
+    features_a, entry_a = await replica_a.get_or_compute(123, compute)
+    await replica_a.save_roast(entry_a, "mild", "Cozy.")
+    features_b, entry_b = await replica_b.get_or_compute(123, compute)
+
+    assert features_a == features_b == complete
+    assert calls == 1
+    assert await replica_b.get_roast(entry_b, "mild") == "Cozy."
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_entry_without_face_detections_only_serves_lite_requests():
+    """Test that features computed without face detections are not reused when needed."""
+    from libs.common.schemas import FaceAnalysisResult, FaceDetection
+
+    lite = AggregatedImageFeatures(
+        face_analysis=FaceAnalysisResult(face_count=1, faces=[]),
+        vlm_scene_analysis="A cat on a keyboard"
+    )
+    full = lite.model_copy(update={"face_analysis": FaceAnalysisResult(
+        face_count=1, faces=[FaceDetection(bbox=[0, 0, 10, 10], confidence=0.9)]
+    )})
+    cache = PerceptualFeatureCache(max_entries=10, max_distance=0, ttl_seconds=60)
+
+    async def compute_lite():
+        return lite
+
+    async def compute_full():
+        return full
+
+    await cache.get_or_compute(3, compute_lite, face_detections=False)
+
+    reused, _ = await cache.get_or_compute(3, compute_full, face_detections=False)
+    recomputed, _ = await cache.get_or_compute(3, compute_full, face_detections=True)
+    upgraded, _ = await cache.get_or_compute(3, compute_lite, face_detections=False)
+
+    assert reused == lite
+    assert recomputed == full
+    assert upgraded == full
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from libs.common.geometry import pack_detections
+from libs.common.schemas import (
+    AggregatedImageFeatures,
+    AnalyzeImageResponse,
+    FaceAnalysisResult,
+    FaceDetection,
+)
+from services.main_orchestrator.app.services.fields import FieldSelection, InvalidFieldsError
+
+
+@pytest.fixture
+def response():
+    """Create a response with faces and a scene description."""
+    return AnalyzeImageResponse(
+        request_id="req-1",
+        roast="Nice keyboard.",
+        features=AggregatedImageFeatures(
+            face_analysis=FaceAnalysisResult(
+                face_count=1,
+                faces=[FaceDetection(bbox=[1, 2, 3, 4], confidence=0.9, landmarks=[[1, 2]])],
+                emotion="happy"
+            ),
+            vlm_scene_analysis="A cat on a keyboard"
+        ),
+        total_processing_time_ms=12.5
+    )
+
+
+@pytest.mark.unit
+def test_full_selection_omits_nulls(response):
+    """Test that the default selection returns everything except null fields."""
+    selection = FieldSelection.parse(None)
+    data = selection.dump(response)
+
+    assert selection.face_detections
+    assert data["features"]["vlm_scene_analysis"] == "A cat on a keyboard"
+    assert "body_analysis" not in data["features"]
+    assert "gender" not in data["features"]["face_analysis"]
+
+
+@pytest.mark.unit
+def test_include_features_false(response):
+    """Test that features can be dropped entirely."""
+    selection = FieldSelection.parse(None, include_features=False)
+
+    assert selection.dump(response) == {
+        "request_id": "req-1",
+        "roast": "Nice keyboard.",
+        "total_processing_time_ms": 12.5,
+        "status": "success",
+    }
+    assert not selection.face_detections
+
+
+@pytest.mark.unit
+def test_nested_paths(response):
+    """Test selecting nested fields, including inside lists."""
+    selection = FieldSelection.parse(
+        "features.face_analysis.emotion,features.face_analysis.faces.bbox"
+    )
+    data = selection.dump(response)
+
+    assert data["features"] == {
+        "face_analysis": {"emotion": "happy", "faces": [{"bbox": [1, 2, 3, 4]}]}
+    }
+    assert data["roast"] == "Nice keyboard."
+    assert "total_processing_time_ms" not in data
+    assert selection.face_detections
+
+
+@pytest.mark.unit
+def test_face_detections_not_needed_for_attributes():
+    """Test that selecting face attributes does not require detections."""
+    assert not FieldSelection.parse("roast,features.face_analysis.emotion").face_detections
+    assert FieldSelection.parse("features.face_analysis").face_detections
+
+
+@pytest.mark.unit
+def test_unknown_field_rejected():
+    """Test that unknown paths raise InvalidFieldsError."""
+    with pytest.raises(InvalidFieldsError):
+        FieldSelection.parse("features.nonexistent")
+
+
+@pytest.mark.unit
+def test_packed_faces_expanded_for_list_clients(response):
+    """Test that packed geometry is returned as FaceDetection lists by default."""
+    detections = np.arange(15, dtype=np.float32).reshape(1, 15) / 20
+    face_analysis = response.features.face_analysis.model_copy(
+        update={"faces": [], "packed_faces": pack_detections(detections)}
+    )
+    packed = response.model_copy(update={
+        "features": response.features.model_copy(update={"face_analysis": face_analysis})
+    })
+
+    listed = FieldSelection.parse("features.face_analysis.faces").dump(packed)
+    raw = FieldSelection.parse("features.face_analysis.faces", face_geometry="packed").dump(packed)
+
+    face = listed["features"]["face_analysis"]["faces"][0]
+    assert "packed_faces" not in listed["features"]["face_analysis"]
+    assert face["bbox"] == pytest.approx(detections[0, :4].tolist())
+    assert len(face["landmarks"]) == 5
+    assert raw["features"]["face_analysis"]["packed_faces"]["shape"] == [1, 15]
+
+
+@pytest.mark.unit
+def test_unknown_face_geometry_rejected():
+    """Test that unsupported geometry formats are rejected."""
+    with pytest.raises(InvalidFieldsError):
+        FieldSelection.parse(None, face_geometry="csv")
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from libs.common.geometry import (
+    detections_to_faces,
+    pack_array,
+    pack_detections,
+    unpack_array,
+    unpack_detections,
+)
+from libs.common.schemas import PackedArray
+
+
+def _detections(count: int) -> np.ndarray:
+    rows = np.arange(count * 15, dtype=np.float32).reshape(count, 15)
+    rows[:, 14] = 0.9
+    return rows
+
+
+@pytest.mark.unit
+def test_pack_roundtrip():
+    """Test that packed arrays decode to the same float32 values and shape."""
+    array = np.random.default_rng(0).random((3, 4)).astype(np.float64)
+    packed = pack_array(array)
+
+    assert packed.shape == [3, 4]
+    assert np.array_equal(unpack_array(packed), array.astype(np.float32))
+
+
+@pytest.mark.unit
+def test_unpack_rejects_unknown_dtype():
+    """Test that only float32 payloads are accepted."""
+    with pytest.raises(ValueError):
+        unpack_array(PackedArray(dtype="float64", shape=[1], data="AAAAAAAAAAA="))
+
+
+@pytest.mark.unit
+def test_unpack_detections_splits_columns():
+    """Test that detections split into boxes, landmarks and scores."""
+    detections = _detections(2)
+    boxes, landmarks, scores = unpack_detections(pack_detections(detections))
+
+    assert boxes.shape == (2, 4)
+    assert landmarks.shape == (2, 5, 2)
+    assert scores.tolist() == pytest.approx([0.9, 0.9])
+    assert landmarks[1, 0].tolist() == [19.0, 20.0]
+
+
+@pytest.mark.unit
+def test_empty_detections():
+    """Test that no faces pack to a (0, 15) array."""
+    packed = pack_detections(np.zeros((0, 15), dtype=np.float32))
+
+    assert packed.shape == [0, 15]
+    assert detections_to_faces(unpack_array(packed)) == []
+
+
+@pytest.mark.unit
+def test_detections_to_faces():
+    """Test expansion into FaceDetection models."""
+    faces = detections_to_faces(_detections(1))
+
+    assert faces[0].bbox == [0.0, 1.0, 2.0, 3.0]
+    assert faces[0].landmarks[4] == [12.0, 13.0]
+    assert faces[0].confidence == pytest.approx(0.9)
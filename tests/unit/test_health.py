@@ -0,0 +1,98 @@
+import asyncio
+import time
+import aiohttp
+import pytest
+from aiohttp import web
+from libs.common.health import HealthPoller
+from libs.common.transport import HttpTransport
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_probes_run_concurrently_with_a_timeout():
+    """Test that one round takes as long as the slowest probe, capped by the timeout."""
+    async def slow():
+        await asyncio.sleep(0.1)
+        return True
+
+    async def hanging():
+        await asyncio.sleep(10)
+        return True
+
+    async def failing():
+        raise ConnectionError("refused")
+
+    poller = HealthPoller(
+        {"a": slow, "b": slow, "hung": hanging, "down": failing}, interval=60, timeout=0.2
+    )
+
+    start = time.monotonic()
+    snapshot = await poller.poll_once()
+
+    assert time.monotonic() - start < 0.35
+    assert snapshot["a"].healthy and snapshot["b"].healthy
+    assert snapshot["a"].latency_ms >= 100
+    assert not snapshot["hung"].healthy and "0.2s" in snapshot["hung"].error
+    assert snapshot["down"].error == "refused"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_snapshot_tracks_changes_and_is_served_from_cache():
+    """Test last-change timestamps and that /health reads do not probe while polling."""
+    calls = []
+    state = {"up": True}
+
+    async def probe():
+        calls.append(time.time())
+        return state["up"]
+
+    poller = HealthPoller({"llm": probe}, interval=60, timeout=1)
+
+    # Not running yet: answered by probing on demand
+    first = (await poller.current())["llm"]
+    assert first.healthy and first.changed_at == first.checked_at
+
+    await poller.poll_once()
+    assert poller._status["llm"].changed_at == first.changed_at
+
+    state["up"] = False
+    changed = (await poller.poll_once())["llm"]
+    assert not changed.healthy and changed.changed_at > first.changed_at
+
+    poller.start()
+    await asyncio.sleep(0.01)
+    probes = len(calls)
+    for _ in range(5):
+        await poller.current()
+    assert len(calls) == probes
+    await poller.stop()
+    assert not poller.running
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_http_transport_reuses_pooled_connections():
+    """Test that requests and health checks share one keep-alive connection."""
+    peers = set()
+
+    async def health(request: web.Request) -> web.Response:
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"status": "healthy"})
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    transport = HttpTransport(aiohttp.ClientTimeout(total=5))
+    try:
+        for _ in range(3):
+            assert await transport.healthy(f"http://127.0.0.1:{port}")
+        assert len(peers) == 1
+    finally:
+        await transport.close()
+        await runner.cleanup()
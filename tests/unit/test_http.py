@@ -0,0 +1,54 @@
+import pytest
+from aiohttp import web
+from libs.common.http import client_session, control_plane_url, request_url, split_unix_url
+
+
+@pytest.mark.unit
+def test_split_unix_url():
+    """Test that unix:// URLs split into the socket path and request path."""
+    assert split_unix_url("unix:///run/judgy/face.sock") == ("/run/judgy/face.sock", "http://localhost/")
+    assert split_unix_url("unix:///tmp/a.sock/api/v1/analyze") == (
+        "/tmp/a.sock", "http://localhost/api/v1/analyze"
+    )
+    assert split_unix_url("http://localhost:8002/health") == (None, "http://localhost:8002/health")
+
+
+@pytest.mark.unit
+def test_unix_url_requires_sock_file():
+    """Test that socket paths without a .sock suffix are rejected."""
+    with pytest.raises(ValueError):
+        split_unix_url("unix:///run/judgy/face.socket/health")
+
+
+@pytest.mark.unit
+def test_control_plane_url():
+    """Test that health probes go to the control port on the service's host."""
+    assert control_plane_url("http://localhost:8002", 9002) == "http://localhost:9002"
+    assert control_plane_url("https://face.internal/", 9002) == "http://face.internal:9002"
+    assert control_plane_url("http://[::1]:8002", 9002) == "http://[::1]:9002"
+    assert control_plane_url("http://localhost:8002", 0) == "http://localhost:8002"
+    assert control_plane_url("unix:///run/judgy/face.sock", 9002) == "unix:///run/judgy/face.sock"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_client_session_over_unix_socket(tmp_path):
+    """Test a request through a Unix domain socket."""
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "healthy"})
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    socket_path = str(tmp_path / "service.sock")
+    await web.UnixSite(runner, socket_path).start()
+
+    url = f"unix://{socket_path}/health"
+    try:
+        async with client_session(url) as session:
+            async with session.get(request_url(url)) as response:
+                assert response.status == 200
+                assert await response.json() == {"status": "healthy"}
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from libs.common.cache import MemoryCache
+from libs.common.schemas import AnalyzeImageResponse
+from services.main_orchestrator.app.services.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyStore,
+)
+
+
+@pytest.fixture
+def store():
+    """Create an in-memory idempotency store."""
+    return IdempotencyStore(MemoryCache(max_bytes=1024 * 1024), ttl_seconds=60)
+
+
+@pytest.fixture
+def sample_response():
+    """Create a sample analyze response."""
+    return AnalyzeImageResponse(
+        request_id="req-1",
+        roast="Bold choice of wallpaper.",
+        total_processing_time_ms=1200.0
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_completed_response_is_replayed(store, sample_response):
+    """Test that a retry after completion replays the stored response."""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return sample_response
+
+    first, first_replayed = await store.run("client-a", "key-1", "hash:medium", compute)
+    second, second_replayed = await store.run("client-a", "key-1", "hash:medium", compute)
+
+    assert calls == 1
+    assert (first_replayed, second_replayed) == (False, True)
+    assert second == first
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_retry_attaches_to_in_flight_request(store, sample_response):
+    """Test that a retry during processing waits for the original."""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return sample_response
+
+    results = await asyncio.gather(
+        store.run("client-a", "key-1", "hash:medium", compute),
+        store.run("client-a", "key-1", "hash:medium", compute),
+    )
+
+    assert calls == 1
+    assert [replayed for _, replayed in results] == [False, True]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_key_reuse_with_different_payload_conflicts(store, sample_response):
+    """Test that reusing a key for another image is rejected."""
+    async def compute():
+        return sample_response
+
+    await store.run("client-a", "key-1", "hash-a:medium", compute)
+
+    with pytest.raises(IdempotencyConflictError):
+        await store.run("client-a", "key-1", "hash-b:medium", compute)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failures_are_not_stored(store, sample_response):
+    """Test that a failed request can be retried with the same key."""
+    async def fail():
+        raise RuntimeError("LLM down")
+
+    async def succeed():
+        return sample_response
+
+    with pytest.raises(RuntimeError):
+        await store.run("client-a", "key-1", "hash:medium", fail)
+
+    result, replayed = await store.run("client-a", "key-1", "hash:medium", succeed)
+
+    assert result == sample_response
+    assert replayed is False
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_keys_are_scoped_to_the_client(store, sample_response):
+    """Test that another client reusing a key gets its own run, not the stored response."""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return sample_response
+
+    await store.run("client-a", "key-1", "hash:medium", compute)
+    result, replayed = await store.run("client-b", "key-1", "hash-b:medium", compute)
+
+    assert len(calls) == 2
+    assert replayed is False
@@ -0,0 +1,156 @@
+import io
+import struct
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from libs.common.image_probe import header_end, probe_image_header, read_exif_thumbnail, sniff_format
+from services.main_orchestrator.app.services import ingestion
+from services.main_orchestrator.app.services.ingestion import (
+    UploadRejectedError,
+    read_limited,
+    read_upload,
+)
+
+
+def encode(image, **save_kwargs):
+    """Encode a PIL image to bytes."""
+    buffered = io.BytesIO()
+    image.save(buffered, **save_kwargs)
+    return buffered.getvalue()
+
+
+def with_exif_thumbnail(jpeg, thumbnail):
+    """Insert an APP1 Exif segment whose IFD1 points at a JPEG thumbnail."""
+    ifd1_offset = 14
+    data_offset = ifd1_offset + 2 + 2 * 12 + 4
+    tiff = b"II*\x00" + struct.pack("<IHI", 8, 0, ifd1_offset)
+    tiff += struct.pack("<H", 2)
+    tiff += struct.pack("<HHII", 0x0201, 4, 1, data_offset)
+    tiff += struct.pack("<HHII", 0x0202, 4, 1, len(thumbnail))
+    tiff += struct.pack("<I", 0) + thumbnail
+    app1 = b"Exif\x00\x00" + tiff
+    return jpeg[:2] + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 + jpeg[2:]
+
+
+@pytest.fixture
+def sample_image():
+    """Create a non-square sample image."""
+    return Image.new("RGB", (321, 123), color="blue")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("save_kwargs, expected_format", [
+    ({"format": "JPEG"}, "JPEG"),
+    ({"format": "JPEG", "progressive": True, "exif": Image.Exif().tobytes()}, "JPEG"),
+    ({"format": "PNG"}, "PNG"),
+    ({"format": "WEBP"}, "WEBP"),
+    ({"format": "WEBP", "lossless": True}, "WEBP"),
+])
+def test_probe_reads_dimensions(sample_image, save_kwargs, expected_format):
+    """Test that format and dimensions are parsed from the header alone."""
+    header = probe_image_header(encode(sample_image, **save_kwargs)[:4096])
+
+    assert header is not None
+    assert (header.format, header.width, header.height) == (expected_format, 321, 123)
+
+
+@pytest.mark.unit
+def test_sniff_rejects_non_images():
+    """Test that unknown magic bytes are not recognized."""
+    assert sniff_format(b"GIF89a\x00\x00\x00\x00\x00\x00") is None
+    assert probe_image_header(b"%PDF-1.7 not an image") is None
+
+
+@pytest.mark.unit
+def test_read_exif_thumbnail(sample_image):
+    """Test that the embedded thumbnail is extracted without decoding the image."""
+    thumbnail = encode(Image.new("RGB", (160, 61)), format="JPEG")
+    jpeg = with_exif_thumbnail(encode(sample_image, format="JPEG"), thumbnail)
+
+    assert read_exif_thumbnail(jpeg) == thumbnail
+    assert probe_image_header(jpeg).width == 321
+
+
+@pytest.mark.unit
+def test_read_exif_thumbnail_missing(sample_image):
+    """Test images without an EXIF thumbnail."""
+    assert read_exif_thumbnail(encode(sample_image, format="JPEG")) is None
+    assert read_exif_thumbnail(encode(sample_image, format="JPEG", exif=Image.Exif().tobytes())) is None
+    assert read_exif_thumbnail(encode(sample_image, format="PNG")) is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_read_upload_rejects_oversized(sample_image):
+    """Test that the size cap is enforced while reading."""
+    data = encode(sample_image, format="PNG")
+    upload = UploadFile(file=io.BytesIO(data))
+
+    with pytest.raises(UploadRejectedError, match="too large"):
+        await read_upload(upload, max_bytes=len(data) - 1, chunk_size=16)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_read_upload_rejects_absurd_dimensions():
+    """Test that huge declared dimensions are rejected from the header."""
+    # PNG header declaring 100000 x 100000 pixels, followed by junk
+    data = (
+        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+        + (100000).to_bytes(4, "big") * 2
+        + b"\x08\x02\x00\x00\x00" + b"\x00" * 1000
+    )
+    upload = UploadFile(file=io.BytesIO(data))
+
+    with pytest.raises(UploadRejectedError, match="exceed"):
+        await read_upload(upload, max_bytes=10 * 1024 * 1024, chunk_size=64)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_read_upload_returns_bytes_and_header(sample_image):
+    """Test that a valid upload is returned whole with its header."""
+    data = encode(sample_image, format="JPEG")
+    upload = UploadFile(file=io.BytesIO(data))
+
+    image_bytes, header = await read_upload(upload, max_bytes=len(data), chunk_size=100)
+
+    assert image_bytes == data
+    assert (header.width, header.height) == (321, 123)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_read_limited_accepts_any_content_up_to_the_cap():
+    """Test the size-capped read used for non-image uploads (video)."""
+    data = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 100
+
+    assert await read_limited(UploadFile(file=io.BytesIO(data)), max_bytes=len(data), chunk_size=16) == data
+    with pytest.raises(UploadRejectedError, match="File too large"):
+        await read_limited(UploadFile(file=io.BytesIO(data)), max_bytes=len(data) - 1, chunk_size=16)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_read_upload_probes_the_header_once(sample_image, monkeypatch):
+    """Test that a header behind large metadata segments is probed only once it is complete."""
+    jpeg = encode(sample_image, format="JPEG")
+    app2 = b"\xff\xe2" + struct.pack(">H", 60002) + b"\x00" * 60000
+    data = jpeg[:2] + app2 * 3 + jpeg[2:]
+
+    calls = []
+    original = ingestion.probe_image_header
+
+    def probe(prefix):
+        calls.append(len(prefix))
+        return original(prefix)
+
+    monkeypatch.setattr(ingestion, "probe_image_header", probe)
+    image_bytes, header = await read_upload(
+        UploadFile(file=io.BytesIO(data)), max_bytes=len(data), chunk_size=4096
+    )
+
+    assert image_bytes == data
+    assert (header.width, header.height) == (321, 123)
+    assert len(calls) == 1
+    assert header_end(data) == calls[0] < len(data)
@@ -28,6 +28,13 @@ async def test_orchestrator_initialization(orchestrator):
     assert orchestrator.max_concurrent is not None
 
 
+@pytest.mark.unit
+def test_health_probes_default_to_control_ports(orchestrator):
+    """Test that analyzers are probed on their control ports unless configured otherwise."""
+    assert orchestrator.face_analysis_health_url == "http://localhost:9002"
+    assert orchestrator.vlm_scene_analysis_health_url == "http://localhost:9008"
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_health_check(orchestrator):
@@ -122,3 +129,126 @@ def test_sample_image_base64_fixture(sample_image_base64):
     assert isinstance(sample_image_base64, str)
     assert len(sample_image_base64) > 0
 
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_call_service_uses_result_cache(orchestrator, sample_image_base64):
+    """Test that a repeated image is served from the result cache."""
+    from libs.common.cache import MemoryCache, TieredCache
+    from services.image_processing_orchestrator.app.services.result_cache import AnalyzerResultCache
+
+    orchestrator.result_cache = AnalyzerResultCache(
+        cache=TieredCache(MemoryCache(max_bytes=1024 * 1024)),
+        enabled={"face_analysis": True},
+        versions={"face_analysis": "1"}
+    )
+
+    with patch.object(orchestrator, "_post_service", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value = {"face_count": 1}
+
+        first = await orchestrator._call_service(
+            url="http://test.com/api",
+            payload={"image_base64": sample_image_base64},
+            service_name="face_analysis",
+            image_hash="abc"
+        )
+        second = await orchestrator._call_service(
+            url="http://test.com/api",
+            payload={"image_base64": sample_image_base64},
+            service_name="face_analysis",
+            image_hash="abc"
+        )
+
+        assert first == second == {"face_count": 1}
+        assert mock_post.call_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_result_cache_opens_disk_tier_under_data_dir(tmp_path, monkeypatch):
+    """Test that the disk tier is opened by open(), not at construction, under data_dir."""
+    from services.image_processing_orchestrator.app.services import result_cache
+
+    monkeypatch.setattr(result_cache.config, "shared_cache_url", None)
+    monkeypatch.setattr(result_cache.config, "data_dir", str(tmp_path))
+    monkeypatch.setattr(result_cache.config, "result_cache_disk_path", "results.sqlite3")
+
+    cache = result_cache.AnalyzerResultCache.from_config()
+    assert cache.cache.disk is None
+    assert not (tmp_path / "results.sqlite3").exists()
+
+    await cache.open()
+    assert (tmp_path / "results.sqlite3").exists()
+    await cache.cache.set("key", b"value")
+    await cache.close()
+    assert cache.cache.disk is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_result_cache_keeps_disk_tier_under_shared_tier(tmp_path, monkeypatch):
+    """Test that a shared tier is added below the disk tier rather than replacing it."""
+    from libs.common.cache import MemoryCache, SQLiteCache, TieredCache
+    from services.image_processing_orchestrator.app.services import result_cache
+
+    monkeypatch.setattr(result_cache.config, "shared_cache_url", "memory://")
+    monkeypatch.setattr(result_cache.config, "data_dir", str(tmp_path))
+    monkeypatch.setattr(result_cache.config, "result_cache_disk_path", "results.sqlite3")
+
+    cache = result_cache.AnalyzerResultCache.from_config()
+    await cache.open()
+    tiers = cache.cache.disk
+    assert isinstance(tiers, TieredCache)
+    assert isinstance(tiers.memory, SQLiteCache)
+    assert isinstance(tiers.disk, MemoryCache)
+
+    # A hit in the shared tier is promoted to disk and memory
+    await tiers.disk.set("key", b"value")
+    assert await cache.cache.get("key") == b"value"
+    assert await tiers.memory.get("key") == b"value"
+    # The shared tier still decides add(), so locks hold across replicas
+    assert not await cache.cache.add("key", b"other")
+
+    monkeypatch.setattr(result_cache.config, "result_cache_disk_path", None)
+    await cache.close()
+    await cache.open()
+    assert isinstance(cache.cache.disk, MemoryCache)
+    await cache.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_face_detections_omitted_downstream(orchestrator, sample_image_base64):
+    """Test that skipping face detections is forwarded and cached separately."""
+    from libs.common.cache import MemoryCache, TieredCache
+    from services.image_processing_orchestrator.app.services.result_cache import AnalyzerResultCache
+
+    orchestrator.result_cache = AnalyzerResultCache(
+        cache=TieredCache(MemoryCache(max_bytes=1024 * 1024)),
+        enabled={"face_analysis": True},
+        versions={"face_analysis": "1"}
+    )
+
+    with patch.object(orchestrator, "_post_service", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value = {"face_count": 1, "faces": []}
+
+        await orchestrator._call_face_analysis(sample_image_base64, "req", "abc", face_detections="omit")
+        await orchestrator._call_face_analysis(sample_image_base64, "req", "abc", face_detections="list")
+        await orchestrator._call_face_analysis(sample_image_base64, "req", "abc", face_detections="packed")
+
+        assert mock_post.call_count == 3
+        assert mock_post.call_args_list[0].args[3] == {"X-Face-Detections": "omit"}
+        assert mock_post.call_args_list[1].args[3] is None
+        assert mock_post.call_args_list[2].args[3] == {"X-Face-Detections": "packed"}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_unknown_face_detections_mode_is_rejected(orchestrator, sample_image_base64):
+    """Test that an invalid X-Face-Detections value fails before any service is called."""
+    with patch.object(orchestrator, "_post_service", new_callable=AsyncMock) as mock_post:
+        with pytest.raises(ValueError, match="X-Face-Detections"):
+            await orchestrator.process_image(sample_image_base64, "req", face_detections="full")
+
+        mock_post.assert_not_called()
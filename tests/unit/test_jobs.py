@@ -0,0 +1,221 @@
+import asyncio
+import pytest
+from aiohttp import web
+from fastapi import HTTPException
+from libs.common.metrics import metrics
+from services.main_orchestrator.app.config import config
+from services.main_orchestrator.app.services.jobs import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+    InvalidCallbackError,
+    JobScheduler,
+    JobStoreFullError,
+    validate_callback_url,
+)
+from services.main_orchestrator.app.services.outbound import host_allowed
+
+
+def make_scheduler(**kwargs):
+    """Create a scheduler with small limits."""
+    options = {"max_concurrent": 1, "max_entries": 10, "ttl_seconds": 60, "callback_retries": 1}
+    options.update(kwargs)
+    return JobScheduler(**options)
+
+
+async def wait_finished(scheduler, job_id):
+    """Poll until the job has finished."""
+    for _ in range(100):
+        job = scheduler.get(job_id)
+        if job.finished:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_job_result_is_available_for_polling():
+    """Test that submit returns immediately and the result is stored."""
+    scheduler = make_scheduler()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return {"roast": "Nice hat."}
+
+    job = scheduler.submit(compute)
+    assert job.status == JOB_QUEUED
+
+    release.set()
+    job = await wait_finished(scheduler, job.job_id)
+    assert job.status == JOB_SUCCEEDED
+    assert job.to_response().result == {"roast": "Nice hat."}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_jobs_run_with_bounded_concurrency():
+    """Test that at most max_concurrent jobs run at once."""
+    scheduler = make_scheduler(max_concurrent=2)
+    running = 0
+    peak = 0
+
+    async def compute():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return {}
+
+    jobs = [scheduler.submit(compute) for _ in range(5)]
+    for job in jobs:
+        await wait_finished(scheduler, job.job_id)
+
+    assert peak == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_failed_job_keeps_error_and_status_code():
+    """Test that pipeline errors are reported on the job."""
+    scheduler = make_scheduler()
+
+    async def compute():
+        raise HTTPException(status_code=400, detail="Unsupported image")
+
+    job = await wait_finished(scheduler, scheduler.submit(compute).job_id)
+
+    assert job.status == JOB_FAILED
+    assert (job.error, job.error_code) == ("Unsupported image", 400)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_store_is_bounded_and_expires_finished_jobs():
+    """Test that pending jobs are capped and finished ones expire."""
+    scheduler = make_scheduler(max_entries=2, ttl_seconds=0)
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+        return {}
+
+    first = scheduler.submit(blocked)
+    scheduler.submit(blocked)
+    with pytest.raises(JobStoreFullError):
+        scheduler.submit(blocked)
+
+    # With a zero TTL finished jobs disappear as soon as they complete
+    release.set()
+    await asyncio.sleep(0.02)
+
+    assert scheduler.get(first.job_id) is None
+    scheduler.submit(blocked)
+    await scheduler.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_finished_job_is_posted_to_callback(monkeypatch):
+    """Test delivery of the finished job to the callback URL."""
+    monkeypatch.setattr(config, "outbound_allow_private_networks", True)
+    received = asyncio.Queue()
+
+    async def callback(request):
+        await received.put(await request.json())
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/done", callback)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        scheduler = make_scheduler()
+
+        async def compute():
+            return {"roast": "Bold."}
+
+        job = scheduler.submit(compute, callback_url=f"http://127.0.0.1:{port}/done")
+        body = await asyncio.wait_for(received.get(), 2)
+    finally:
+        await runner.cleanup()
+
+    assert body["job_id"] == job.job_id
+    assert body["status"] == JOB_SUCCEEDED
+    assert body["result"] == {"roast": "Bold."}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_callback_url_must_be_absolute_http():
+    """Test callback URL validation."""
+    assert await validate_callback_url("https://8.8.8.8/hook")
+    for url in ["ftp://example.com/hook", "/relative", "http://"]:
+        with pytest.raises(InvalidCallbackError):
+            await validate_callback_url(url)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_callback_url_must_not_reach_internal_hosts(monkeypatch):
+    """Test that private, loopback and link-local destinations and unlisted hosts are refused."""
+    for url in [
+        "http://127.0.0.1:8000/hook",
+        "http://localhost/hook",
+        "http://10.0.0.5/hook",
+        "http://192.168.1.1/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "http://[::ffff:127.0.0.1]/hook",
+    ]:
+        with pytest.raises(InvalidCallbackError):
+            await validate_callback_url(url)
+
+    monkeypatch.setattr(config, "outbound_allowed_hosts", [".example.com"])
+    assert host_allowed("hooks.example.com", config.outbound_allowed_hosts)
+    with pytest.raises(InvalidCallbackError):
+        await validate_callback_url("https://8.8.8.8/hook")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_callbacks_are_checked_again_at_delivery(monkeypatch):
+    """Test that a callback whose host is no longer allowed is not delivered."""
+    received = []
+
+    async def callback(request):
+        received.append(request)
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/done", callback)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    callback_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/done"
+
+    async def compute():
+        return {}
+
+    try:
+        monkeypatch.setattr(config, "outbound_allow_private_networks", True)
+        await validate_callback_url(callback_url)
+        monkeypatch.setattr(config, "outbound_allow_private_networks", False)
+
+        scheduler = make_scheduler()
+        failed = metrics.get("jobs_callbacks_failed")
+        job = scheduler.submit(compute, callback_url=callback_url)
+        await wait_finished(scheduler, job.job_id)
+        await asyncio.gather(*scheduler._tasks)
+    finally:
+        await runner.cleanup()
+
+    assert received == []
+    assert metrics.get("jobs_callbacks_failed") == failed + 1
@@ -1,11 +1,14 @@
+import asyncio
+import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from PIL import Image
+from pydantic import ValidationError
+from libs.common.deadline import DEADLINE_HEADER, deadline_scope
 from services.main_orchestrator.app.services.orchestrator import OrchestratorService
 from libs.common.schemas import (
     AggregatedImageFeatures,
-    FaceAnalysisResult,
-    AnalyzeImageResponse
+    FaceAnalysisResult
 )
 
 
@@ -69,6 +72,46 @@ async def test_health_check(orchestrator):
         assert "llm_inferencer" in health
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_image_processing_results_are_validated(orchestrator):
+    """Test that features bound for the public response are validated, not constructed."""
+    orchestrator.transport = MagicMock()
+    orchestrator.transport.post = AsyncMock(return_value={
+        "face_analysis": {"face_count": -1}, "processing_time_ms": 1.0
+    })
+
+    with pytest.raises(ValidationError):
+        await orchestrator._call_image_processing("aGk=", "req-1")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_coalesced_pipeline_forwards_the_request_deadline(orchestrator, sample_image, sample_features):
+    """Test that pipeline runs shared through process_image still send the request deadline."""
+    orchestrator.feature_cache = None
+    sent = {}
+
+    async def post(url, payload, headers=None):
+        sent[url.rsplit("/", 1)[-1]] = (headers or {}).get(DEADLINE_HEADER)
+        await asyncio.sleep(0.01)
+        if url.endswith("/api/v1/process"):
+            return sample_features.model_dump(mode="json")
+        return {"roast_text": "Nice try"}
+
+    orchestrator.transport = MagicMock()
+    orchestrator.transport.post = post
+
+    deadline = time.time() + 30
+    with deadline_scope(deadline):
+        results = await asyncio.gather(*[
+            orchestrator.process_image(sample_image, content_hash="abc") for _ in range(2)
+        ])
+
+    assert [result.roast for result in results] == ["Nice try"] * 2
+    assert sent == {"process": f"{deadline:.3f}", "generate": f"{deadline:.3f}"}
+
+
 @pytest.mark.unit
 def test_sample_image_fixture(sample_image):
     """Test that sample image fixture works."""
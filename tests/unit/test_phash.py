@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+from PIL import Image
+from libs.common.phash import BKTree, dhash, hamming_distance
+
+
+@pytest.fixture
+def gradient_image():
+    """Create a horizontal gradient image with some structure."""
+    x = np.linspace(0, 255, 320, dtype=np.float32)
+    y = np.linspace(0, 1, 240, dtype=np.float32)[:, None]
+    pixels = (np.outer(np.ones(240), x) * (0.5 + y)).clip(0, 255).astype(np.uint8)
+    return Image.fromarray(np.stack([pixels, pixels[::-1], pixels], axis=-1), "RGB")
+
+
+@pytest.mark.unit
+def test_dhash_is_stable_under_resize(gradient_image):
+    """Test that a resized copy hashes within a few bits of the original."""
+    original = dhash(gradient_image)
+    resized = dhash(gradient_image.resize((160, 120)))
+
+    assert hamming_distance(original, resized) <= 4
+
+
+@pytest.mark.unit
+def test_dhash_differs_for_different_images(gradient_image):
+    """Test that unrelated images are far apart."""
+    flipped = gradient_image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+
+    assert hamming_distance(dhash(gradient_image), dhash(flipped)) > 16
+
+
+@pytest.mark.unit
+def test_bktree_search_within_distance():
+    """Test BK-tree lookup returns only hashes within the threshold."""
+    tree = BKTree()
+    tree.add(0b0000, "a")
+    tree.add(0b0001, "b")
+    tree.add(0b0111, "c")
+    tree.add(0b1111, "d")
+
+    matches = tree.search(0b0000, max_distance=1)
+
+    assert [value for _, _, value in matches] == ["a", "b"]
+    assert len(tree) == 4
+
+
+@pytest.mark.unit
+def test_bktree_replaces_identical_hash():
+    """Test that adding an existing hash updates its value."""
+    tree = BKTree()
+    tree.add(42, "old")
+    tree.add(42, "new")
+
+    assert len(tree) == 1
+    assert tree.search(42, max_distance=0) == [(0, 42, "new")]
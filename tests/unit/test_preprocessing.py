@@ -0,0 +1,72 @@
+import base64
+import io
+import pytest
+from PIL import Image
+from services.main_orchestrator.app.services.preprocessing import (
+    EXIF_ORIENTATION_TAG,
+    UnsupportedImageError,
+    prepare_upload,
+)
+
+
+def _encode(image: Image.Image, fmt: str, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+def test_compliant_jpeg_is_passed_through():
+    """Test that a small upright RGB JPEG is forwarded byte-for-byte."""
+    image_bytes = _encode(Image.new("RGB", (640, 480), color="red"), "JPEG")
+
+    prepared, image_hash = prepare_upload(image_bytes, compute_hash=True)
+
+    assert prepared.passthrough
+    assert prepared.image is None
+    assert base64.b64decode(prepared.to_base64()) == image_bytes
+    assert image_hash is not None
+
+
+@pytest.mark.unit
+def test_png_is_reencoded():
+    """Test that non-JPEG uploads are decoded and re-encoded."""
+    image_bytes = _encode(Image.new("RGBA", (640, 480)), "PNG")
+
+    prepared, _ = prepare_upload(image_bytes, compute_hash=False)
+
+    assert not prepared.passthrough
+    assert prepared.image.mode == "RGB"
+
+
+@pytest.mark.unit
+def test_oversized_jpeg_is_resized():
+    """Test that JPEGs larger than the downstream maximum are resized."""
+    image_bytes = _encode(Image.new("RGB", (3000, 2000)), "JPEG")
+
+    prepared, _ = prepare_upload(image_bytes, compute_hash=False)
+
+    assert not prepared.passthrough
+    assert prepared.image.width <= 1920
+    assert prepared.image.height <= 1080
+
+
+@pytest.mark.unit
+def test_rotated_jpeg_is_reencoded():
+    """Test that JPEGs relying on EXIF orientation are not forwarded as-is."""
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION_TAG] = 6
+    image_bytes = _encode(Image.new("RGB", (640, 480)), "JPEG", exif=exif)
+
+    prepared, _ = prepare_upload(image_bytes, compute_hash=False)
+
+    assert not prepared.passthrough
+
+
+@pytest.mark.unit
+def test_unsupported_format_rejected():
+    """Test that formats other than JPEG, PNG and WEBP are rejected."""
+    image_bytes = _encode(Image.new("RGB", (64, 64)), "BMP")
+
+    with pytest.raises(UnsupportedImageError):
+        prepare_upload(image_bytes, compute_hash=False)
@@ -0,0 +1,121 @@
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from libs.common import serialization
+from libs.common.schemas import (
+    AggregatedImageFeatures,
+    Emotion,
+    FaceAnalysisResult,
+    FaceDetection,
+    RoastRequest,
+)
+from libs.common.serialization import (
+    JSON_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPE,
+    DecodeError,
+    construct,
+    decode,
+    encode,
+    encoded_response,
+    load_model,
+    negotiate,
+    trusted_body,
+)
+
+
+@pytest.fixture
+def features_data():
+    """Features as produced by the image processing orchestrator."""
+    return {
+        "face_analysis": {
+            "face_count": 1,
+            "faces": [{"bbox": [1.0, 2.0, 3.0, 4.0], "confidence": 0.9, "landmarks": [[1.0, 2.0]]}],
+            "emotion": "happy",
+            "emotion_confidence": 0.8,
+        },
+        "vlm_scene_analysis": "A cat on a keyboard",
+        "processing_time_ms": 12.5,
+    }
+
+
+@pytest.mark.unit
+def test_construct_builds_nested_models_and_enums(features_data):
+    """Test that construction without validation matches validation for trusted data."""
+    constructed = construct(AggregatedImageFeatures, features_data)
+
+    assert isinstance(constructed.face_analysis, FaceAnalysisResult)
+    assert isinstance(constructed.face_analysis.faces[0], FaceDetection)
+    assert constructed.face_analysis.emotion is Emotion.HAPPY
+    assert constructed.body_analysis is None
+    assert constructed == AggregatedImageFeatures.model_validate(features_data)
+
+
+@pytest.mark.unit
+def test_load_model_validates_on_request(features_data):
+    """Test that validation can be forced for untrusted data."""
+    features_data["face_analysis"]["emotion_confidence"] = 5.0
+
+    construct(AggregatedImageFeatures, features_data)
+    with pytest.raises(ValueError):
+        load_model(AggregatedImageFeatures, features_data, validate=True)
+
+
+@pytest.mark.unit
+def test_json_roundtrip(features_data):
+    """Test JSON encoding and decoding."""
+    body = encode(features_data, JSON_CONTENT_TYPE)
+
+    assert decode(body, "application/json; charset=utf-8") == features_data
+    assert decode(body, None) == features_data
+
+
+@pytest.mark.unit
+def test_msgpack_roundtrip(features_data):
+    """Test msgpack encoding and decoding."""
+    pytest.importorskip("msgpack")
+    body = encode(features_data, MSGPACK_CONTENT_TYPE)
+
+    assert decode(body, MSGPACK_CONTENT_TYPE) == features_data
+
+
+@pytest.mark.unit
+def test_negotiation_falls_back_to_json(monkeypatch):
+    """Test that msgpack is only chosen when offered and installed."""
+    monkeypatch.setattr(serialization, "msgpack", None)
+
+    assert negotiate(f"{MSGPACK_CONTENT_TYPE}, {JSON_CONTENT_TYPE}") == JSON_CONTENT_TYPE
+    assert negotiate(None) == JSON_CONTENT_TYPE
+    with pytest.raises(DecodeError):
+        decode(b"\x80", MSGPACK_CONTENT_TYPE)
+
+
+@pytest.mark.unit
+def test_malformed_body_raises():
+    """Test that malformed JSON raises DecodeError."""
+    with pytest.raises(DecodeError):
+        decode(b"{not json", JSON_CONTENT_TYPE)
+
+
+@pytest.mark.unit
+def test_trusted_body_dependency(features_data):
+    """Test the FastAPI dependency for internal request bodies."""
+    app = FastAPI()
+
+    @app.post("/roast")
+    async def roast(request: Request, body: RoastRequest = Depends(trusted_body(RoastRequest))):
+        return encoded_response(
+            {"emotion": body.features.face_analysis.emotion.value},
+            request.headers.get("accept")
+        )
+
+    client = TestClient(app)
+    response = client.post(
+        "/roast",
+        content=encode({"features": features_data, "roast_level": "savage"}, JSON_CONTENT_TYPE),
+        headers={"Content-Type": JSON_CONTENT_TYPE}
+    )
+    malformed = client.post("/roast", content=b"{", headers={"Content-Type": JSON_CONTENT_TYPE})
+
+    assert response.status_code == 200
+    assert response.json() == {"emotion": "happy"}
+    assert malformed.status_code == 422
@@ -0,0 +1,78 @@
+import aiohttp
+import pytest
+from libs.common.transport import (
+    HttpTransport,
+    InProcessTransport,
+    TransportError,
+    create_transport,
+    in_process_transport,
+)
+from services.image_processing_orchestrator.app.services.orchestrator import ImageProcessingOrchestrator
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_in_process_transport_routes_by_configured_url():
+    """Test that handlers are reached through the URLs clients are configured with."""
+    transport = InProcessTransport()
+    seen = []
+
+    async def analyze(payload, headers):
+        seen.append((payload, headers))
+        return {"face_count": 1}
+
+    transport.register("http://localhost:8002/", {"/api/v1/analyze": analyze}, health=lambda: True)
+
+    result = await transport.post(
+        "http://localhost:8002/api/v1/analyze", {"request_id": "r"}, {"X-Test": "1"}
+    )
+
+    assert result == {"face_count": 1}
+    assert seen == [({"request_id": "r"}, {"X-Test": "1"})]
+    assert await transport.healthy("http://localhost:8002")
+    assert not await transport.healthy("http://localhost:8008")
+
+    with pytest.raises(TransportError):
+        await transport.post("http://localhost:8008/api/v1/analyze", {})
+
+
+@pytest.mark.unit
+def test_create_transport_by_deployment_mode():
+    """Test transport selection from the deployment mode setting."""
+    timeout = aiohttp.ClientTimeout(total=1)
+
+    assert isinstance(create_transport("services", timeout), HttpTransport)
+    assert create_transport("monolith", timeout) is in_process_transport
+    with pytest.raises(ValueError):
+        create_transport("serverless", timeout)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_image_processing_orchestrator_in_process():
+    """Test that the orchestrator runs unchanged over direct calls."""
+    orchestrator = ImageProcessingOrchestrator()
+    orchestrator.result_cache = None
+    transport = InProcessTransport()
+    orchestrator.transport = transport
+    # As wired by the monolith: health is answered by the registered handlers
+    orchestrator.face_analysis_health_url = orchestrator.face_analysis_url
+    orchestrator.vlm_scene_analysis_health_url = orchestrator.vlm_scene_analysis_url
+    face_headers = []
+
+    async def analyze_face(payload, headers):
+        face_headers.append(headers)
+        return {"face_count": 0, "faces": []}
+
+    async def analyze_scene(payload, headers):
+        return {"scene_description": "A desk", "processing_time_ms": 1.0}
+
+    transport.register(orchestrator.face_analysis_url, {"/api/v1/analyze": analyze_face}, lambda: True)
+    transport.register(orchestrator.vlm_scene_analysis_url, {"/api/v1/analyze": analyze_scene}, lambda: True)
+
+    result = await orchestrator.process_image("aGVsbG8=", "req", face_detections="packed")
+
+    assert result["face_analysis"] == {"face_count": 0, "faces": []}
+    assert result["vlm_scene_analysis"]["scene_description"] == "A desk"
+    assert face_headers == [{"X-Face-Detections": "packed"}]
+    assert await orchestrator.health_check() == {"face_analysis": True, "vlm_scene_analysis": True}
@@ -0,0 +1,137 @@
+import asyncio
+import time
+import pytest
+from libs.common.metrics import metrics
+from libs.common.serialization import dumps
+from libs.common.transport import TransportError
+from libs.common.work_queue import (
+    MemoryQueue,
+    QueueTransport,
+    QueueWorker,
+    SQLiteQueue,
+    create_queue_backend,
+)
+
+
+FACE_URL = "http://localhost:8002"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    """Each local queue backend."""
+    if request.param == "memory":
+        return MemoryQueue()
+    return SQLiteQueue(str(tmp_path / "queue.sqlite3"), poll_interval=0.01)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_queue_is_fifo_and_drops_expired_items(backend):
+    """Test push/pop order, item expiry and pop timeouts."""
+    await backend.push("jobs", b"first")
+    await backend.push("jobs", b"stale", ttl=0.01)
+    await backend.push("jobs", b"second")
+    await asyncio.sleep(0.02)
+
+    assert await backend.length("jobs") == 3
+    assert await backend.pop("jobs", 0.1) == b"first"
+    assert await backend.pop("jobs", 0.1) == b"second"
+    assert await backend.pop("jobs", 0.05) is None
+
+    await backend.close()
+
+
+@pytest.mark.unit
+def test_create_queue_backend_from_url(tmp_path):
+    """Test backend selection from the queue URL."""
+    assert create_queue_backend("memory://") is create_queue_backend("memory://")
+    assert isinstance(create_queue_backend(f"sqlite:///{tmp_path}/q.sqlite3"), SQLiteQueue)
+    with pytest.raises(ValueError):
+        create_queue_backend("amqp://broker")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_worker_replies_through_queue_transport(backend):
+    """Test a job round trip from the transport through a pulling worker."""
+    seen = []
+
+    async def analyze(payload, headers):
+        seen.append((payload, headers))
+        return {"face_count": 1}
+
+    transport = QueueTransport(backend, {FACE_URL: "face"}, deadline_seconds=2)
+    worker = QueueWorker(backend, "face", {"/api/v1/analyze": analyze}, poll_timeout=0.05)
+    worker.start()
+    try:
+        result = await transport.post(f"{FACE_URL}/api/v1/analyze", {"request_id": "r"}, {"X-Test": "1"})
+        with pytest.raises(TransportError) as error:
+            await transport.post(f"{FACE_URL}/api/v1/unknown", {})
+    finally:
+        await worker.stop()
+
+    assert result == {"face_count": 1}
+    assert seen == [({"request_id": "r"}, {"X-Test": "1"})]
+    assert error.value.status == 404
+    assert await transport.healthy(FACE_URL)
+    assert metrics.get("face_queue_depth") == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_jobs_past_their_deadline_are_dropped():
+    """Test that the caller gives up at the deadline and workers skip expired jobs."""
+    backend = MemoryQueue()
+    transport = QueueTransport(backend, {FACE_URL: "face"}, deadline_seconds=0.05)
+    calls = []
+
+    async def analyze(payload, headers):
+        calls.append(payload)
+        return {}
+
+    with pytest.raises(TransportError) as error:
+        await transport.post(f"{FACE_URL}/api/v1/analyze", {"request_id": "late"})
+    assert error.value.status == 504
+    assert await backend.pop("face", 0.01) is None
+
+    # A worker picking up a job after its deadline drops it unanswered
+    worker = QueueWorker(backend, "face", {"/api/v1/analyze": analyze})
+    expired_before = metrics.get("face_queue_jobs_expired")
+    job = {
+        "id": "late",
+        "path": "/api/v1/analyze",
+        "payload": {},
+        "headers": {},
+        "reply_to": "reply:late",
+        "enqueued_at": time.time() - 1,
+        "deadline": time.time() - 0.5,
+    }
+    await worker.handle(dumps(job))
+
+    assert calls == []
+    assert await backend.length("reply:late") == 0
+    assert metrics.get("face_queue_jobs_expired") == expired_before + 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_worker_survives_bad_jobs_and_downstream_timeouts():
+    """Test that malformed jobs are skipped and a handler's own timeout gets an error reply."""
+    backend = MemoryQueue()
+    transport = QueueTransport(backend, {FACE_URL: "face"}, deadline_seconds=2)
+
+    async def analyze(payload, headers):
+        raise asyncio.TimeoutError()
+
+    worker = QueueWorker(backend, "face", {"/api/v1/analyze": analyze}, poll_timeout=0.05)
+    worker.start()
+    try:
+        await backend.push("face", b"not a job")
+        await backend.push("face", dumps({"id": "no-deadline"}))
+        with pytest.raises(TransportError) as error:
+            await transport.post(f"{FACE_URL}/api/v1/analyze", {})
+    finally:
+        await worker.stop()
+
+    assert error.value.status == 504
+    assert "Downstream call timed out" in str(error.value)
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import pytest
+from libs.common.metrics import metrics
+from libs.common.workers import BoundedWorkerPool, WorkerPoolFullError
+
+
+@pytest.fixture
+def pool():
+    """Create a single-thread pool with a one-slot backlog."""
+    pool = BoundedWorkerPool(name="test_pool", max_workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_run_returns_result_off_the_event_loop(pool):
+    """Test that work runs in a worker thread."""
+    main_thread = threading.get_ident()
+
+    result = await pool.run(lambda x: (x * 2, threading.get_ident()), 21)
+
+    assert result[0] == 42
+    assert result[1] != main_thread
+    assert pool.pending == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_work(pool):
+    """Test that submissions beyond workers + queue are rejected."""
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+    await asyncio.sleep(0.01)
+
+    assert pool.queue_depth == 1
+    assert metrics.get("test_pool_queue_depth") == 1
+    with pytest.raises(WorkerPoolFullError):
+        await pool.run(lambda: "rejected")
+
+    release.set()
+    assert await queued == "queued"
+    await running
+    assert pool.queue_depth == 0